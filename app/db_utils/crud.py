@@ -2,7 +2,9 @@
 This module provides utility functions for user authentication and token management.
 """
 
+import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from datetime import datetime, timedelta, timezone
 import logging
@@ -13,9 +15,11 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db_utils import models, schemas
+from app.db_utils.token_cache import TokenCache
 from app.models.auth_model import TokenData
 
 
@@ -33,6 +37,12 @@ ALGORITHM = "HS256"
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt is deliberately slow; hashing runs on this bounded pool instead of the event loop.
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", "2"))
+hash_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="password-hash")
+
+token_cache = TokenCache()
+
 
 def verify_password(plain_password, hashed_password):
     """
@@ -61,66 +71,100 @@ def get_password_hash(password):
     return pwd_context.hash(password)
 
 
-def get_user(db: Session, user_id: int):
+async def verify_password_async(plain_password, hashed_password):
+    """
+    Verify a password on the password hashing pool.
+
+    Args:
+        plain_password (str): The plain password to be verified.
+        hashed_password (str): The hashed password to be compared against.
+
+    Returns:
+        bool: True if the plain password matches the hashed password, False otherwise.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        hash_executor, verify_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password):
+    """
+    Hash a password on the password hashing pool.
+
+    Args:
+        password (str): The password to be hashed.
+
+    Returns:
+        str: The hashed password.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(hash_executor, get_password_hash, password)
+
+
+async def get_user(db: AsyncSession, user_id: int):
     """
     Retrieves a user from the database based on the provided user_id.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The async database session.
         user_id (int): The unique identifier of the user to retrieve.
 
     Returns:
         User: The user corresponding to the provided user_id, or None if not found.
     """
-    return db.query(models.User).filter(models.User.id == user_id).first()
+    result = await db.execute(select(models.User).filter(models.User.id == user_id))
+    return result.scalars().first()
 
 
-def get_user_by_username(db: Session, username: str):
+async def get_user_by_username(db: AsyncSession, username: str):
     """
     Retrieves a user from the database based on the provided username.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The async database session.
         username (str): The username of the user to retrieve.
 
     Returns:
         User: The user corresponding to the provided username, or None if not found.
     """
-    user = db.query(models.User).filter(models.User.username == username).first()
-    return user
+    result = await db.execute(select(models.User).filter(models.User.username == username))
+    return result.scalars().first()
 
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100):
     """
     Retrieves a list of users from the database.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The async database session.
         skip (int, optional): The number of users to skip. Defaults to 0.
         limit (int, optional): The maximum number of users to retrieve. Defaults to 100.
 
     Returns:
         list: A list of User objects representing the retrieved users.
     """
-    return db.query(models.User).offset(skip).limit(limit).all()
+    result = await db.execute(select(models.User).offset(skip).limit(limit))
+    return list(result.scalars().all())
 
 
-def create_user(db: Session, user: schemas.UserCreate):
+async def create_user(db: AsyncSession, user: schemas.UserCreate):
     """
-    Creates a new user in the database.
+    Creates a new user in the database, hashing the password on the password
+    hashing pool.
 
     Args:
-        db (Session): The database session.
+        db (AsyncSession): The async database session.
         user (UserCreate): The user data to create.
 
     Returns:
         User: The newly created user in the database.
     """
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     db_user = models.User(username=user.username, hashed_password=hashed_password)
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 
@@ -151,6 +195,9 @@ def verify_token(token: str = Depends(oauth2_scheme)) -> TokenData:
     """
     Verify the provided JWT token and return the username contained in the payload.
 
+    Tokens that were verified before and have not expired are answered from the
+    token cache without checking their signature again.
+
     Args:
         token (str, optional): The JWT token to be verified. 
         Defaults to the result of the `oauth2_scheme` dependency.
@@ -158,6 +205,9 @@ def verify_token(token: str = Depends(oauth2_scheme)) -> TokenData:
     Returns:
         TokenData: An object containing the username extracted from the token payload.
     """
+    token_data = token_cache.get(token)
+    if token_data is not None:
+        return token_data
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
@@ -174,4 +224,6 @@ def verify_token(token: str = Depends(oauth2_scheme)) -> TokenData:
             detail="Incorrect token",
             headers={"WWW-Authenticate": "Bearer"},
         ) from exc
+    if "exp" in payload:
+        token_cache.put(token, token_data, payload["exp"])
     return token_data
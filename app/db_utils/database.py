@@ -2,17 +2,34 @@
 This script defines the database connection and session for 
 the Streaming Data Generator application.
 It uses SQLAlchemy to create and manage the database connection and session.
+
+Request handlers use the pooled async engine, so waiting for the database does
+not block the event loop that paces the streams. The tables are created by the
+startup hook of the app rather than on import.
+
+Environment variables:
+    DATABASE_URL: The async SQLAlchemy URL of the database. Defaults to the SQLite
+        file sql_app.db in the working directory.
 """
 
-from sqlalchemy import create_engine
+import os
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./sql_app.db"
+ASYNC_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./sql_app.db")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+DB_POOL_SIZE = 5
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL, pool_size=DB_POOL_SIZE)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
+
+
+async def create_tables():
+    """
+    Create the tables of the models that do not exist yet.
+    """
+    async with async_engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
@@ -0,0 +1,90 @@
+"""
+This module provides a bounded cache of verified access tokens.
+
+Clients reconnect often with the same long-lived token. The cache remembers the
+TokenData of every token that passed verification until the token expires, so a
+reconnect costs one hash of the token instead of a signature check. The hits and
+misses are exported as the sdg_token_cache_lookups_total counter.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.models.auth_model import TokenData
+from app.stream_utils.metrics import TOKEN_CACHE_LOOKUPS
+
+TOKEN_CACHE_SIZE = 4096
+
+
+class TokenCache:
+    """
+    A least recently used cache of verified tokens, keyed by the SHA-256 digest of
+    the token, whose entries expire at the expiry time of their token.
+
+    Attributes:
+        maxsize (int): The largest number of tokens kept.
+    """
+
+    def __init__(self, maxsize: int = TOKEN_CACHE_SIZE):
+        """
+        Args:
+            maxsize (int, optional): The largest number of tokens kept.
+        """
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[TokenData]:
+        """
+        Args:
+            token (str): The encoded token.
+
+        Returns:
+            TokenData: The data of the token if it was verified and has not expired
+                since, otherwise None.
+        """
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.time():
+                self._entries.move_to_end(key)
+                TOKEN_CACHE_LOOKUPS.inc(result="hit")
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+        TOKEN_CACHE_LOOKUPS.inc(result="miss")
+        return None
+
+    def put(self, token: str, token_data: TokenData, expires_at: float):
+        """
+        Remember a verified token, evicting the least recently used one when full.
+
+        Args:
+            token (str): The encoded token.
+            token_data (TokenData): The data of the token.
+            expires_at (float): The expiry time of the token, in seconds since the epoch.
+        """
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, token_data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Forget every token.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,32 @@
+"""
+Module for defining the FastAPI endpoints reporting on the health of the server.
+
+Endpoints:
+    /admin/loop: Endpoint for the event loop lag and the recent slow callbacks.
+"""
+
+import logging
+
+from fastapi import APIRouter, Depends
+
+from app.db_utils.crud import verify_token
+from app.models.auth_model import TokenData
+from app.stream_utils.loop_monitor import loop_monitor
+
+router = APIRouter()
+
+logger = logging.getLogger(__name__)
+
+
+@router.get("/admin/loop")
+async def event_loop_report(token_data: TokenData = Depends(verify_token)):
+    """
+    Report how late the event loop runs, and which code recently blocked it.
+
+    Returns:
+    - dict: The heartbeat lag in milliseconds (last, mean and max) and the most recent
+      slow callbacks, each with its start time, duration, the endpoint and generator
+      on the stack and the innermost frames.
+    """
+    logger.debug("Event loop report requested by user '%s'", token_data.username)
+    return loop_monitor.report()
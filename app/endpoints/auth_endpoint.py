@@ -12,13 +12,14 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db_utils import crud
-from app.db_utils.database import SessionLocal
+from app.db_utils.database import AsyncSessionLocal
 from app.db_utils import schemas
 from app.models.auth_model import Token
-from app.db_utils.crud import verify_password, create_access_token
+from app.stream_utils.metrics import AUTH_LATENCY, timed
+from app.db_utils.crud import verify_password_async, create_access_token
 
 
 logger = logging.getLogger(__name__)
@@ -28,56 +29,57 @@ ACCESS_TOKEN_EXPIRY = 7
 router = APIRouter()
 
 
-def get_db():
+async def get_db():
     """
-    Generator function that yields a SQLAlchemy SessionLocal instance.
+    Generator function that yields a session of the pooled async engine.
 
     Yields:
-        SessionLocal: A database session object that can be used within a context manager.
+        AsyncSession: A database session, returned to the pool after the request.
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 @router.post("/register", response_model=schemas.User)
-def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
+async def create_user(user: schemas.UserCreate, db: AsyncSession = Depends(get_db)):
     """
     Endpoint to creates a new user.
 
     Parameters:
         user (schemas.UserCreate): The user data including username and password
-        db (Session, optional): The database session. Defaults to the result of `get_db()`.
+        db (AsyncSession, optional): The database session. Defaults to the result of `get_db()`.
 
     Returns:
         schemas.User : The newly created user object from the database.
     """
-    db_user = crud.get_user_by_username(db, username=user.username)
-    if db_user:
-        raise HTTPException(status_code=400, detail="User already registered")
-    new_user = crud.create_user(db=db, user=user)
+    with timed(AUTH_LATENCY, endpoint="register"):
+        db_user = await crud.get_user_by_username(db, username=user.username)
+        if db_user:
+            raise HTTPException(status_code=400, detail="User already registered")
+        new_user = await crud.create_user(db=db, user=user)
     return new_user
 
 
-def authenticate_user(username: str, password: str, db: Session):
+async def authenticate_user(username: str, password: str, db: AsyncSession):
     """
     Authenticates a user based on the provided username and password.
 
+    The user is looked up through the async session and the password is checked on
+    the password hashing pool, so neither blocks the running streams.
+
     Parameters:
         username (str): The username of the user to authenticate.
         password (str): The password of the user to authenticate.
-        db (Session): The database session to query user information.
+        db (AsyncSession): The database session to query user information.
 
     Returns:
         db_user: The authenticated user if successful, False otherwise.
     """
-    db_user = crud.get_user_by_username(db, username=username)
+    db_user = await crud.get_user_by_username(db, username=username)
     if not db_user:
         logger.debug("No user found with username: %s", username)
         return False
-    if not verify_password(password, db_user.hashed_password):
+    if not await verify_password_async(password, db_user.hashed_password):
         logger.debug("Password verification failed for user: %s", username)
         return False
     logger.debug("User %s authenticated successfully", username)
@@ -87,19 +89,20 @@ def authenticate_user(username: str, password: str, db: Session):
 @router.post("/token")
 async def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Token:
     """
     Endpoint for logging in a user and generating an access token.
 
     Args:
         form_data (OAuth2PasswordRequestForm): The form data containing the username and password.
-        db (Session, optional): The database session. Defaults to Depends(get_db).
+        db (AsyncSession, optional): The database session. Defaults to Depends(get_db).
 
     Returns:
         Token: The access token with the username as the subject.
     """
-    user = authenticate_user(form_data.username, form_data.password, db)
+    with timed(AUTH_LATENCY, endpoint="token"):
+        user = await authenticate_user(form_data.username, form_data.password, db)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,118 @@
+"""
+Module for defining the FastAPI endpoints that stream signals composed of several
+of the existing streams.
+
+Endpoints:
+    /compose: Endpoint for streaming a composed signal.
+    /compose/bulk: Endpoint for returning a fixed number of data points of a
+        composed signal without pacing.
+"""
+
+import json
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+
+from app.db_utils.crud import verify_token
+from app.endpoints.streaming import bulk_response, stream_response, wire_options
+from app.generators import compose
+from app.models.auth_model import TokenData
+from app.models.compose_models import ComposeModel
+from app.models.stream_models import BulkOptions, StreamOptions, WireOptions
+
+router = APIRouter()
+
+logger = logging.getLogger(__name__)
+
+
+def check_signal(compose_model: ComposeModel):
+    """
+    Build the signal once, so invalid sources are reported before streaming starts.
+
+    Args:
+        compose_model (ComposeModel): The model of the signal.
+
+    Raises:
+        HTTPException: If a source names an unknown stream or has invalid parameters.
+    """
+    try:
+        compose.composed_samples(compose_model)
+    except ValueError as error:
+        logger.error("Invalid composed signal: %s", error)
+        if isinstance(error, ValidationError):
+            detail = json.loads(error.json(include_url=False))
+        else:
+            detail = str(error)
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=detail
+        ) from error
+
+
+@router.post("/compose", response_class=StreamingResponse)
+async def composed_signal(
+    compose_model: ComposeModel,
+    stream_options: StreamOptions = Depends(),
+    wire: WireOptions = Depends(wire_options),
+    token_data: TokenData = Depends(verify_token),
+):
+    """
+    Generate a streaming signal composed of several streams.
+
+    Parameters:
+    - compose_model: An instance of the ComposeModel class, sent as the JSON body:
+        - signal (object): A source {"stream": "sine", "params": {...}} or an operator
+          {"op": "add" | "multiply" | "mask", "inputs": [...]} of sources and operators.
+        - interval (float): The time interval between data points (in seconds).
+        - batch_size (int): The number of data points computed and emitted per chunk.
+        - catch_up (str): How the stream catches up when behind schedule.
+        - seed (int): The seed the sources derive their seeds from.
+        - offset (int): The index of the first data point, used to resume a stream.
+    - stream_options: An instance of the StreamOptions class with the delivery options,
+      including rate and latency_ms for high-rate streams.
+    - wire: The negotiated encoding, as for the other streaming endpoints.
+
+    Returns:
+    - StreamingResponse: A streaming response containing the composed signal.
+    """
+    logger.info(
+        "Generating composed signal for user '%s' with parameters: %s",
+        token_data.username,
+        compose_model,
+    )
+    check_signal(compose_model)
+    return stream_response(compose.generate_composed_data, compose_model, stream_options, wire)
+
+
+@router.post("/compose/bulk", response_class=StreamingResponse)
+async def composed_signal_bulk(
+    compose_model: ComposeModel,
+    bulk_options: BulkOptions = Depends(),
+    wire: WireOptions = Depends(wire_options),
+    token_data: TokenData = Depends(verify_token),
+):
+    """
+    Generate a fixed number of data points of a composed signal immediately,
+    without pacing.
+
+    Parameters:
+    - compose_model: An instance of the ComposeModel class, sent as the JSON body,
+      as for /compose.
+    - bulk_options: An instance of the BulkOptions class. Exactly one of count and
+      duration.
+    - wire: The negotiated encoding, as for the other streaming endpoints.
+
+    Returns:
+    - StreamingResponse: A response streaming the data points as fast as the client reads.
+    """
+    logger.info(
+        "Generating bulk composed signal for user '%s' with parameters: %s, %s",
+        token_data.username,
+        compose_model,
+        bulk_options,
+    )
+    check_signal(compose_model)
+    return bulk_response(
+        compose.composed_samples, compose_model, compose_model.interval, bulk_options, wire
+    )
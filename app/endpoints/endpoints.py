@@ -1,257 +1,164 @@
 """
-Module for defining FastAPI endpoints.
+Module for defining the FastAPI endpoints of every stream in the registry.
 
 Endpoints:
-    /sine: Endpoint for generating a sine wave.
-    /cosine: Endpoint for generating a cosine wave.
-    /sawtooth: Endpoint for generating a sawtooth wave.
-    /square: Endpoint for generating a square wave.
-    /normal: Endpoint for generating a normal distribution.
-    /uniform: Endpoint for generating a uniform distribution.
-    /exponential: Endpoint for generating an exponential distribution.
+    /<stream>: Endpoint for streaming a registered stream, e.g. /sine, /normal or
+        /anomalies/clustered. The query parameters are the fields of its model.
+    /<stream>/bulk: Endpoint for returning a fixed number of data points of the
+        stream without pacing.
+
+The routes are generated from app.generators.registry, so every stream gets the
+same batching, pacing, encoding, metrics and sharing, and a stream added to the
+registry is served without writing a handler.
 """
 
+import inspect
 import logging
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.exceptions import RequestValidationError
 from fastapi.responses import StreamingResponse
-from app.generators import sine, cosine, square, sawtooth, normal, uniform, exponential
+from pydantic import ValidationError
 from app.db_utils.crud import verify_token
+from app.endpoints.streaming import bulk_response, stream_response, wire_options
+from app.generators.registry import STREAMS, StreamType
 from app.models.auth_model import TokenData
+from app.models.stream_models import BulkOptions, StreamOptions, WireOptions
 
 router = APIRouter()
 
 logger = logging.getLogger(__name__)
 
+STREAM_DOC = """
+Generate a streaming {description}.
+
+Parameters:
+- The fields of {model}, as query parameters. If not provided, default parameters
+  will be used. They include:
+    - batch_size (int): The number of data points computed and emitted per chunk.
+    - catch_up (str): How the stream catches up when behind schedule:
+      burst, skip or coalesce.
+    - seed (int): The seed of the random data, echoed in the X-Stream-Seed header.
+    - offset (int): The index of the first data point, used to resume a stream.
+- stream_options: An instance of the StreamOptions class with the delivery options:
+    - shared (bool): Whether to subscribe to one producer shared by all
+      requests with identical parameters.
+    - rate (float): Emit this many data points per second (up to 1,000,000) in
+      automatically sized blocks, overriding the interval and batch size.
+    - latency_ms (float): The longest time a data point waits when a rate is set.
+- wire: The negotiated encoding, from the Accept and Accept-Encoding headers or
+  the query parameters:
+    - format (str): text, float32, float64 or arrow.
+    - timestamps (bool): Whether to add the scheduled time of every data point.
+    - precision (int), notation (str): The number format of text streams.
+    - flush_ms (float): The longest time data waits in the compressor.
+
+Returns:
+- StreamingResponse: A streaming response containing the generated {description}.
+"""
 
-@router.get("/sine", response_class=StreamingResponse)
-async def sine_wave(
-    sine_model: sine.SineModel = Depends(),
-    token_data: TokenData = Depends(verify_token),
-):
-    """
-    Generate a streaming sine wave.
-
-    Parameters:
-    - sine_model: An instance of the SineModel class defining the parameters
-    of the sine wave to be generated. If not provided, default parameters will be used.
-    The parameters include:
-        - amplitude (float): The distance from height of a peak to center line.
-        - frequency (float): The number of cycles per second of the sine wave (in Hertz).
-        - phase (int): The offset of the sine wave (in degrees).
-        - sample_rate (int): The frequency of generated data points in samples per second.
-        - interval (float): The time interval between data points (in seconds).
-
-    Returns:
-    - StreamingResponse: A streaming response containing the generated sine wave data.
-    """
-    try:
-        logger.info(
-            "Generating sine wave for user '%s' with parameters: %s",
-            token_data.username,
-            sine_model,
-        )
-        return StreamingResponse(
-            sine.generate_sine_data(sine_model), media_type="text/event-stream"
-        )
-    except Exception as error:
-        logger.error("An error occurred while generating sine wave: %s", error)
-        raise HTTPException(status_code=500, detail=str(error)) from error
-
-
-@router.get("/cosine", response_class=StreamingResponse)
-async def cosine_wave(
-    cosine_model: cosine.CosineModel = Depends(),
-    token_data: TokenData = Depends(verify_token),
-):
-    """
-    Generate a streaming cosine wave.
-
-    Parameters:
-    - cosine_model: An instance of the CosineModel class defining the parameters
-      of the cosine wave to be generated. If not provided, default parameters will be used.
-      The parameters include:
-        - amplitude (float): The distance from height of a peak to center line.
-        - frequency (float): The number of cycles per second of the cosine wave (in Hertz).
-        - phase (int): The offset of the cosine wave (in degrees).
-        - sample_rate (int): The frequency of generated data points in samples per second.
-        - interval (float): The time interval between data points in seconds.
-
-    Returns:
-    - StreamingResponse: A streaming response containing the generated cosine wave data.
-    """
-    try:
-        logger.info(
-            "Generating cosine wave for user '%s' with parameters: %s",
-            token_data.username,
-            cosine_model,
-        )
-        return StreamingResponse(
-            cosine.generate_cosine_data(cosine_model), media_type="text/event-stream"
-        )
-    except Exception as error:
-        raise HTTPException(status_code=500, detail=str(error)) from error
-
-
-@router.get("/sawtooth", response_class=StreamingResponse)
-async def sawtooth_wave(
-    sawtooth_model: sawtooth.SawtoothModel = Depends(),
-    token_data: TokenData = Depends(verify_token),
-):
-    """
-    Generate a streaming sawtooth wave.
-
-    Parameters:
-    - sawtooth_model : An instance of the SawtoothModel class defining the parameters
-      of the sawtooth wave to be generated. If not provided, default parameters will be used.
-      The parameters include:
-        - amplitude (float): The distance from height of a peak to center line.
-        - frequency (float): The number of cycles per second of the sawtooth wave (in Hertz).
-        - sample_rate (int): The frequency of generated data points in samples per second.
-        - interval (float): The time interval between data points (in seconds).
-
-    Returns:
-    - StreamingResponse: A streaming response containing the generated sawtooth wave data.
-    """
-    try:
-        logger.info(
-            "Generating sawtooth wave for user '%s' with parameters: %s",
-            token_data.username,
-            sawtooth_model,
-        )
-        return StreamingResponse(
-            sawtooth.generate_sawtooth_data(sawtooth_model),
-            media_type="text/event-stream",
-        )
-    except Exception as error:
-        raise HTTPException(status_code=500, detail=str(error)) from error
-
-
-@router.get("/square", response_class=StreamingResponse)
-async def square_wave(
-    square_model: square.SquareModel = Depends(),
-    token_data: TokenData = Depends(verify_token),
-):
-    """
-    Generate a streaming square wave.
-
-    Parameters:
-    - square_model: An instance of the SquareModel class defining the parameters
-      of the square wave to be generated. If not provided, default parameters will be used.
-      The parameters include:
-        - frequency (float): The number of cycles per second of the square wave (in Hertz).
-        - sample_rate (int): The frequency of generated data points in samples per second.
-        - interval (float): The time interval between data points (in seconds).
-
-    Returns:
-    - StreamingResponse: A streaming response containing the generated square wave data.
-    """
-    try:
-        logger.info(
-            "Generating square wave for user '%s' with parameters: %s",
-            token_data.username,
-            square_model,
-        )
-        return StreamingResponse(
-            square.generate_square_data(square_model), media_type="text/event-stream"
-        )
-    except Exception as error:
-        raise HTTPException(status_code=500, detail=str(error)) from error
-
-
-@router.get("/normal", response_class=StreamingResponse)
-async def normal_wave(
-    normal_model: normal.NormalModel = Depends(),
-    token_data: TokenData = Depends(verify_token),
-):
-    """
-    Generate a streaming normal distribution.
-
-    Parameters:
-    - normal_model: An instance of the NormalModel class defining the parameters
-      of the normal distribution to be generated. If not provided, default parameters will be used.
-      The parameters include:
-        - mean (float): The mean of the normal distribution.
-        - std_dev (float): The standard deviation of the normal distribution.
-        - interval (float): The time interval between data points in seconds.
-
-    Returns:
-    - StreamingResponse: A streaming response containing the generated normal distribution data.
-    """
-    try:
-        logger.info(
-            "Generating normal distribution for user '%s' with parameters: %s",
-            token_data.username,
-            normal_model,
-        )
-        return StreamingResponse(
-            normal.generate_normal_data(normal_model), media_type="text/event-stream"
-        )
-    except Exception as error:
-        raise HTTPException(status_code=500, detail=str(error)) from error
+BULK_DOC = """
+Generate a fixed number of data points of {description} immediately, without pacing.
+
+Parameters:
+- The fields of {model}, as query parameters, taking the same parameters as /{name}.
+- bulk_options: An instance of the BulkOptions class. Exactly one of:
+    - count (int): The number of data points to return.
+    - duration (float): The length of stream time to return, in seconds.
+- wire: The negotiated encoding, from the Accept and Accept-Encoding headers or
+  the query parameters:
+    - format (str): text, float32, float64 or arrow.
+    - timestamps (bool): Whether to add the scheduled time of every data point.
+    - precision (int), notation (str): The number format of text streams.
+    - flush_ms (float): The longest time data waits in the compressor.
+
+Returns:
+- StreamingResponse: A response streaming the data points as fast as the client reads.
+"""
 
 
-@router.get("/uniform", response_class=StreamingResponse)
-async def uniform_wave(
-    uniform_model: uniform.UniformModel = Depends(),
-    token_data: TokenData = Depends(verify_token),
-):
+def add_stream_routes(api_router: APIRouter, name: str, stream_type: StreamType):
     """
-    Generate a streaming uniform distribution.
-
-    Parameters:
-    - uniform_model: An instance of the UniformModel class defining the parameters
-      of the uniform distribution to be generated. If not provided, default parameters will be used.
-      The parameters include:
-        - min_val (float): The minimum value of the uniform distribution.
-        - max_val (float): The maximum value of the uniform distribution.
-        - interval (float): The time interval between data points in seconds.
+    Add the stream and bulk endpoints of a registered stream to a router.
 
-    Returns:
-    - StreamingResponse: A streaming response containing the generated uniform distribution data.
+    Args:
+        api_router (APIRouter): The router to add the endpoints to.
+        name (str): The name of the stream, which is also its path.
+        stream_type (StreamType): The parts of the stream.
     """
-    try:
+    model_type = stream_type.model
+    description = stream_type.description
+    route_name = name.replace("/", "_").replace("-", "_")
+    doc = {"description": description, "model": model_type.__name__, "name": name}
+
+    def parse_model(**params):
+        # Errors of the model validators are request errors, answered with 422
+        try:
+            return model_type(**params)
+        except ValidationError as error:
+            raise RequestValidationError(
+                [{**detail, "loc": ("query", *detail["loc"])} for detail in error.errors()]
+            ) from error
+
+    parse_model.__signature__ = inspect.signature(model_type)
+
+    async def stream_endpoint(
+        model: model_type = Depends(parse_model),
+        stream_options: StreamOptions = Depends(),
+        wire: WireOptions = Depends(wire_options),
+        token_data: TokenData = Depends(verify_token),
+    ):
+        try:
+            logger.info(
+                "Generating %s for user '%s' with parameters: %s",
+                description,
+                token_data.username,
+                model,
+            )
+            return stream_response(stream_type.generator, model, stream_options, wire)
+        except HTTPException:
+            raise
+        except Exception as error:
+            logger.error("An error occurred while generating %s: %s", description, error)
+            raise HTTPException(status_code=500, detail=str(error)) from error
+
+    async def bulk_endpoint(
+        model: model_type = Depends(parse_model),
+        bulk_options: BulkOptions = Depends(),
+        wire: WireOptions = Depends(wire_options),
+        token_data: TokenData = Depends(verify_token),
+    ):
         logger.info(
-            "Generating uniform distribution for user '%s' with parameters: %s",
+            "Generating bulk %s for user '%s' with parameters: %s, %s",
+            description,
             token_data.username,
-            uniform_model,
+            model,
+            bulk_options,
         )
-        return StreamingResponse(
-            uniform.generate_uniform_data(uniform_model), media_type="text/event-stream"
+        return bulk_response(
+            stream_type.samples, model, model.sample_interval, bulk_options, wire
         )
-    except Exception as error:
-        raise HTTPException(status_code=500, detail=str(error)) from error
 
-
-@router.get("/exponential", response_class=StreamingResponse)
-async def exponential_wave(
-    exponential_model: exponential.ExponentialModel = Depends(),
-    token_data: TokenData = Depends(verify_token),
-):
-    """
-    Generate a streaming exponential distribution.
-
-    Parameters:
-    - exponential_model: An instance of the ExponentialModel class defining the parameters
-      of the exponential distribution to be generated.
-      If not provided, default parameters will be used.
-      The parameters include:
-        - scale (float): The inverse of the rate parameter controlling
-                        the rate at which events occur.
-        - interval (float): The time interval between data points in seconds.
-
-    Returns:
-    - StreamingResponse: A streaming response containing the generated
-                        exponential distribution data.
-    """
-    try:
-        logger.info(
-            "Generating exponential distribution for user '%s' with parameters: %s",
-            token_data.username,
-            exponential_model,
-        )
-        return StreamingResponse(
-            exponential.generate_exponential_data(exponential_model),
-            media_type="text/event-stream",
-        )
-    except Exception as error:
-        raise HTTPException(status_code=500, detail=str(error)) from error
+    api_router.add_api_route(
+        f"/{name}",
+        stream_endpoint,
+        methods=["GET"],
+        response_class=StreamingResponse,
+        name=f"{route_name}_stream",
+        operation_id=f"{route_name}_stream",
+        summary=f"Stream {description}",
+        description=STREAM_DOC.format(**doc),
+    )
+    api_router.add_api_route(
+        f"/{name}/bulk",
+        bulk_endpoint,
+        methods=["GET"],
+        response_class=StreamingResponse,
+        name=f"{route_name}_bulk",
+        operation_id=f"{route_name}_bulk",
+        summary=f"Bulk {description}",
+        description=BULK_DOC.format(**doc),
+    )
+
+
+for stream, registered in STREAMS.items():
+    add_stream_routes(router, stream, registered)
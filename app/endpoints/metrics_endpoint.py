@@ -0,0 +1,28 @@
+"""
+Module for defining the FastAPI endpoint exposing the server metrics.
+
+Endpoints:
+    /metrics: Endpoint for scraping the metrics in the Prometheus text format.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.stream_utils.metrics import REGISTRY
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Expose the server metrics in the Prometheus text format: the active streams,
+    data points and bytes sent, pacing lag, frame compute time and lifetime per
+    stream, and the latency of the auth endpoints.
+
+    Returns:
+        PlainTextResponse: The current value of every metric.
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,291 @@
+"""
+Module for building the streaming responses returned by the data endpoints.
+"""
+
+import math
+from typing import AsyncIterator, Callable, Optional
+
+from fastapi import Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from app.models.stream_models import (
+    MAX_BULK_COUNT,
+    BulkOptions,
+    StreamModel,
+    StreamOptions,
+    WireOptions,
+)
+from app.stream_utils.broadcast import open_stream
+from app.stream_utils.bulk import generate_bulk_data
+from app.stream_utils.compression import (
+    FLUSH_INTERVAL,
+    StreamCompressor,
+    compress_stream,
+    negotiate_encoding,
+)
+from app.stream_utils.encoders import (
+    FrameEncoder,
+    WireFormat,
+    arrow_available,
+    make_encoder,
+    negotiate_format,
+)
+from app.stream_utils.metrics import ResponseMeter, stream_name
+from app.stream_utils.pacing import block_size_for
+from app.stream_utils.sample_buffer import new_seed
+from app.stream_utils.text_format import Notation
+
+SEED_HEADER = "X-Stream-Seed"
+RATE_HEADER = "X-Stream-Rate"
+BLOCK_SIZE_HEADER = "X-Stream-Block-Size"
+
+
+def wire_options(
+    wire_format: Optional[WireFormat] = Query(
+        default=None,
+        alias="format",
+        description="The wire format: text, float32, float64 or arrow. "
+        "Overrides the Accept header.",
+    ),
+    timestamps: bool = Query(
+        default=False,
+        description="Add the scheduled time of every data point as a column. "
+        "Binary formats only.",
+    ),
+    precision: int = Query(
+        default=3, ge=0, le=15, description="The number of decimals of text streams."
+    ),
+    notation: Notation = Query(
+        default=Notation.FIXED, description="The notation of text streams: fixed or scientific."
+    ),
+    flush_ms: float = Query(
+        default=FLUSH_INTERVAL * 1000,
+        ge=0,
+        le=10000,
+        description="The longest time data waits in the compressor, in milliseconds.",
+    ),
+    accept: Optional[str] = Header(default=None),
+    accept_encoding: Optional[str] = Header(default=None),
+) -> WireOptions:
+    """
+    Negotiate the wire format of a response from the format parameter and the
+    Accept header, and its compression from the Accept-Encoding header.
+
+    Args:
+        wire_format (Optional[WireFormat]): The format given as a query parameter.
+        timestamps (bool): Whether to add a timestamp column.
+        precision (int): The number of decimals of text streams.
+        notation (Notation): The notation of text streams.
+        flush_ms (float): The flush interval of a compressed stream, in milliseconds.
+        accept (Optional[str]): The Accept header of the request.
+        accept_encoding (Optional[str]): The Accept-Encoding header of the request.
+
+    Returns:
+        WireOptions: The negotiated encoding.
+
+    Raises:
+        HTTPException: If Arrow is requested but pyarrow is not installed.
+    """
+    negotiated = negotiate_format(wire_format, accept)
+    if negotiated == WireFormat.ARROW and not arrow_available():
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail="The arrow format requires the pyarrow package on the server",
+        )
+    return WireOptions(
+        format=negotiated,
+        timestamps=timestamps,
+        precision=precision,
+        notation=notation,
+        encoding=negotiate_encoding(accept_encoding),
+        flush_interval=flush_ms / 1000,
+    )
+
+
+async def encode_stream(
+    frames: AsyncIterator,
+    encoder: FrameEncoder,
+    stream: str = "unknown",
+    endpoint: str = "stream",
+):
+    """
+    Encode the frames of a stream into response chunks, counting what is sent.
+
+    Args:
+        frames (AsyncIterator): The frames of the stream.
+        encoder (FrameEncoder): The encoder of the response.
+        stream (str, optional): The stream label of the response metrics.
+        endpoint (str, optional): The endpoint label of the response metrics,
+            stream or bulk.
+
+    Yields:
+        Union[str, bytes]: The encoded chunks, followed by the trailer of the format
+            once a finite stream is complete.
+    """
+    meter = ResponseMeter(stream, endpoint)
+    try:
+        async for frame in frames:
+            chunk = encoder.encode(frame)
+            meter.sent(len(frame.values), chunk)
+            yield chunk
+        trailer = encoder.finish()
+        if trailer:
+            meter.sent(0, trailer)
+            yield trailer
+    finally:
+        meter.close()
+        await frames.aclose()
+
+
+def encoded_response(
+    chunks: AsyncIterator, media_type: str, headers: dict, wire: WireOptions
+) -> StreamingResponse:
+    """
+    Wrap the encoded chunks of a stream in a response, compressing them if the
+    client accepts a content encoding.
+
+    Args:
+        chunks (AsyncIterator): The encoded chunks of the stream.
+        media_type (str): The media type of the stream.
+        headers (dict): The response headers.
+        wire (WireOptions): The negotiated encoding.
+
+    Returns:
+        StreamingResponse: The response.
+    """
+    if wire.encoding is not None:
+        chunks = compress_stream(chunks, StreamCompressor(wire.encoding), wire.flush_interval)
+        headers = {**headers, "Content-Encoding": wire.encoding, "Vary": "Accept-Encoding"}
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
+
+
+def paced_at_rate(model: StreamModel, stream_options: StreamOptions) -> StreamModel:
+    """
+    Set the interval of a stream to the requested rate, with the batch size chosen
+    from the rate and the latency budget.
+
+    Args:
+        model (StreamModel): The model holding the stream parameters.
+        stream_options (StreamOptions): The delivery options with the rate.
+
+    Returns:
+        StreamModel: A copy of the model paced at the rate.
+    """
+    interval_field = "data_interval" if "data_interval" in type(model).model_fields else "interval"
+    return model.model_copy(
+        update={
+            interval_field: 1 / stream_options.rate,
+            "batch_size": block_size_for(stream_options.rate, stream_options.latency_ms / 1000),
+        }
+    )
+
+
+def stream_response(
+    generator: Callable,
+    model: StreamModel,
+    stream_options: StreamOptions,
+    wire: Optional[WireOptions] = None,
+) -> StreamingResponse:
+    """
+    Build the streaming response for a data stream.
+
+    A private stream requested without a seed gets a fresh one. The seed is
+    returned in the X-Stream-Seed header, so the client can reproduce the stream or
+    resume it by passing the seed back together with the offset it stopped at.
+
+    With a rate, the stream is paced at that many data points per second in blocks
+    sized for the latency budget, and the rate and block size are returned in the
+    X-Stream-Rate and X-Stream-Block-Size headers. Data point i of the stream is
+    then due at offset i / rate from the start.
+
+    Args:
+        generator (Callable): The generator function producing the stream.
+        model (StreamModel): The model holding the stream parameters.
+        stream_options (StreamOptions): The delivery options requested by the client.
+        wire (Optional[WireOptions]): The negotiated encoding. Defaults to text.
+
+    Returns:
+        StreamingResponse: The response streaming the generated data.
+    """
+    wire = wire or WireOptions()
+    if model.seed is None and not stream_options.shared:
+        model = model.model_copy(update={"seed": new_seed()})
+    headers = {SEED_HEADER: str(model.seed)} if model.seed is not None else {}
+    if stream_options.rate is not None:
+        model = paced_at_rate(model, stream_options)
+        headers[RATE_HEADER] = f"{stream_options.rate:g}"
+        headers[BLOCK_SIZE_HEADER] = str(model.batch_size)
+    encoder = make_encoder(wire.format, model.sample_interval, wire.timestamps, wire.text_format)
+    return encoded_response(
+        encode_stream(
+            open_stream(generator, model, stream_options), encoder, stream_name(generator)
+        ),
+        encoder.media_type,
+        headers,
+        wire,
+    )
+
+
+def bulk_response(
+    samples_factory: Callable,
+    model: StreamModel,
+    interval: float,
+    bulk_options: BulkOptions,
+    wire: Optional[WireOptions] = None,
+) -> StreamingResponse:
+    """
+    Build the response for a bulk request, which returns a fixed number of data points
+    immediately instead of pacing them.
+
+    Args:
+        samples_factory (Callable): The function creating the seekable source of
+            data points from the model.
+        model (StreamModel): The model holding the stream parameters.
+        interval (float): The time between data points of the stream, used to convert
+            a duration into a count.
+        bulk_options (BulkOptions): The requested count or duration.
+        wire (Optional[WireOptions]): The negotiated encoding. Defaults to text.
+
+    Returns:
+        StreamingResponse: The response streaming the data points.
+
+    Raises:
+        HTTPException: If neither or both of count and duration are given, a duration
+            is given for a stream with a zero interval, or the duration covers more
+            than MAX_BULK_COUNT data points.
+    """
+    if (bulk_options.count is None) == (bulk_options.duration is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Exactly one of count and duration must be given",
+        )
+    count = bulk_options.count
+    if count is None:
+        if interval <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="duration requires a positive stream interval",
+            )
+        points = bulk_options.duration / interval
+        if not math.isfinite(points) or points > MAX_BULK_COUNT:
+            raise HTTPException(
+                status_code=422,
+                detail=f"duration covers more than {MAX_BULK_COUNT} data points",
+            )
+        count = math.floor(points + 1e-9)
+    wire = wire or WireOptions()
+    if model.seed is None:
+        model = model.model_copy(update={"seed": new_seed()})
+    encoder = make_encoder(wire.format, interval, wire.timestamps, wire.text_format)
+    media_type = "text/plain" if wire.format == WireFormat.TEXT else encoder.media_type
+    return encoded_response(
+        encode_stream(
+            generate_bulk_data(samples_factory(model), count),
+            encoder,
+            stream_name(samples_factory),
+            "bulk",
+        ),
+        media_type,
+        {SEED_HEADER: str(model.seed)},
+        wire,
+    )
@@ -0,0 +1,163 @@
+"""
+Module for defining the WebSocket endpoint that multiplexes many streams over one
+connection.
+
+Endpoints:
+    /ws: WebSocket endpoint for subscribing to any of the data streams.
+
+Protocol:
+    The client authenticates with its token as the token query parameter or as a
+    Bearer Authorization header, then sends JSON messages:
+        {"action": "subscribe", "id": "a", "stream": "sine", "params": {...},
+         "shared": false, "overflow": "drop", "buffer": 1024}
+        {"action": "unsubscribe", "id": "a"}
+    The server answers with JSON messages tagged with the subscription ID:
+        {"event": "subscribed", "id": "a", "seed": 123}
+        {"event": "data", "id": "a", "index": 0, "values": [...], "dropped": 5}
+        {"event": "unsubscribed", "id": "a"}
+        {"event": "end", "id": "a"}
+        {"event": "error", "id": "a", "detail": "..."}
+"""
+
+import asyncio
+import json
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+from pydantic import ValidationError
+
+from app.db_utils.crud import verify_token
+from app.generators.registry import get_stream_type
+from app.models.stream_models import StreamOptions
+from app.models.websocket_models import ClientMessage, SubscribeMessage
+from app.stream_utils.broadcast import open_stream
+from app.stream_utils.multiplex import Multiplexer
+from app.stream_utils.sample_buffer import new_seed
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+def websocket_token(websocket: WebSocket) -> Optional[str]:
+    """
+    Read the access token of a WebSocket handshake.
+
+    Args:
+        websocket (WebSocket): The connecting WebSocket.
+
+    Returns:
+        Optional[str]: The token from the token query parameter or the Bearer
+            Authorization header, if any.
+    """
+    token = websocket.query_params.get("token")
+    if token:
+        return token
+    scheme, _, credentials = websocket.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and credentials:
+        return credentials
+    return None
+
+
+def open_subscription(multiplexer: Multiplexer, message: SubscribeMessage) -> dict:
+    """
+    Validate a subscribe message and start its stream.
+
+    Args:
+        multiplexer (Multiplexer): The subscriptions of the connection.
+        message (SubscribeMessage): The subscribe message.
+
+    Returns:
+        dict: The subscribed event, with the seed of the stream.
+
+    Raises:
+        ValueError: If the stream is unknown or the subscription cannot be added.
+        ValidationError: If the stream parameters are invalid.
+    """
+    stream_type = get_stream_type(message.stream)
+    model = stream_type.model(**message.params)
+    if model.seed is None and not message.shared:
+        model = model.model_copy(update={"seed": new_seed()})
+    frames = open_stream(stream_type.generator, model, StreamOptions(shared=message.shared))
+    multiplexer.subscribe(message.id, frames, message.overflow, message.buffer)
+    return {"event": "subscribed", "id": message.id, "seed": model.seed}
+
+
+async def handle_messages(websocket: WebSocket, multiplexer: Multiplexer, username: str):
+    """
+    Apply the subscribe and unsubscribe messages of a client until it disconnects.
+
+    Args:
+        websocket (WebSocket): The connected WebSocket.
+        multiplexer (Multiplexer): The subscriptions of the connection.
+        username (str): The authenticated user.
+    """
+    while True:
+        text = await websocket.receive_text()
+        subscription_id = None
+        try:
+            message = ClientMessage.validate_json(text)
+            subscription_id = message.id
+            if isinstance(message, SubscribeMessage):
+                logger.info(
+                    "Subscribing user '%s' to %s as %s with parameters: %s",
+                    username,
+                    message.stream,
+                    message.id,
+                    message.params,
+                )
+                reply = open_subscription(multiplexer, message)
+            elif multiplexer.unsubscribe(message.id):
+                reply = {"event": "unsubscribed", "id": message.id}
+            else:
+                raise ValueError(f"Unknown subscription {message.id!r}")
+        except ValidationError as error:
+            reply = {
+                "event": "error",
+                "id": subscription_id,
+                "detail": json.loads(error.json(include_url=False)),
+            }
+        except ValueError as error:
+            reply = {"event": "error", "id": subscription_id, "detail": str(error)}
+        await multiplexer.send(reply)
+
+
+@router.websocket("/ws")
+async def stream_socket(websocket: WebSocket):
+    """
+    Multiplex any number of data streams over one WebSocket.
+
+    Each subscription is paced by its own stream and buffered separately, so a
+    client that reads too slowly loses the oldest data points of that subscription
+    (reported as dropped) instead of growing server-side buffers.
+
+    Parameters:
+    - websocket: The connecting WebSocket, authenticated with the token query
+      parameter or a Bearer Authorization header.
+    """
+    token = websocket_token(websocket)
+    try:
+        if token is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+        token_data = verify_token(token)
+    except HTTPException:
+        logger.error("Rejected WebSocket connection with a missing or invalid token")
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+    logger.info("WebSocket connected for user '%s'", token_data.username)
+    multiplexer = Multiplexer(websocket.send_json)
+    sender = asyncio.create_task(multiplexer.run())
+    try:
+        await handle_messages(websocket, multiplexer, token_data.username)
+    except WebSocketDisconnect:
+        logger.info(
+            "WebSocket disconnected for user '%s' with %d subscriptions",
+            token_data.username,
+            len(multiplexer),
+        )
+    finally:
+        sender.cancel()
+        await asyncio.gather(sender, return_exceptions=True)
+        await multiplexer.close()
@@ -2,15 +2,79 @@
 Module for generating clustered anomalies occuring at random intervals.
 """
 
-import random
-import asyncio
-import logging
+import functools
+from typing import AsyncIterator, Optional
+import numpy as np
+from app.generators.anomalies.schedule import carried_run_mask, epoch_length
 from app.models.anomaly_models import ClusteredAnomalyModel
+from app.stream_utils.frames import Frame
+from app.stream_utils.pacing import paced_frames
+from app.stream_utils.sample_buffer import SampleBuffer
 
-logger = logging.getLogger(__name__)
+
+def clustered_block(
+    clustered_model: ClusteredAnomalyModel,
+    rng: np.random.Generator,
+    count: int,
+    previous_rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
+    """
+    Draws one epoch of data points with clustered anomalies.
+
+    Args:
+        clustered_model (ClusteredAnomalyModel): The model containing the parameters
+            used for generating the data.
+        rng (np.random.Generator): The random generator to draw from.
+        count (int): The number of data points to draw.
+        previous_rng (Optional[np.random.Generator]): The generator of the previous
+            epoch, whose last anomaly may continue into this one.
+
+    Returns:
+        np.ndarray: The data points.
+    """
+    is_anomaly = carried_run_mask(
+        rng,
+        previous_rng,
+        count,
+        clustered_model.minimum_interval,
+        clustered_model.maximum_interval,
+        clustered_model.min_anomaly_length,
+        clustered_model.max_anomaly_length,
+    )
+    values = np.full(count, clustered_model.constant_value, dtype=float)
+    values[is_anomaly] += rng.uniform(
+        -clustered_model.anomaly_magnitude,
+        clustered_model.anomaly_magnitude,
+        np.count_nonzero(is_anomaly),
+    )
+    return values
+
+
+def clustered_samples(clustered_model: ClusteredAnomalyModel) -> SampleBuffer:
+    """
+    Creates the seekable source of data points with clustered anomalies,
+    starting at the model offset.
+
+    Args:
+        clustered_model (ClusteredAnomalyModel): The model containing the parameters for
+            generating the data.
+
+    Returns:
+        SampleBuffer: The source of data points, seeded with the model seed.
+    """
+    return SampleBuffer(
+        functools.partial(clustered_block, clustered_model),
+        clustered_model.seed,
+        clustered_model.offset,
+        block_size=epoch_length(
+            clustered_model.maximum_interval, clustered_model.max_anomaly_length
+        ),
+        label=functools.partial(np.not_equal, clustered_model.constant_value),
+        chained=True,
+    )
 
 
-async def generate_clustered_anomalies(clustered_model: ClusteredAnomalyModel):
+def generate_clustered_anomalies(clustered_model: ClusteredAnomalyModel) -> AsyncIterator[Frame]:
     """
     Generates data points with clustered anomalies.
 
@@ -18,37 +82,9 @@ async def generate_clustered_anomalies(clustered_model: ClusteredAnomalyModel):
         clustered_model (ClusteredAnomalyModel): The model containing the parameters
             used for generating the data.
 
-    Yields:
-        str: A string representation of a data point.
+    Returns:
+        AsyncIterator[Frame]: The data points that are due.
     """
-    anomaly_countdown = random.randint(clustered_model.minimum_interval, clustered_model.maximum_interval)
-    anomaly_length = 0
-
-    try:
-        while True:
-            if anomaly_countdown <= 0:
-                anomaly_countdown = random.randint(
-                    clustered_model.minimum_interval, clustered_model.maximum_interval
-                )
-                anomaly_length = random.randint(
-                    clustered_model.min_anomaly_length,
-                    clustered_model.max_anomaly_length,
-                )
-
-            if anomaly_length > 0:
-                anomaly_value = clustered_model.constant_value + random.uniform(
-                    -clustered_model.anomaly_magnitude,
-                    clustered_model.anomaly_magnitude,
-                )
-                yield f"{anomaly_value:.3f}\n"
-                anomaly_length -= 1
-            else:
-                yield f"{clustered_model.constant_value:.3f}\n"
-                anomaly_countdown -= 1
-
-            await asyncio.sleep(clustered_model.data_interval)
-    except asyncio.CancelledError:
-        logger.info("Data generation was cancelled.")
-    except Exception as error:
-        logger.exception("Error occurred while generating data: %s", error)
-        raise
+    return paced_frames(
+        clustered_samples(clustered_model), clustered_model, "data with clustered anomalies"
+    )
@@ -1,48 +1,86 @@
 """
-Module for generating a specified number of anomalies within a fixed duration (1 hour).
+Module for generating a specified number of anomalies within a fixed duration
+(1 hour by default).
 """
 
-import random
-import asyncio
-import logging
-import itertools
+import functools
+from typing import AsyncIterator
+import numpy as np
 from app.models.anomaly_models import CountBasedAnomalyModel
+from app.stream_utils.frames import Frame
+from app.stream_utils.pacing import paced_frames
+from app.generators.anomalies.schedule import window_block_size, window_mask
+from app.stream_utils.sample_buffer import SAMPLE_BLOCK_SIZE, SampleBuffer
 
-logger = logging.getLogger(__name__)
+
+def count_based_block(
+    count_based_anomaly: CountBasedAnomalyModel, rng: np.random.Generator, count: int
+) -> np.ndarray:
+    """
+    Draws a block of whole durations of data points, each duration with its own
+    anomaly positions.
+
+    Args:
+        count_based_anomaly (CountBasedAnomalyModel): The model containing the parameters
+            used for generating the data.
+        rng (np.random.Generator): The random generator to draw from.
+        count (int): The number of data points to draw, a multiple of window_length.
+
+    Returns:
+        np.ndarray: The data points.
+    """
+    window_length = count_based_anomaly.window_length
+    is_anomaly = window_mask(
+        rng, count // window_length, window_length, count_based_anomaly.num_anomalies
+    )
+    values = np.full(count, count_based_anomaly.base_value, dtype=float)
+    values[is_anomaly] = rng.uniform(
+        count_based_anomaly.min_anomaly_range,
+        count_based_anomaly.max_anomaly_range,
+        np.count_nonzero(is_anomaly),
+    )
+    return values
+
+
+def count_based_samples(count_based_anomaly: CountBasedAnomalyModel) -> SampleBuffer:
+    """
+    Creates the seekable source of data points with the specified number of anomalies
+    per duration, starting at the model offset.
+
+    Every block holds whole durations, so the anomaly positions of a duration are
+    drawn together with its values and a resumed stream redraws the same ones.
+
+    Args:
+        count_based_anomaly (CountBasedAnomalyModel): The model containing the parameters
+            used for generating the data.
+
+    Returns:
+        SampleBuffer: The source of data points, seeded with the model seed.
+    """
+    return SampleBuffer(
+        functools.partial(count_based_block, count_based_anomaly),
+        count_based_anomaly.seed,
+        count_based_anomaly.offset,
+        block_size=window_block_size(count_based_anomaly.window_length, SAMPLE_BLOCK_SIZE),
+        label=functools.partial(np.not_equal, count_based_anomaly.base_value),
+    )
 
 
-async def generate_count_based_anomalies_data(
+def generate_count_based_anomalies_data(
     count_based_anomaly: CountBasedAnomalyModel,
-):
+) -> AsyncIterator[Frame]:
     """
-    Generates data points with specified number of anomalies within a duration of 1 hour.
+    Generates data points with specified number of anomalies within every duration.
 
     Args:
         count_based_anomaly (CountBasedAnomalyModel): The model containing the parameters
             used for generating the data.
 
-    Yields:
-        str: A string representation of a data point.
+    Returns:
+        AsyncIterator[Frame]: The data points that are due.
     """
-    try:
-        total_time_seconds = 30
-        anomaly_start_times = sorted(
-            random.sample(range(total_time_seconds), count_based_anomaly.num_anomalies)
-        )
-
-        for x in itertools.count():
-            current_time = x % total_time_seconds
-            if current_time in anomaly_start_times:
-                anomaly_value = random.uniform(
-                    count_based_anomaly.min_anomaly_range,
-                    count_based_anomaly.max_anomaly_range,
-                )
-                yield f"{anomaly_value:.3f}\n"
-            else:
-                yield f"{count_based_anomaly.base_value:.3f}\n"
-            await asyncio.sleep(count_based_anomaly.data_interval)
-    except asyncio.CancelledError:
-        logger.info("Data generation was cancelled.")
-    except Exception as error:
-        logger.exception("Error occurred while generating data: %s", error)
-        raise
+    return paced_frames(
+        count_based_samples(count_based_anomaly),
+        count_based_anomaly,
+        "data with a number of anomalies per duration",
+    )
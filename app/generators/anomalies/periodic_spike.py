@@ -1,18 +1,87 @@
 """
 Module for generateing data points with regular spikes occurring at
-specified interval within a duration of 1 hour.
+specified interval within a window, 1 hour by default.
 """
 
-import random
-import asyncio
-import logging
-import itertools
+import functools
+from typing import AsyncIterator
+import numpy as np
+from app.generators.anomalies.schedule import window_block_size
 from app.models.anomaly_models import SpikeAnomalyModel
+from app.stream_utils.frames import Frame
+from app.stream_utils.pacing import paced_frames
+from app.stream_utils.sample_buffer import SAMPLE_BLOCK_SIZE, SampleBuffer
 
-logger = logging.getLogger(__name__)
+
+def spike_window(spike_anomaly: SpikeAnomalyModel) -> np.ndarray:
+    """
+    Marks the spikes within one window. A spike falls on every spike_interval-th
+    data point of the window, except at the window boundary.
+
+    Args:
+        spike_anomaly (SpikeAnomalyModel): The model containing the parameters
+            used for generating the data.
+
+    Returns:
+        np.ndarray: True for every data point of the window with a spike.
+    """
+    current_time = (np.arange(spike_anomaly.window_length) + 1) % spike_anomaly.window_length
+    return (current_time % spike_anomaly.spike_interval == 0) & (current_time != 0)
+
+
+def periodic_spike_block(
+    spike_anomaly: SpikeAnomalyModel,
+    is_spike: np.ndarray,
+    rng: np.random.Generator,
+    count: int,
+) -> np.ndarray:
+    """
+    Draws a block of whole windows of data points with spikes at regular intervals.
+
+    Args:
+        spike_anomaly (SpikeAnomalyModel): The model containing the parameters
+            used for generating the data.
+        is_spike (np.ndarray): The spike mask of the block.
+        rng (np.random.Generator): The random generator to draw from.
+        count (int): The number of data points to draw, the length of is_spike.
+
+    Returns:
+        np.ndarray: The data points.
+    """
+    values = np.full(count, spike_anomaly.base_value, dtype=float)
+    values[is_spike] = rng.uniform(
+        spike_anomaly.min_spike_range, spike_anomaly.max_spike_range, np.count_nonzero(is_spike)
+    )
+    return values
 
 
-async def generate_periodic_spike_data(spike_anomaly: SpikeAnomalyModel):
+def periodic_spike_samples(spike_anomaly: SpikeAnomalyModel) -> SampleBuffer:
+    """
+    Creates the seekable source of data points with periodic spikes,
+    starting at the model offset.
+
+    The spike positions are the same in every window, so the mask of a block is
+    built once per stream and only the spike values are drawn per block.
+
+    Args:
+        spike_anomaly (SpikeAnomalyModel): The model containing the parameters for
+            generating the data.
+
+    Returns:
+        SampleBuffer: The source of data points, seeded with the model seed.
+    """
+    block_size = window_block_size(spike_anomaly.window_length, SAMPLE_BLOCK_SIZE)
+    is_spike = np.tile(spike_window(spike_anomaly), block_size // spike_anomaly.window_length)
+    return SampleBuffer(
+        functools.partial(periodic_spike_block, spike_anomaly, is_spike),
+        spike_anomaly.seed,
+        spike_anomaly.offset,
+        block_size=block_size,
+        label=functools.partial(np.not_equal, spike_anomaly.base_value),
+    )
+
+
+def generate_periodic_spike_data(spike_anomaly: SpikeAnomalyModel) -> AsyncIterator[Frame]:
     """
     Generates data points with spikes at regular intervals.
 
@@ -20,21 +89,9 @@ async def generate_periodic_spike_data(spike_anomaly: SpikeAnomalyModel):
         spike_anomaly (SpikeAnomalyModel): The model containing the parameters
             used for generating the data.
 
-    Yields:
-        str: A string representation of a data point.
-    """
-    try:
-        total_time_seconds = 30
-        for each_val in itertools.count():
-            current_time = (each_val + 1) % total_time_seconds
-            if current_time % spike_anomaly.spike_interval == 0 and current_time != 0:
-                spike_value = random.uniform(spike_anomaly.min_spike_range, spike_anomaly.max_spike_range)
-                yield f"{spike_value:.3f}\n"
-            else:
-                yield f"{spike_anomaly.base_value:.3f}\n"
-            await asyncio.sleep(spike_anomaly.data_interval)
-    except asyncio.CancelledError:
-        logger.info("Data generation was cancelled.")
-    except Exception as error:
-        logger.exception("Error occurred while generating data: %s", error)
-        raise
+    Returns:
+        AsyncIterator[Frame]: The data points that are due.
+    """
+    return paced_frames(
+        periodic_spike_samples(spike_anomaly), spike_anomaly, "data with periodic spikes"
+    )
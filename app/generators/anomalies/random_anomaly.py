@@ -3,16 +3,59 @@ Module for generating a continuous stream of data points with random anomalies
 based on specified parameters.
 """
 
-import random
-import asyncio
-import logging
+import functools
+from typing import AsyncIterator
+import numpy as np
+from app.generators.anomalies.schedule import bernoulli_positions
 from app.models.anomaly_models import RandomAnomalyModel
+from app.stream_utils.frames import Frame
+from app.stream_utils.pacing import paced_frames
+from app.stream_utils.sample_buffer import SampleBuffer
 
 
-logger = logging.getLogger(__name__)
+def random_anomaly_block(
+    random_anomaly: RandomAnomalyModel, rng: np.random.Generator, count: int
+) -> np.ndarray:
+    """
+    Draws a block of data points with random anomalies.
+
+    Args:
+        random_anomaly (RandomAnomalyModel): The model containing the parameters
+                                    for generating the random anomalies.
+        rng (np.random.Generator): The random generator to draw from.
+        count (int): The number of data points to draw.
+
+    Returns:
+        np.ndarray: The data points.
+    """
+    positions = bernoulli_positions(rng, count, random_anomaly.anomaly_probability)
+    values = np.full(count, random_anomaly.base_value, dtype=float)
+    values[positions] += rng.uniform(
+        -random_anomaly.anomaly_range, random_anomaly.anomaly_range, len(positions)
+    )
+    return values
+
+
+def random_anomaly_samples(random_anomaly: RandomAnomalyModel) -> SampleBuffer:
+    """
+    Creates the seekable source of data points with random anomalies, starting at the model offset.
+
+    Args:
+        random_anomaly (RandomAnomalyModel): The model containing the parameters for
+            generating the data.
+
+    Returns:
+        SampleBuffer: The source of data points, seeded with the model seed.
+    """
+    return SampleBuffer(
+        functools.partial(random_anomaly_block, random_anomaly),
+        random_anomaly.seed,
+        random_anomaly.offset,
+        label=functools.partial(np.not_equal, random_anomaly.base_value),
+    )
 
 
-async def generate_random_anomalies(random_anomaly: RandomAnomalyModel):
+def generate_random_anomalies(random_anomaly: RandomAnomalyModel) -> AsyncIterator[Frame]:
     """
     Generates data points with random anomalies.
 
@@ -20,22 +63,9 @@ async def generate_random_anomalies(random_anomaly: RandomAnomalyModel):
         random_anomaly (RandomAnomalyModel): The model containing the parameters
                                     for generating the random anomalies.
 
-    Yields:
-        str: A string representation of a data point.
+    Returns:
+        AsyncIterator[Frame]: The data points that are due.
     """
-    try:
-        while True:
-            if random.random() < random_anomaly.anomaly_probability:
-                anomaly = random.uniform(
-                    -random_anomaly.anomaly_range, random_anomaly.anomaly_range
-                )
-                anomaly_value = random_anomaly.base_value + anomaly
-            else:
-                anomaly_value = random_anomaly.base_value
-            yield f"{anomaly_value:.3f}\n"
-            await asyncio.sleep(random_anomaly.data_interval)
-    except asyncio.CancelledError:
-        logger.info("Data generation was cancelled.")
-    except Exception as error:
-        logger.exception("Error occurred while generating data: %s", error)
-        raise
+    return paced_frames(
+        random_anomaly_samples(random_anomaly), random_anomaly, "data with random anomalies"
+    )
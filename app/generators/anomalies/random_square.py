@@ -3,50 +3,84 @@ Module for generating random positive square wave anomalies with
 varying durations at irregular intervals.
 """
 
-import random
-import asyncio
-import logging
+import functools
+from typing import AsyncIterator, Optional
+import numpy as np
+from app.generators.anomalies.schedule import carried_run_mask, epoch_length
 from app.models.anomaly_models import RandomSquareModel
+from app.stream_utils.frames import Frame
+from app.stream_utils.pacing import paced_frames
+from app.stream_utils.sample_buffer import SampleBuffer
 
-logger = logging.getLogger(__name__)
 
+def random_square_block(
+    square_model: RandomSquareModel,
+    rng: np.random.Generator,
+    count: int,
+    previous_rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
+    """
+    Draws one epoch of data points with random square wave anomalies.
+
+    Args:
+        square_model (RandomSquareModel): The model containing the parameters
+            used for generating the data.
+        rng (np.random.Generator): The random generator to draw from.
+        count (int): The number of data points to draw.
+        previous_rng (Optional[np.random.Generator]): The generator of the previous
+            epoch, whose last anomaly may continue into this one.
 
-async def generate_random_square(square_model: RandomSquareModel):
+    Returns:
+        np.ndarray: The data points.
     """
-    Generates data points with random square wave anomalies.
+    is_anomaly = carried_run_mask(
+        rng,
+        previous_rng,
+        count,
+        square_model.minimum_interval,
+        square_model.maximum_interval,
+        square_model.min_anomaly_duration,
+        square_model.max_anomaly_duration,
+    )
+    anomaly_value = square_model.base_value + square_model.anomaly_magnitude
+    return np.where(is_anomaly, anomaly_value, square_model.base_value)
+
+
+def random_square_samples(square_model: RandomSquareModel) -> SampleBuffer:
+    """
+    Creates the seekable source of data points with random square wave anomalies,
+    starting at the model offset.
 
+    Args:
+        square_model (RandomSquareModel): The model containing the parameters for
+            generating the data.
 
-    Yields:
-        str: A string representation of a data point.
+    Returns:
+        SampleBuffer: The source of data points, seeded with the model seed.
     """
+    return SampleBuffer(
+        functools.partial(random_square_block, square_model),
+        square_model.seed,
+        square_model.offset,
+        block_size=epoch_length(
+            square_model.maximum_interval, square_model.max_anomaly_duration
+        ),
+        label=functools.partial(np.not_equal, square_model.base_value),
+        chained=True,
+    )
+
 
-    anomaly_countdown = random.randint(
-        square_model.minimum_interval, square_model.maximum_interval
+def generate_random_square(square_model: RandomSquareModel) -> AsyncIterator[Frame]:
+    """
+    Generates data points with random square wave anomalies.
+
+    Args:
+        square_model (RandomSquareModel): The model containing the parameters
+            used for generating the data.
+
+    Returns:
+        AsyncIterator[Frame]: The data points that are due.
+    """
+    return paced_frames(
+        random_square_samples(square_model), square_model, "data with random square wave anomalies"
     )
-    anomaly_end = 0
-
-    try:
-        while True:
-            if anomaly_countdown <= 0:
-                anomaly_countdown = random.randint(
-                    square_model.minimum_interval, square_model.maximum_interval
-                )
-                anomaly_duration = random.randint(
-                    square_model.min_anomaly_duration, square_model.max_anomaly_duration
-                )
-                anomaly_end = anomaly_duration
-
-            if anomaly_end > 0:
-                anomaly_value = square_model.base_value + square_model.anomaly_magnitude
-                yield f"{anomaly_value:.3f}\n"
-                anomaly_end -= 1
-            else:
-                yield f"{square_model.base_value:.3f}\n"
-                anomaly_countdown -= 1
-
-            await asyncio.sleep(square_model.data_interval)
-    except asyncio.CancelledError:
-        logger.info("Data generation was cancelled.")
-    except Exception as error:
-        logger.exception("Error occurred while generating data: %s", error)
-        raise
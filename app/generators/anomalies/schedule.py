@@ -0,0 +1,208 @@
+"""
+Module for drawing anomaly event schedules.
+
+Instead of deciding sample by sample whether an anomaly starts, the generators
+draw the gaps between anomalies and the lengths of the anomalies as arrays and
+fill whole runs at once, so a stretch of regular data points costs the same
+however long it is. Streams with a fixed number of anomalies per window mark the
+positions of all windows of a block in one pass.
+
+Run schedules are drawn per epoch, so a stream can be resumed at any offset by
+drawing one epoch. An epoch spans several of the longest gap and run cycles, and
+the last run of an epoch continues into the next one.
+"""
+
+import math
+
+import numpy as np
+
+from app.models.stream_models import MAX_BLOCK_SIZE
+
+# The shortest epoch, and the number of the longest cycles an epoch spans at least
+EPOCH_LENGTH = 4096
+EPOCH_CYCLES = 16
+
+
+def run_schedule(
+    rng: np.random.Generator,
+    count: int,
+    min_gap: float,
+    max_gap: float,
+    min_length: float,
+    max_length: float,
+):
+    """
+    Draw the anomaly runs within count data points.
+
+    The first run starts after a gap of regular data points and every further run
+    starts a gap after the previous one has ended. Gaps and lengths are uniform
+    integers within their bounds, both bounds included.
+
+    Args:
+        rng (np.random.Generator): The random generator to draw from.
+        count (int): The number of data points covered by the schedule.
+        min_gap (float): The minimum number of regular data points between runs.
+        max_gap (float): The maximum number of regular data points between runs.
+        min_length (float): The minimum length of a run.
+        max_length (float): The maximum length of a run.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The start index and the length of every run
+            starting before count. The last run may extend past count.
+    """
+    events = int(count // max(1, min_gap + min_length)) + 1
+    gaps = rng.integers(min_gap, max_gap, size=events, endpoint=True)
+    lengths = rng.integers(min_length, max_length, size=events, endpoint=True)
+    starts = np.cumsum(gaps)
+    starts[1:] += np.cumsum(lengths[:-1])
+    runs = np.searchsorted(starts, count)
+    return starts[:runs], lengths[:runs]
+
+
+def epoch_length(max_gap: float, max_length: float) -> int:
+    """
+    Args:
+        max_gap (float): The maximum number of regular data points between runs.
+        max_length (float): The maximum length of a run.
+
+    Returns:
+        int: The number of data points per epoch, spanning EPOCH_CYCLES of the
+            longest cycles but at most MAX_BLOCK_SIZE.
+    """
+    cycles = math.ceil(EPOCH_CYCLES * (max_gap + max_length))
+    return int(min(MAX_BLOCK_SIZE, max(EPOCH_LENGTH, cycles)))
+
+
+def carried_run_mask(
+    rng: np.random.Generator,
+    previous_rng,
+    count: int,
+    min_gap: float,
+    max_gap: float,
+    min_length: float,
+    max_length: float,
+) -> np.ndarray:
+    """
+    Mark the runs of one epoch, together with the end of the last run of the
+    previous epoch where it crosses into this one.
+
+    The schedule is the first draw from the generator of an epoch, so the schedule
+    of the previous epoch is redrawn from its generator.
+
+    Args:
+        rng (np.random.Generator): The generator of the epoch.
+        previous_rng (Optional[np.random.Generator]): The generator of the previous
+            epoch, or None for the first epoch.
+        count (int): The number of data points per epoch, at least max_gap + max_length.
+        min_gap (float): The minimum number of regular data points between runs.
+        max_gap (float): The maximum number of regular data points between runs.
+        min_length (float): The minimum length of a run.
+        max_length (float): The maximum length of a run.
+
+    Returns:
+        np.ndarray: True for every data point of the epoch inside a run.
+    """
+    bounds = (min_gap, max_gap, min_length, max_length)
+    is_run = run_mask(count, *run_schedule(rng, count, *bounds))
+    if previous_rng is not None:
+        starts, lengths = run_schedule(previous_rng, count, *bounds)
+        if len(starts):
+            is_run[:max(int(starts[-1] + lengths[-1]) - count, 0)] = True
+    return is_run
+
+
+def run_mask(count: int, starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """
+    Mark the data points covered by runs.
+
+    Args:
+        count (int): The number of data points.
+        starts (np.ndarray): The start index of every run.
+        lengths (np.ndarray): The length of every run.
+
+    Returns:
+        np.ndarray: True for every data point inside a run, clipped to count.
+    """
+    edges = np.zeros(count + 1, dtype=np.int64)
+    np.add.at(edges, starts, 1)
+    np.add.at(edges, np.minimum(starts + lengths, count), -1)
+    return np.cumsum(edges[:count]) > 0
+
+
+def bernoulli_positions(rng: np.random.Generator, count: int, probability: float) -> np.ndarray:
+    """
+    Draw the positions of independent events with the given probability per data
+    point.
+
+    The number of events is drawn from the binomial distribution and the positions
+    uniformly without replacement, which gives every data point the same,
+    independent probability. Unlike summing geometric gaps, this cannot overflow
+    for vanishingly small probabilities.
+
+    Args:
+        rng (np.random.Generator): The random generator to draw from.
+        count (int): The number of data points.
+        probability (float): The probability of an event at each data point.
+
+    Returns:
+        np.ndarray: The sorted indices of the data points with an event.
+    """
+    if probability <= 0 or count <= 0:
+        return np.empty(0, dtype=np.int64)
+    if probability >= 1:
+        return np.arange(count)
+    events = rng.binomial(count, probability)
+    return np.sort(rng.choice(count, events, replace=False))
+
+
+def window_mask(
+    rng: np.random.Generator, windows: int, window_length: int, per_window: int
+) -> np.ndarray:
+    """
+    Mark per_window distinct data points in each of several consecutive windows.
+
+    Only the fewer of the marked and the unmarked data points are drawn, without
+    replacement, so the draws grow with the anomaly count rather than the window.
+    Few long windows draw their positions one window at a time; many short windows
+    run Floyd's algorithm across all windows at once.
+
+    Args:
+        rng (np.random.Generator): The random generator to draw from.
+        windows (int): The number of windows.
+        window_length (int): The number of data points per window.
+        per_window (int): The number of data points to mark per window, at most
+            window_length.
+
+    Returns:
+        np.ndarray: True for every marked data point, windows * window_length long.
+    """
+    if per_window <= 0:
+        return np.zeros(windows * window_length, dtype=bool)
+    if per_window >= window_length:
+        return np.ones(windows * window_length, dtype=bool)
+    drawn = min(per_window, window_length - per_window)
+    mask = np.zeros((windows, window_length), dtype=bool)
+    if windows <= drawn:
+        for window in mask:
+            window[rng.choice(window_length, drawn, replace=False)] = True
+    else:
+        rows = np.arange(windows)
+        for top in range(window_length - drawn, window_length):
+            picks = rng.integers(0, top, size=windows, endpoint=True)
+            picks[mask[rows, picks]] = top
+            mask[rows, picks] = True
+    if drawn < per_window:
+        np.logical_not(mask, out=mask)
+    return mask.ravel()
+
+
+def window_block_size(window_length: int, block_size: int) -> int:
+    """
+    Args:
+        window_length (int): The number of data points per window.
+        block_size (int): The preferred number of data points per block.
+
+    Returns:
+        int: The block size holding a whole number of windows, at least one.
+    """
+    return window_length * max(1, block_size // window_length)
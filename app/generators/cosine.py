@@ -2,39 +2,55 @@
 Module for generating a cosine wave data stream based on the given CosineModel parameters.
 """
 
-import asyncio
-import logging
+from typing import AsyncIterator
 import numpy as np
 from app.models.waveform_models import CosineModel
+from app.stream_utils.frames import Frame
+from app.stream_utils.pacing import paced_frames
+from app.stream_utils.waveform_tables import WaveformSamples
 
-logger = logging.getLogger(__name__)
 
-async def generate_cosine_data(cosine_model: CosineModel):
+def cosine_block(cosine_model: CosineModel, start: int, count: int) -> np.ndarray:
     """
-    Generates a cosine wave data stream based on the given Cosine model parameters.
+    Computes a block of consecutive cosine wave data points with one vectorized call.
 
     Args:
         cosine_model (CosineModel): The model containing the parameters
                                     for generating the cosine wave.
-    Yields:
-        str: A string representation of a data point in the cosine wave.
+        start (int): The time index of the first data point in the block.
+        count (int): The number of data points in the block.
+
+    Returns:
+        np.ndarray: The data points for time indices start to start + count - 1.
+    """
+    time_index = np.arange(start, start + count)
+    return cosine_model.amplitude * np.cos(
+        2 * np.pi * cosine_model.frequency * (time_index / cosine_model.sample_rate)
+    )
+
+
+def cosine_samples(cosine_model: CosineModel) -> WaveformSamples:
+    """
+    Creates the seekable source of cosine wave data points, starting at the model offset.
+
+    Args:
+        cosine_model (CosineModel): The model containing the parameters for generating
+            the cosine wave.
+
+    Returns:
+        WaveformSamples: The source of data points.
     """
+    return WaveformSamples(cosine_block, cosine_model)
 
-    time_index = 0
-    while True:
-        try:
-            data_point = cosine_model.amplitude * np.cos(
-                2 * np.pi * cosine_model.frequency * (time_index / cosine_model.sample_rate)
-            )
-            yield f"{data_point:.3f}\n"
-            await asyncio.sleep(cosine_model.interval)
-            time_index += 1
-        except ValueError as value_error:
-            logger.error("Value error occurred while generating cosine wave: %s", value_error)
-            continue
-        except asyncio.CancelledError:
-            logger.info("Cosine wave generation was cancelled.")
-            break
-        except Exception as error:
-            logger.exception("An unexpected error occurred while generating cosine wave: %s", error)
-            raise
+
+def generate_cosine_data(cosine_model: CosineModel) -> AsyncIterator[Frame]:
+    """
+    Generates a cosine wave data stream based on the given Cosine model parameters.
+
+    Args:
+        cosine_model (CosineModel): The model containing the parameters
+                                    for generating the cosine wave.
+    Returns:
+        AsyncIterator[Frame]: Frames of batch_size data points in the cosine wave.
+    """
+    return paced_frames(cosine_samples(cosine_model), cosine_model, "cosine wave")
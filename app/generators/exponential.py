@@ -3,15 +3,52 @@ Module for generating an exponential distribution data stream based on the
 given ExponentialModel parameters.
 """
 
-import asyncio
-import logging
-from scipy.stats import expon
+import functools
+from typing import AsyncIterator
+import numpy as np
 from app.models.distribution_models import ExponentialModel
+from app.stream_utils.frames import Frame
+from app.stream_utils.pacing import paced_frames
+from app.stream_utils.sample_buffer import SampleBuffer
 
-logger = logging.getLogger(__name__)
+
+def exponential_block(
+    exponential_model: ExponentialModel, rng: np.random.Generator, count: int
+) -> np.ndarray:
+    """
+    Draws a block of samples from the exponential distribution with one vectorized call.
+
+    Parameters:
+        exponential_model (ExponentialModel): The model containing the parameters for
+                                            generating the exponential data.
+        rng (np.random.Generator): The random generator to draw from.
+        count (int): The number of samples to draw.
+
+    Returns:
+        np.ndarray: The drawn samples.
+    """
+    return rng.exponential(scale=exponential_model.scale, size=count)
+
+
+def exponential_samples(exponential_model: ExponentialModel) -> SampleBuffer:
+    """
+    Creates the seekable source of exponential distribution samples, starting at the model offset.
+
+    Args:
+        exponential_model (ExponentialModel): The model containing the parameters for
+            generating the exponential data.
+
+    Returns:
+        SampleBuffer: The source of data points, seeded with the model seed.
+    """
+    return SampleBuffer(
+        functools.partial(exponential_block, exponential_model),
+        exponential_model.seed,
+        exponential_model.offset,
+    )
 
 
-async def generate_exponential_data(exponential_model: ExponentialModel):
+def generate_exponential_data(exponential_model: ExponentialModel) -> AsyncIterator[Frame]:
     """
     Generates exponential data stream based on the given Exponential model parameters.
 
@@ -19,26 +56,9 @@ async def generate_exponential_data(exponential_model: ExponentialModel):
         exponential_model (ExponentialModel): The model containing the parameters for
                                             generating the exponential data.
 
-    Yields:
-        str: A string representation of a data point in the exponential distribution.
+    Returns:
+        AsyncIterator[Frame]: The data points in the exponential distribution that are due.
     """
-    while True:
-        try:
-            data_point = expon.rvs(scale=exponential_model.scale)
-            yield f"{data_point:.3f}\n"
-            await asyncio.sleep(exponential_model.interval)
-        except ValueError as value_error:
-            logger.error(
-                "Value error occurred while generating exponential distribution: %s",
-                value_error,
-            )
-            continue
-        except asyncio.CancelledError:
-            logger.info("Exponential distribution data generation was cancelled.")
-            break
-        except Exception as error:
-            logger.exception(
-                "An unexpected error occurred while generating exponential distribution data: %s",
-                error,
-            )
-            raise
+    return paced_frames(
+        exponential_samples(exponential_model), exponential_model, "exponential distribution"
+    )
@@ -2,37 +2,57 @@
 Module for generating a normal distribution data stream based on the given NormalModel parameters.
 """
 
-import asyncio
-import logging
-from scipy.stats import norm
+import functools
+from typing import AsyncIterator
+import numpy as np
 from app.models.distribution_models import NormalModel
+from app.stream_utils.frames import Frame
+from app.stream_utils.pacing import paced_frames
+from app.stream_utils.sample_buffer import SampleBuffer
 
-logger = logging.getLogger(__name__)
+
+def normal_block(normal_model: NormalModel, rng: np.random.Generator, count: int) -> np.ndarray:
+    """
+    Draws a block of samples from the normal distribution with one vectorized call.
+
+    Args:
+        normal_model (NormalModel): The model containing the parameters for
+                                    generating the normal distribution.
+        rng (np.random.Generator): The random generator to draw from.
+        count (int): The number of samples to draw.
+
+    Returns:
+        np.ndarray: The drawn samples.
+    """
+    return rng.normal(loc=normal_model.mean, scale=normal_model.std_dev, size=count)
+
+
+def normal_samples(normal_model: NormalModel) -> SampleBuffer:
+    """
+    Creates the seekable source of normal distribution samples, starting at the model offset.
+
+    Args:
+        normal_model (NormalModel): The model containing the parameters for
+            generating the normal distribution.
+
+    Returns:
+        SampleBuffer: The source of data points, seeded with the model seed.
+    """
+    return SampleBuffer(
+        functools.partial(normal_block, normal_model),
+        normal_model.seed,
+        normal_model.offset,
+    )
 
 
-async def generate_normal_data(normal_model: NormalModel):
+def generate_normal_data(normal_model: NormalModel) -> AsyncIterator[Frame]:
     """
     Generates a normal distribution data stream based on the given Normal model parameters.
 
     Args:
         normal_model (NormalModel): The model containing the parameters for
                                     generating the normal distribution.
-    Yields:
-        str: A string representation of a data point in the normal distribution.
+    Returns:
+        AsyncIterator[Frame]: The data points in the normal distribution that are due.
     """
-    while True:
-        try:
-            data_point = norm.rvs(loc=normal_model.mean, scale=normal_model.std_dev)
-            yield f"{data_point:.3f}\n"
-            await asyncio.sleep(normal_model.interval)
-        except ValueError as value_error:
-            logger.error(
-                "Value error occurred while generating normal distribution: %s", value_error)
-            continue
-        except asyncio.CancelledError:
-            logger.info("Normal distribution data generation was cancelled.")
-            break
-        except Exception as error:
-            logger.exception(
-                "An unexpected error occurred while generating normal distribution data: %s", error)
-            raise
+    return paced_frames(normal_samples(normal_model), normal_model, "normal distribution")
@@ -0,0 +1,123 @@
+"""
+Module listing every data stream with its model, generator and sample source.
+
+Streams are named like their HTTP endpoints, e.g. sine or anomalies/clustered, and
+the stream and bulk endpoints are generated from this registry. A new kind of
+stream only needs a model, a block function computing its data points inside a
+seekable sample source, a generator pacing that source with paced_frames and an
+entry here.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Type
+
+from app.generators import sine, cosine, square, sawtooth, normal, uniform, exponential
+from app.generators.anomalies import (
+    periodic_spike,
+    clustered,
+    count_duration,
+    random_anomaly,
+    random_square,
+)
+from app.models.anomaly_models import (
+    RandomAnomalyModel,
+    RandomSquareModel,
+    ClusteredAnomalyModel,
+    SpikeAnomalyModel,
+    CountBasedAnomalyModel,
+)
+from app.models.distribution_models import NormalModel, UniformModel, ExponentialModel
+from app.models.stream_models import StreamModel
+from app.models.waveform_models import SineModel, CosineModel, SquareModel, SawtoothModel
+
+
+@dataclass(frozen=True)
+class StreamType:
+    """
+    The parts of one kind of data stream.
+
+    Attributes:
+        model (Type[StreamModel]): The model holding the stream parameters.
+        generator (Callable): The paced generator of the stream.
+        samples (Callable): The function creating the seekable sample source.
+        description (str): What the stream generates, e.g. sine wave.
+    """
+    model: Type[StreamModel]
+    generator: Callable
+    samples: Callable
+    description: str
+
+
+STREAMS = {
+    "sine": StreamType(SineModel, sine.generate_sine_data, sine.sine_samples, "sine wave"),
+    "cosine": StreamType(
+        CosineModel, cosine.generate_cosine_data, cosine.cosine_samples, "cosine wave"
+    ),
+    "sawtooth": StreamType(
+        SawtoothModel, sawtooth.generate_sawtooth_data, sawtooth.sawtooth_samples, "sawtooth wave"
+    ),
+    "square": StreamType(
+        SquareModel, square.generate_square_data, square.square_samples, "square wave"
+    ),
+    "normal": StreamType(
+        NormalModel, normal.generate_normal_data, normal.normal_samples, "normal distribution"
+    ),
+    "uniform": StreamType(
+        UniformModel,
+        uniform.generate_uniform_data,
+        uniform.uniform_samples,
+        "uniform distribution",
+    ),
+    "exponential": StreamType(
+        ExponentialModel,
+        exponential.generate_exponential_data,
+        exponential.exponential_samples,
+        "exponential distribution",
+    ),
+    "anomalies/random": StreamType(
+        RandomAnomalyModel,
+        random_anomaly.generate_random_anomalies,
+        random_anomaly.random_anomaly_samples,
+        "data with random anomalies",
+    ),
+    "anomalies/random-square": StreamType(
+        RandomSquareModel,
+        random_square.generate_random_square,
+        random_square.random_square_samples,
+        "data with random square wave anomalies",
+    ),
+    "anomalies/clustered": StreamType(
+        ClusteredAnomalyModel,
+        clustered.generate_clustered_anomalies,
+        clustered.clustered_samples,
+        "data with clustered anomalies",
+    ),
+    "anomalies/periodic-spike": StreamType(
+        SpikeAnomalyModel,
+        periodic_spike.generate_periodic_spike_data,
+        periodic_spike.periodic_spike_samples,
+        "data with periodic spikes",
+    ),
+    "anomalies/count-per-duration": StreamType(
+        CountBasedAnomalyModel,
+        count_duration.generate_count_based_anomalies_data,
+        count_duration.count_based_samples,
+        "data with a number of anomalies per duration",
+    ),
+}
+
+
+def get_stream_type(name: str) -> StreamType:
+    """
+    Args:
+        name (str): The name of the stream.
+
+    Returns:
+        StreamType: The parts of the stream.
+
+    Raises:
+        ValueError: If there is no stream of that name.
+    """
+    if name not in STREAMS:
+        raise ValueError(f"Unknown stream {name!r}")
+    return STREAMS[name]
@@ -2,15 +2,53 @@
 Module for generating a sawtooth wave data stream based on the given SawtoothModel parameters.
 """
 
-import asyncio
-import logging
+from typing import AsyncIterator
 import numpy as np
 from app.models.waveform_models import SawtoothModel
+from app.stream_utils.frames import Frame
+from app.stream_utils.pacing import paced_frames
+from app.stream_utils.waveform_tables import WaveformSamples
 
-logger = logging.getLogger(__name__)
 
+def sawtooth_block(sawtooth_model: SawtoothModel, start: int, count: int) -> np.ndarray:
+    """
+    Computes a block of consecutive sawtooth wave data points with one vectorized call.
+
+    Args:
+        sawtooth_model (SawtoothModel): The model containing the parameters for
+                                        generating the Sawtooth distribution.
+        start (int): The time index of the first data point in the block.
+        count (int): The number of data points in the block.
 
-async def generate_sawtooth_data(sawtooth_model: SawtoothModel):
+    Returns:
+        np.ndarray: The data points for time indices start to start + count - 1.
+    """
+    time_index = np.arange(start, start + count)
+    cycles = (
+        2 * np.pi *
+        sawtooth_model.frequency *
+        (time_index / sawtooth_model.sample_rate)
+    )
+    return sawtooth_model.amplitude * (cycles - np.floor(cycles))
+
+
+def sawtooth_samples(sawtooth_model: SawtoothModel) -> WaveformSamples:
+    """
+    Creates the seekable source of sawtooth wave data points, starting at the model offset.
+
+    The sawtooth wave does not repeat at integer time indices, so it is never tabulated.
+
+    Args:
+        sawtooth_model (SawtoothModel): The model containing the parameters for generating
+            the sawtooth wave.
+
+    Returns:
+        WaveformSamples: The source of data points.
+    """
+    return WaveformSamples(sawtooth_block, sawtooth_model, tabulate=False)
+
+
+def generate_sawtooth_data(sawtooth_model: SawtoothModel) -> AsyncIterator[Frame]:
     """
     Generates a sawtooth wave data stream based on the given Sawtooth model parameters.
 
@@ -18,30 +56,7 @@ async def generate_sawtooth_data(sawtooth_model: SawtoothModel):
         sawtooth_model (SawtoothModel): The model containing the parameters for
                                         generating the Sawtooth distribution.
 
-    Yields:
-        str: A string representation of a data point in the Sawtooth distribution.
+    Returns:
+        AsyncIterator[Frame]: Frames of batch_size data points in the Sawtooth distribution.
     """
-
-    time_index = 0
-    while True:
-        try:
-            cycles = (
-                2 * np.pi *
-                sawtooth_model.frequency *
-                (time_index / sawtooth_model.sample_rate)
-            )
-            data_point = sawtooth_model.amplitude * (cycles - np.floor(cycles))
-            yield f"{data_point:.3f}\n"
-            await asyncio.sleep(sawtooth_model.interval)
-            time_index += 1
-        except ValueError as value_error:
-            logger.error(
-                "Value error occurred while generating sawtooth wave: %s", value_error
-            )
-            continue
-        except asyncio.CancelledError:
-            logger.info("Sawtooth wave generation was cancelled.")
-            break
-        except Exception as error:
-            logger.exception("An unexpected error occurred while generating sawtooth wave: %s", error)
-            raise
+    return paced_frames(sawtooth_samples(sawtooth_model), sawtooth_model, "sawtooth wave")
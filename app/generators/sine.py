@@ -2,44 +2,55 @@
 Module for generating a sine wave data stream based on the given SineModel parameters.
 """
 
-import asyncio
-import logging
+from typing import AsyncIterator
 import numpy as np
 from app.models.waveform_models import SineModel
+from app.stream_utils.frames import Frame
+from app.stream_utils.pacing import paced_frames
+from app.stream_utils.waveform_tables import WaveformSamples
 
 
-logger = logging.getLogger(__name__)
+def sine_block(sine_model: SineModel, start: int, count: int) -> np.ndarray:
+    """
+    Computes a block of consecutive sine wave data points with one vectorized call.
+
+    Args:
+        sine_model (SineModel): The model containing the parameters for generating the sine wave.
+        start (int): The time index of the first data point in the block.
+        count (int): The number of data points in the block.
+
+    Returns:
+        np.ndarray: The data points for time indices start to start + count - 1.
+    """
+    time_index = np.arange(start, start + count)
+    return sine_model.amplitude * np.sin(
+        2 * np.pi * sine_model.frequency * (time_index / sine_model.sample_rate)
+        + sine_model.phase
+    )
+
 
+def sine_samples(sine_model: SineModel) -> WaveformSamples:
+    """
+    Creates the seekable source of sine wave data points, starting at the model offset.
+
+    Args:
+        sine_model (SineModel): The model containing the parameters for generating
+            the sine wave.
 
-async def generate_sine_data(sine_model: SineModel):
+    Returns:
+        WaveformSamples: The source of data points.
+    """
+    return WaveformSamples(sine_block, sine_model)
+
+
+def generate_sine_data(sine_model: SineModel) -> AsyncIterator[Frame]:
     """
     Generates a sine wave data stream based on the given Sine model parameters.
 
     Args:
         sine_model (SineModel): The model containing the parameters for generating the sine wave.
 
-    Yields:
-        str: A string representation of a data point in the sine wave.
+    Returns:
+        AsyncIterator[Frame]: Frames of batch_size data points in the sine wave.
     """
-
-    time_index = 0
-    while True:
-        try:
-            data_point = sine_model.amplitude * np.sin(
-                2 * np.pi * sine_model.frequency * (time_index / sine_model.sample_rate)
-                + sine_model.phase
-            )
-            yield f"{data_point:.3f}\n"
-            await asyncio.sleep(sine_model.interval)
-            time_index += 1
-        except ValueError as value_error:
-            logger.error(
-                "Value error occurred while generating sine wave: %s", value_error
-            )
-            continue
-        except asyncio.CancelledError:
-            logger.info("Sine wave generation was cancelled.")
-            break
-        except Exception as error:
-            logger.exception("An unexpected error occurred while generating sine wave: %s", error)
-            raise
+    return paced_frames(sine_samples(sine_model), sine_model, "sine wave")
@@ -2,16 +2,56 @@
 Module for generating a square wave data stream based on the given SquareModel parameters.
 """
 
-import asyncio
-import logging
+from typing import AsyncIterator
 import numpy as np
-from scipy.signal import square
 from app.models.waveform_models import SquareModel
+from app.stream_utils.frames import Frame
+from app.stream_utils.pacing import paced_frames
+from app.stream_utils.waveform_tables import WaveformSamples, waveform_period
 
-logger = logging.getLogger(__name__)
+
+def square_block(square_model: SquareModel, start: int, count: int) -> np.ndarray:
+    """
+    Computes a block of consecutive square wave data points with one vectorized call.
+
+    For a waveform that repeats every period data points, the time indices are
+    reduced to one period first. The half-period edges then fall on the same side
+    at every index, and the formula agrees with the lookup table built from the
+    first period.
+
+    Args:
+        square_model (SquareModel): The model containing the parameters for
+                                    generating the square wave.
+        start (int): The time index of the first data point in the block.
+        count (int): The number of data points in the block.
+
+    Returns:
+        np.ndarray: The data points for time indices start to start + count - 1.
+    """
+    time_index = np.arange(start, start + count)
+    period = waveform_period(square_model.frequency, square_model.sample_rate)
+    if period is not None:
+        time_index %= period
+    phase = 2 * np.pi * square_model.frequency * (time_index / square_model.sample_rate)
+    # High for the first half of every period, as scipy.signal.square with duty 0.5
+    return np.where(np.mod(phase, 2 * np.pi) < np.pi, 1.0, -1.0)
+
+
+def square_samples(square_model: SquareModel) -> WaveformSamples:
+    """
+    Creates the seekable source of square wave data points, starting at the model offset.
+
+    Args:
+        square_model (SquareModel): The model containing the parameters for generating
+            the square wave.
+
+    Returns:
+        WaveformSamples: The source of data points.
+    """
+    return WaveformSamples(square_block, square_model)
 
 
-async def generate_square_data(square_model: SquareModel):
+def generate_square_data(square_model: SquareModel) -> AsyncIterator[Frame]:
     """
     Generates square wave data based on the given Square model parameters.
 
@@ -19,28 +59,7 @@ async def generate_square_data(square_model: SquareModel):
         square_model (SquareModel): The model containing the parameters for
                                     generating the square wave.
 
-    Yields:
-        str: A string representation of a data point in the square wave.
+    Returns:
+        AsyncIterator[Frame]: Frames of batch_size data points in the square wave.
     """
-    time_index = 0
-    while True:
-        try:
-            data_point = square(
-                2 * np.pi *
-                square_model.frequency *
-                (time_index / square_model.sample_rate)
-            )
-            yield f"{data_point:.3f}\n"
-            await asyncio.sleep(square_model.interval)
-            time_index += 1
-        except ValueError as value_error:
-            logger.error(
-                "Value error occurred while generating square wave: %s", value_error
-            )
-            continue
-        except asyncio.CancelledError:
-            logger.info("Square wave generation was cancelled.")
-            break
-        except Exception as error:
-            logger.exception("An unexpected error occurred while generating square wave: %s", error)
-            raise
+    return paced_frames(square_samples(square_model), square_model, "square wave")
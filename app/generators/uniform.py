@@ -3,15 +3,55 @@ Module for generating an uniform distribution data stream based on
 the given UniformModel parameters.
 """
 
-import asyncio
-import logging
-from scipy.stats import uniform
+import functools
+from typing import AsyncIterator
+import numpy as np
 from app.models.distribution_models import UniformModel
+from app.stream_utils.frames import Frame
+from app.stream_utils.pacing import paced_frames
+from app.stream_utils.sample_buffer import SampleBuffer
 
-logger = logging.getLogger(__name__)
+
+def uniform_block(uniform_model: UniformModel, rng: np.random.Generator, count: int) -> np.ndarray:
+    """
+    Draws a block of samples from the uniform distribution with one vectorized call.
+
+    Args:
+        uniform_model (UniformModel): The model containing the parameters for
+                                        generating the uniform data.
+        rng (np.random.Generator): The random generator to draw from.
+        count (int): The number of samples to draw.
+
+    Returns:
+        np.ndarray: The drawn samples.
+
+    Raises:
+        ValueError: If max_val is smaller than min_val.
+    """
+    if uniform_model.max_val < uniform_model.min_val:
+        raise ValueError("max_val must not be smaller than min_val")
+    return rng.uniform(low=uniform_model.min_val, high=uniform_model.max_val, size=count)
+
+
+def uniform_samples(uniform_model: UniformModel) -> SampleBuffer:
+    """
+    Creates the seekable source of uniform distribution samples, starting at the model offset.
+
+    Args:
+        uniform_model (UniformModel): The model containing the parameters for
+            generating the uniform data.
+
+    Returns:
+        SampleBuffer: The source of data points, seeded with the model seed.
+    """
+    return SampleBuffer(
+        functools.partial(uniform_block, uniform_model),
+        uniform_model.seed,
+        uniform_model.offset,
+    )
 
 
-async def generate_uniform_data(uniform_model: UniformModel):
+def generate_uniform_data(uniform_model: UniformModel) -> AsyncIterator[Frame]:
     """
     Generates a uniform distribution data based on the provided Uniform model parameters.
 
@@ -19,29 +59,7 @@ async def generate_uniform_data(uniform_model: UniformModel):
         uniform_model (UniformModel): The model containing the parameters for
                                         generating the uniform data.
 
-    Yields:
-        str: A string representation of a data point in the uniform distribution.
+    Returns:
+        AsyncIterator[Frame]: The data points in the uniform distribution that are due.
     """
-    while True:
-        try:
-            data_point = uniform.rvs(
-                loc=uniform_model.min_val,
-                scale=uniform_model.max_val - uniform_model.min_val,
-            )
-            yield f"{data_point:.3f}\n"
-            await asyncio.sleep(uniform_model.interval)
-        except ValueError as value_error:
-            logger.error(
-                "Value error occurred while generating uniform distribution: %s",
-                value_error,
-            )
-            continue
-        except asyncio.CancelledError:
-            logger.info("Uniform distribution data generation was cancelled.")
-            break
-        except Exception as error:
-            logger.exception(
-                "An unexpected error occurred while generating uniform distribution data: %s",
-                error,
-            )
-            raise
+    return paced_frames(uniform_samples(uniform_model), uniform_model, "uniform distribution")
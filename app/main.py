@@ -1,9 +1,14 @@
 """
 Main module for the Streaming Data Generator application.
 """
+import time
+
+IMPORT_STARTED = time.perf_counter()
+
 import os
 import sys
 import logging
+from contextlib import asynccontextmanager
 
 import uvicorn
 from apitally.fastapi import ApitallyMiddleware
@@ -27,17 +32,41 @@ base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(base_dir)
 
 from app.endpoints.endpoints import router as api_router
-from app.endpoints.anomaly_endpoints import router as anomaly_api_router
+from app.endpoints.admin_endpoint import router as admin_router
 from app.endpoints.auth_endpoint import router as auth_router
+from app.endpoints.compose_endpoint import router as compose_router
+from app.endpoints.metrics_endpoint import router as metrics_router
+from app.endpoints.websocket_endpoint import router as websocket_router
 from logging_config import setup_logging
 
-from app.db_utils.database import Base, engine
+from app.db_utils.database import create_tables
+from app.stream_utils.loop_monitor import loop_monitor
 
 # Configure the root logger using setup_logging function
 setup_logging()
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """
+    Create the database tables and watch the event loop for blocking code while
+    the server runs.
+    """
+    startup_started = time.perf_counter()
+    await create_tables()
+    loop_monitor.start()
+    logger.info(
+        "Started in %.3f s: imports %.3f s, startup %.3f s",
+        time.perf_counter() - IMPORT_STARTED,
+        IMPORTED - IMPORT_STARTED,
+        time.perf_counter() - startup_started,
+    )
+    yield
+    await loop_monitor.stop()
+
+
 # Create a FastAPI instance
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 origins = ["http://localhost", "http://localhost:8000"]
 
@@ -102,12 +131,16 @@ async def general_exception_handler(request: Request, exc: Exception):
     )
 
 app.include_router(api_router)
-app.include_router(anomaly_api_router, prefix="/anomalies")
 app.include_router(auth_router)
-
-Base.metadata.create_all(bind=engine)
-
-logger.info("Starting the Streaming Data Generator")
+app.include_router(compose_router)
+app.include_router(metrics_router)
+app.include_router(admin_router)
+app.include_router(websocket_router)
+
+IMPORTED = time.perf_counter()
+logger.info(
+    "Starting the Streaming Data Generator, imported in %.3f s", IMPORTED - IMPORT_STARTED
+)
 
 # Start the FastAPI server
 if __name__ == "__main__":
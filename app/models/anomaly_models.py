@@ -1,9 +1,11 @@
 """
 This script defines Pydantic models representing various anomaly models.
 """
-from pydantic import BaseModel, Field
+from pydantic import Field, model_validator
 
-class RandomAnomalyModel(BaseModel):
+from app.models.stream_models import MAX_BLOCK_SIZE, StreamModel, check_ordered
+
+class RandomAnomalyModel(StreamModel):
     """
     A model representing the parameters for generating random anomalies.
     """
@@ -14,22 +16,26 @@ class RandomAnomalyModel(BaseModel):
     )
     anomaly_probability: float = Field(
         default=0.05,
+        ge=0,
+        le=1,
         title="Anomaly Probability",
         description="The probability of an anomaly occurring at each data point.",
     )
     anomaly_range: float = Field(
         default=10.0,
+        ge=0,
         title="Anomaly Range",
         description="The range within which the anomaly values can vary.",
     )
     data_interval: float = Field(
         default=1.0,
+        ge=0,
         title="Data Interval",
         description="The time interval between data points.",
     )
 
 
-class RandomSquareModel(BaseModel):
+class RandomSquareModel(StreamModel):
     """
     A model representing the parameters for generating random positive square wave anomalies.
     """
@@ -45,32 +51,53 @@ class RandomSquareModel(BaseModel):
     )
     minimum_interval: float = Field(
         default=50.0,
+        ge=0,
         title="Minimum Interval",
         description="The minimum interval between wave of anomalies",
     )
     maximum_interval: float = Field(
         default=150.0,
+        ge=0,
         title="Maximum Interval",
         description="The maximum interval between wave of anomalies",
     )
     min_anomaly_duration: float = Field(
         default=5.0,
+        ge=0,
         title="Minimum Anomaly Duration",
         description="The minimum length of the wave",
     )
     max_anomaly_duration: float = Field(
         default=10.0,
+        ge=0,
         title="Maximum Anomaly Duration",
         description="The maximum length of the wave",
     )
     data_interval: float = Field(
         default=1.0,
+        ge=0,
         title="Interval",
         description="The rate at which data points are generated.",
     )
 
+    @model_validator(mode="after")
+    def check_bounds(self):
+        """
+        Every minimum must be at most its maximum, and the longest gap and anomaly
+        must fit in one epoch of the anomaly schedule.
+        """
+        if self.maximum_interval + self.max_anomaly_duration > MAX_BLOCK_SIZE:
+            raise ValueError(
+                f"maximum_interval + max_anomaly_duration must be at most {MAX_BLOCK_SIZE}"
+            )
+        return check_ordered(
+            self,
+            ("minimum_interval", "maximum_interval"),
+            ("min_anomaly_duration", "max_anomaly_duration"),
+        )
+
 
-class ClusteredAnomalyModel(BaseModel):
+class ClusteredAnomalyModel(StreamModel):
     """
     A model representing the parameters for generating clustered anomalies.
     """
@@ -86,31 +113,53 @@ class ClusteredAnomalyModel(BaseModel):
     )
     minimum_interval: float = Field(
         default=50.0,
+        ge=0,
         title="Minimum Interval",
         description="The minimum interval between cluster of anomalies",
     )
     maximum_interval: float = Field(
         default=150.0,
+        ge=0,
         title="Maximum Interval",
         description="The maximum interval between cluster of anomalies",
     )
     min_anomaly_length: float = Field(
         default=5.0,
+        ge=0,
         title="Minimum Anomaly Length",
         description="The minimum length of the anomalies in the cluster",
     )
     max_anomaly_length: float = Field(
         default=10.0,
+        ge=0,
         title="Maximum Anomaly Length",
         description="The maximum length of the anomalies in the cluster",
     )
     data_interval: float = Field(
         default=1.0,
+        ge=0,
         title="Interval",
         description="The rate at which data points are generated.",
     )
 
-class SpikeAnomalyModel(BaseModel):
+    @model_validator(mode="after")
+    def check_bounds(self):
+        """
+        Every minimum must be at most its maximum, and the longest gap and anomaly
+        must fit in one epoch of the anomaly schedule.
+        """
+        if self.maximum_interval + self.max_anomaly_length > MAX_BLOCK_SIZE:
+            raise ValueError(
+                f"maximum_interval + max_anomaly_length must be at most {MAX_BLOCK_SIZE}"
+            )
+        return check_ordered(
+            self,
+            ("minimum_interval", "maximum_interval"),
+            ("min_anomaly_length", "max_anomaly_length"),
+        )
+
+
+class SpikeAnomalyModel(StreamModel):
     """
     A model representing the parameters for generating spiked anomalies at regular intervals.
     """
@@ -121,9 +170,17 @@ class SpikeAnomalyModel(BaseModel):
     )
     spike_interval: int = Field(
         default=1200,
+        gt=0,
         title="Spike Interval",
         description="The interval in seconds at which anomaly spike should occur.",
     )
+    window_length: int = Field(
+        default=3600,
+        ge=1,
+        le=MAX_BLOCK_SIZE,
+        title="Window Length",
+        description="The number of data points per window; the spikes restart every window.",
+    )
     min_spike_range: float = Field(
         default=5.0,
         title="Minimum Spike Range",
@@ -136,11 +193,20 @@ class SpikeAnomalyModel(BaseModel):
     )
     data_interval: float = Field(
         default=1.0,
+        ge=0,
         title="Interval",
         description="The rate at which data points are generated.",
     )
 
-class CountBasedAnomalyModel(BaseModel):
+    @model_validator(mode="after")
+    def check_bounds(self):
+        """
+        The spike range needs its minimum at most its maximum.
+        """
+        return check_ordered(self, ("min_spike_range", "max_spike_range"))
+
+
+class CountBasedAnomalyModel(StreamModel):
     """
     A model representing the parameters for generating specified number of anomalies within 1 hour.
     """
@@ -151,9 +217,18 @@ class CountBasedAnomalyModel(BaseModel):
     )
     num_anomalies: int = Field(
         default=1,
+        ge=0,
         title="Anomaly Count",
         description="The number of anomalies to introduce within the duration.",
     )
+    window_length: int = Field(
+        default=3600,
+        ge=1,
+        le=MAX_BLOCK_SIZE,
+        title="Window Length",
+        description="The number of data points per duration. Every duration gets its own "
+        "anomaly positions; counts above the window length fill the whole duration.",
+    )
     min_anomaly_range: float = Field(
         default=-10.0,
         title="Minimum Anomaly Range",
@@ -166,6 +241,14 @@ class CountBasedAnomalyModel(BaseModel):
     )
     data_interval: float = Field(
         default=1.0,
+        ge=0,
         title="Interval",
         description="The rate at which data points are generated.",
     )
+
+    @model_validator(mode="after")
+    def check_bounds(self):
+        """
+        The anomaly range needs its minimum at most its maximum.
+        """
+        return check_ordered(self, ("min_anomaly_range", "max_anomaly_range"))
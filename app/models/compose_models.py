@@ -0,0 +1,88 @@
+"""
+This script defines the Pydantic models for composed signals, which combine the
+existing streams with operators.
+"""
+
+from typing import List, Literal, Union
+
+from pydantic import BaseModel, Field, model_validator
+
+from app.models.stream_models import StreamModel
+
+MAX_SIGNAL_NODES = 32
+
+
+class SignalSource(BaseModel):
+    """
+    A leaf of a composed signal: one of the existing streams.
+    """
+    stream: str = Field(
+        title="Stream",
+        description="The stream, named like its endpoint, e.g. sine or anomalies/clustered.",
+    )
+    params: dict = Field(
+        default_factory=dict,
+        title="Parameters",
+        description="The parameters of the stream, as for its endpoint. Its interval "
+        "is ignored; the composed signal has one interval for all sources.",
+    )
+
+
+class SignalOperation(BaseModel):
+    """
+    An operator combining signals data point by data point.
+
+    add sums its inputs, multiply multiplies them. mask takes two inputs and returns
+    the second where it is an anomaly (or, for sources without anomalies, nonzero)
+    and the first elsewhere.
+    """
+    op: Literal["add", "multiply", "mask"] = Field(title="Operator")
+    inputs: List["SignalNode"] = Field(min_length=2, title="Inputs")
+
+    @model_validator(mode="after")
+    def check_arity(self):
+        """
+        A mask combines exactly one signal with one overlay.
+        """
+        if self.op == "mask" and len(self.inputs) != 2:
+            raise ValueError("mask takes exactly two inputs: the signal and the overlay")
+        return self
+
+
+SignalNode = Union[SignalSource, SignalOperation]
+SignalOperation.model_rebuild()
+
+
+def count_nodes(node: SignalNode) -> int:
+    """
+    Args:
+        node (SignalNode): The root of a signal.
+
+    Returns:
+        int: The number of sources and operators in the signal.
+    """
+    if isinstance(node, SignalSource):
+        return 1
+    return 1 + sum(count_nodes(child) for child in node.inputs)
+
+
+class ComposeModel(StreamModel):
+    """
+    A model representing a signal composed of several streams.
+    """
+    signal: SignalNode = Field(
+        title="Signal",
+        description="The tree of sources and operators to evaluate.",
+    )
+    interval: float = Field(
+        default=1.0, ge=0, description="The time interval between data points (in seconds)."
+    )
+
+    @model_validator(mode="after")
+    def check_size(self):
+        """
+        Bound the work of one composed stream.
+        """
+        if count_nodes(self.signal) > MAX_SIGNAL_NODES:
+            raise ValueError(f"A signal has at most {MAX_SIGNAL_NODES} sources and operators")
+        return self
@@ -2,10 +2,12 @@
 This script defines Pydantic models representing various distributions.
 """
 
-from pydantic import BaseModel, Field
+from pydantic import Field, model_validator
 
+from app.models.stream_models import StreamModel, check_ordered
 
-class NormalModel(BaseModel):
+
+class NormalModel(StreamModel):
     """
     A model representing a normal distribution.
     """
@@ -14,14 +16,14 @@ class NormalModel(BaseModel):
         default=0, description="The mean of the normal distribution."
     )
     std_dev: float = Field(
-        default=1, description="The standard deviation of the normal distribution."
+        default=1, ge=0, description="The standard deviation of the normal distribution."
     )
     interval: float = Field(
-        default=1.0, description="The time interval between data points in seconds."
+        default=1.0, ge=0, description="The time interval between data points in seconds."
     )
 
 
-class UniformModel(BaseModel):
+class UniformModel(StreamModel):
     """
     A model representing a uniform distribution.
     """
@@ -33,19 +35,27 @@ class UniformModel(BaseModel):
         default=1, description="The maximum value of the uniform distribution."
     )
     interval: float = Field(
-        default=1.0, description="The time interval between data points in seconds."
+        default=1.0, ge=0, description="The time interval between data points in seconds."
     )
 
+    @model_validator(mode="after")
+    def check_bounds(self):
+        """
+        The distribution needs min_val at most max_val.
+        """
+        return check_ordered(self, ("min_val", "max_val"))
+
 
-class ExponentialModel(BaseModel):
+class ExponentialModel(StreamModel):
     """
     A model representing an exponential distribution.
     """
 
     scale: float = Field(
         default=1.0,
+        ge=0,
         description="The inverse of the rate parameter controlling the rate at which events occur.",
     )
     interval: float = Field(
-        default=1.0, description="The time interval between data points in seconds."
+        default=1.0, ge=0, description="The time interval between data points in seconds."
     )
@@ -0,0 +1,201 @@
+"""
+This script defines the Pydantic base model shared by all streaming data models.
+"""
+
+from enum import Enum
+from typing import Optional, Tuple
+
+from pydantic import BaseModel, Field, model_validator
+
+from app.stream_utils.compression import FLUSH_INTERVAL
+from app.stream_utils.encoders import WireFormat
+from app.stream_utils.text_format import Notation, TextFormat
+
+# The most data points a stream computes and emits in one chunk
+MAX_BLOCK_SIZE = 1 << 20
+# The most data points one bulk request returns
+MAX_BULK_COUNT = 1_000_000_000
+# The shortest time between paced data points, the interval of the highest rate
+MIN_INTERVAL = 1e-6
+
+
+class CatchUpPolicy(str, Enum):
+    """
+    How a stream that has fallen behind its schedule catches up.
+
+    BURST emits the missed data points back to back, SKIP drops them and resumes
+    on schedule, and COALESCE emits all of them together in one chunk.
+    """
+    BURST = "burst"
+    SKIP = "skip"
+    COALESCE = "coalesce"
+
+
+class StreamModel(BaseModel):
+    """
+    A model holding the parameters common to every data stream.
+    """
+    catch_up: CatchUpPolicy = Field(
+        default=CatchUpPolicy.BURST,
+        title="Catch-up Policy",
+        description="How a stream that has fallen behind schedule catches up: "
+        "burst, skip or coalesce.",
+    )
+    seed: Optional[int] = Field(
+        default=None,
+        ge=0,
+        title="Seed",
+        description="The seed of the random data. The same seed and offset reproduce "
+        "the same stream. A random seed is chosen if omitted.",
+    )
+    offset: int = Field(
+        default=0,
+        ge=0,
+        title="Offset",
+        description="The index of the first data point to emit, used to resume a stream.",
+    )
+    batch_size: int = Field(
+        default=1,
+        ge=1,
+        le=MAX_BLOCK_SIZE,
+        title="Batch Size",
+        description="The number of data points computed and emitted together in one chunk.",
+    )
+
+    @property
+    def sample_interval(self) -> float:
+        """
+        Returns:
+            float: The time between consecutive data points, in seconds.
+        """
+        if hasattr(self, "data_interval"):
+            return self.data_interval
+        return self.interval
+
+    @model_validator(mode="after")
+    def check_interval(self):
+        """
+        The interval is 0 for an unpaced stream, or at least MIN_INTERVAL.
+        """
+        if self.sample_interval != 0 and not self.sample_interval >= MIN_INTERVAL:
+            raise ValueError(f"the interval must be 0 or at least {MIN_INTERVAL:g} seconds")
+        return self
+
+
+def check_ordered(model: BaseModel, *bounds: Tuple[str, str]) -> BaseModel:
+    """
+    Check that the lower bound of every pair of fields does not exceed the upper.
+
+    Args:
+        model (BaseModel): The model holding the fields.
+        *bounds (Tuple[str, str]): The names of the lower and the upper field of each pair.
+
+    Returns:
+        BaseModel: The model, for returning from a model validator.
+
+    Raises:
+        ValueError: If a lower bound is greater than its upper bound.
+    """
+    for lower, upper in bounds:
+        if getattr(model, lower) > getattr(model, upper):
+            raise ValueError(f"{lower} must not be greater than {upper}")
+    return model
+
+
+class StreamOptions(BaseModel):
+    """
+    A model holding the delivery options of a stream, which do not change the
+    generated data.
+    """
+    shared: bool = Field(
+        default=False,
+        title="Shared",
+        description="Subscribe to one producer shared by all streams requested with "
+        "identical parameters instead of generating the data separately.",
+    )
+    rate: Optional[float] = Field(
+        default=None,
+        gt=0,
+        le=1 / MIN_INTERVAL,
+        title="Rate",
+        description="Emit this many data points per second, overriding the interval and "
+        "batch size of the stream. The data points are sent in blocks sized from the "
+        "rate and the latency budget.",
+    )
+    latency_ms: float = Field(
+        default=50,
+        ge=1,
+        le=10000,
+        title="Latency Budget",
+        description="The longest time a data point of a rate-paced stream waits before "
+        "it is sent, in milliseconds.",
+    )
+
+
+class BulkOptions(BaseModel):
+    """
+    A model holding the size of a bulk request, given either as a number of data
+    points or as the duration of stream time to cover.
+    """
+    count: Optional[int] = Field(
+        default=None,
+        gt=0,
+        le=MAX_BULK_COUNT,
+        title="Count",
+        description="The number of data points to return.",
+    )
+    duration: Optional[float] = Field(
+        default=None,
+        gt=0,
+        title="Duration",
+        description="The length of stream time to return, in seconds. "
+        "Converted to a count using the interval of the stream.",
+    )
+
+
+class WireOptions(BaseModel):
+    """
+    A model holding the negotiated encoding and compression of a response.
+    """
+    format: WireFormat = Field(
+        default=WireFormat.TEXT,
+        title="Format",
+        description="The wire format: text, float32, float64 or arrow.",
+    )
+    timestamps: bool = Field(
+        default=False,
+        title="Timestamps",
+        description="Add the scheduled time of every data point as a column. "
+        "Binary formats only.",
+    )
+    precision: int = Field(
+        default=3,
+        ge=0,
+        le=15,
+        title="Precision",
+        description="The number of decimals of text streams.",
+    )
+    notation: Notation = Field(
+        default=Notation.FIXED,
+        title="Notation",
+        description="The notation of text streams: fixed or scientific.",
+    )
+    encoding: Optional[str] = Field(
+        default=None,
+        title="Content Encoding",
+        description="The compression of the response, gzip or zstd, or None.",
+    )
+    flush_interval: float = Field(
+        default=FLUSH_INTERVAL,
+        ge=0,
+        title="Flush Interval",
+        description="The longest time data waits in the compressor, in seconds.",
+    )
+
+    @property
+    def text_format(self) -> TextFormat:
+        """
+        Returns:
+            TextFormat: The precision and notation of text streams.
+        """
+        return TextFormat(self.precision, self.notation)
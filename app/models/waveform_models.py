@@ -2,10 +2,12 @@
 This script defines Pydantic models representing various waveforms.
 """
 
-from pydantic import BaseModel, Field
+from pydantic import Field
 
+from app.models.stream_models import StreamModel
 
-class SineModel(BaseModel):
+
+class SineModel(StreamModel):
     """
     A model representing a sine wave.
     """
@@ -28,7 +30,7 @@ class SineModel(BaseModel):
     )
 
 
-class CosineModel(BaseModel):
+class CosineModel(StreamModel):
     """
     A model representing a cosine wave.
     """
@@ -52,7 +54,7 @@ class CosineModel(BaseModel):
     )
 
 
-class SquareModel(BaseModel):
+class SquareModel(StreamModel):
     """
     A model representing a square wave.
     """
@@ -70,7 +72,7 @@ class SquareModel(BaseModel):
     )
 
 
-class SawtoothModel(BaseModel):
+class SawtoothModel(StreamModel):
     """
     A model representing a sawtooth wave.
     """
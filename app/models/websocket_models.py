@@ -0,0 +1,74 @@
+"""
+This script defines the Pydantic models for the messages of the WebSocket endpoint.
+"""
+
+from enum import Enum
+from typing import Annotated, Literal, Union
+
+from pydantic import BaseModel, Field, TypeAdapter
+
+
+class OverflowPolicy(str, Enum):
+    """
+    What happens to a subscription whose client reads slower than its stream produces.
+
+    DROP sends one frame per message and discards the oldest frames once the buffer
+    is full. COALESCE does the same but sends all buffered consecutive frames in one
+    message, so a slow client receives fewer, larger messages.
+    """
+    DROP = "drop"
+    COALESCE = "coalesce"
+
+
+class SubscribeMessage(BaseModel):
+    """
+    A client message opening a stream on the socket.
+    """
+    action: Literal["subscribe"]
+    id: str = Field(
+        min_length=1,
+        max_length=64,
+        title="Subscription ID",
+        description="The client chosen ID tagging every message of the subscription.",
+    )
+    stream: str = Field(
+        title="Stream",
+        description="The stream to open, named like its HTTP endpoint, e.g. sine "
+        "or anomalies/random.",
+    )
+    params: dict = Field(
+        default_factory=dict,
+        title="Parameters",
+        description="The parameters of the stream, as for its HTTP endpoint.",
+    )
+    shared: bool = Field(
+        default=False,
+        title="Shared",
+        description="Subscribe to the producer shared by all identical streams.",
+    )
+    overflow: OverflowPolicy = Field(
+        default=OverflowPolicy.DROP,
+        title="Overflow Policy",
+        description="How a subscription that is behind catches up: drop or coalesce.",
+    )
+    buffer: int = Field(
+        default=1024,
+        ge=1,
+        le=65536,
+        title="Buffer",
+        description="The number of data points held for the subscription before the "
+        "oldest are dropped.",
+    )
+
+
+class UnsubscribeMessage(BaseModel):
+    """
+    A client message closing a stream on the socket.
+    """
+    action: Literal["unsubscribe"]
+    id: str = Field(title="Subscription ID", description="The ID of the subscription.")
+
+
+ClientMessage = TypeAdapter(
+    Annotated[Union[SubscribeMessage, UnsubscribeMessage], Field(discriminator="action")]
+)
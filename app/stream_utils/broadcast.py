@@ -0,0 +1,162 @@
+"""
+Module for fanning out identical stream requests to a single shared producer.
+
+Streams opened in shared mode with the same generator and the same canonicalized
+model parameters subscribe to one producer task, which generates each chunk once
+and copies it into a bounded queue per subscriber. The producer is torn down when
+its last subscriber disconnects.
+"""
+
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Callable
+
+from pydantic import BaseModel
+
+from app.models.stream_models import StreamOptions
+from app.stream_utils.metrics import metered, stream_name
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBER_QUEUE_SIZE = 64
+
+_END_OF_STREAM = object()
+
+
+class _Subscriber:
+    """
+    The bounded queue of one subscriber and the number of chunks it has missed.
+    """
+
+    def __init__(self, maxsize: int):
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def offer(self, chunk):
+        """
+        Queue a chunk, discarding the oldest queued chunk if the subscriber is behind.
+        """
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(chunk)
+
+
+class _Producer:
+    """
+    A running source stream and the subscribers it feeds.
+    """
+
+    def __init__(self, key: str, source: AsyncIterator):
+        self.key = key
+        self.subscribers = set()
+        self.task = asyncio.get_running_loop().create_task(self._run(source))
+
+    async def _run(self, source: AsyncIterator):
+        """
+        Copy every chunk of the source to all current subscribers.
+        """
+        try:
+            async for chunk in source:
+                for subscriber in self.subscribers:
+                    subscriber.offer(chunk)
+        except Exception as error:
+            logger.exception("Shared producer %s failed: %s", self.key, error)
+        finally:
+            await source.aclose()
+            for subscriber in self.subscribers:
+                subscriber.offer(_END_OF_STREAM)
+
+
+class Broadcaster:
+    """
+    The registry of shared producers, keyed by generator and model parameters.
+
+    Attributes:
+        queue_size (int): The number of chunks buffered per subscriber.
+    """
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._producers = {}
+
+    @staticmethod
+    def key(generator: Callable, model: BaseModel) -> str:
+        """
+        Build the canonical key of a stream.
+
+        Args:
+            generator (Callable): The generator function producing the stream.
+            model (BaseModel): The model holding the stream parameters.
+
+        Returns:
+            str: The generator's qualified name followed by the model fields as sorted JSON.
+        """
+        parameters = json.dumps(model.model_dump(mode="json"), sort_keys=True)
+        return f"{generator.__module__}.{generator.__qualname__}:{parameters}"
+
+    def producer_count(self) -> int:
+        """
+        Returns:
+            int: The number of shared producers currently running.
+        """
+        return len(self._producers)
+
+    async def subscribe(self, generator: Callable, model: BaseModel):
+        """
+        Subscribe to the shared producer for a generator and model, starting it if needed.
+
+        Args:
+            generator (Callable): The generator function producing the stream.
+            model (BaseModel): The model holding the stream parameters.
+
+        Yields:
+            The chunks produced from the moment of subscription onwards.
+        """
+        key = self.key(generator, model)
+        producer = self._producers.get(key)
+        if producer is None or producer.task.done():
+            producer = self._producers[key] = _Producer(
+                key, metered(generator(model), stream_name(generator))
+            )
+            logger.debug("Started shared producer %s", key)
+        subscriber = _Subscriber(self.queue_size)
+        producer.subscribers.add(subscriber)
+        try:
+            while True:
+                chunk = await subscriber.queue.get()
+                if chunk is _END_OF_STREAM:
+                    break
+                yield chunk
+        finally:
+            producer.subscribers.discard(subscriber)
+            if subscriber.dropped:
+                logger.info(
+                    "Shared stream subscriber fell behind and missed %d chunks", subscriber.dropped
+                )
+            if not producer.subscribers and self._producers.get(key) is producer:
+                del self._producers[key]
+                producer.task.cancel()
+                logger.debug("Stopped shared producer %s", key)
+
+
+broadcaster = Broadcaster()
+
+
+def open_stream(generator: Callable, model: BaseModel, stream_options: StreamOptions):
+    """
+    Open a stream, either privately or as a subscriber of a shared producer.
+    The generator is metered either way.
+
+    Args:
+        generator (Callable): The generator function producing the stream.
+        model (BaseModel): The model holding the stream parameters.
+        stream_options (StreamOptions): The delivery options requested by the client.
+
+    Returns:
+        AsyncIterator: The chunks of the stream.
+    """
+    if stream_options.shared:
+        return broadcaster.subscribe(generator, model)
+    return metered(generator(model), stream_name(generator))
@@ -0,0 +1,42 @@
+"""
+Module for generating bulk, non-paced batches of data points.
+
+A bulk stream computes its data points in vectorized blocks and hands each block
+to the server as soon as the previous one has been sent, so it runs as fast as the
+client reads while holding only one block in memory.
+"""
+
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+BULK_BLOCK_SIZE = 8192
+
+
+async def generate_bulk_data(samples, count: int, block_size: int = BULK_BLOCK_SIZE):
+    """
+    Generates a fixed number of data points without pacing.
+
+    Args:
+        samples: The seekable source of data points, with a take_frame(count) method.
+        count (int): The total number of data points to generate.
+        block_size (int, optional): The number of data points per chunk.
+
+    Yields:
+        Frame: A frame of up to block_size data points.
+    """
+    remaining = count
+    try:
+        while remaining > 0:
+            frame = samples.take_frame(min(block_size, remaining))
+            remaining -= len(frame)
+            yield frame
+            # Let paced streams run between blocks of a large backfill.
+            await asyncio.sleep(0)
+    except asyncio.CancelledError:
+        logger.info("Bulk data generation was cancelled with %d data points left.", remaining)
+        raise
+    except Exception as error:
+        logger.exception("Error occurred while generating bulk data: %s", error)
+        raise
@@ -0,0 +1,223 @@
+"""
+Module for compressing streaming responses chunk by chunk.
+
+The content encoding is negotiated from the Accept-Encoding header: zstd when the
+optional zstandard package is installed, else gzip. A compressed stream is
+flushed whenever FLUSH_BYTES of input are pending or the oldest pending byte has
+waited flush_interval seconds, so compression never delays a data point by more
+than the flush interval. The compression ratio and the CPU time spent compressing
+are logged when the stream ends.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import time
+import zlib
+from typing import AsyncIterator, Optional
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 0.05
+FLUSH_BYTES = 16384
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+_END_OF_STREAM = object()
+
+
+def zstd_available() -> bool:
+    """
+    Returns:
+        bool: Whether the optional zstandard package is installed.
+    """
+    return importlib.util.find_spec("zstandard") is not None
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Choose the content encoding of a stream.
+
+    Args:
+        accept_encoding (Optional[str]): The Accept-Encoding header of the request.
+
+    Returns:
+        Optional[str]: zstd or gzip, preferring the client's quality values and
+            then zstd, or None to send the stream uncompressed.
+    """
+    supported = ["zstd", "gzip"] if zstd_available() else ["gzip"]
+    qualities = {}
+    for entry in (accept_encoding or "").split(","):
+        coding, *parameters = [part.strip() for part in entry.split(";")]
+        quality = 1.0
+        for parameter in parameters:
+            name, _, value = parameter.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    candidates = [
+        (-qualities.get(coding, qualities.get("*", 0.0)), position, coding)
+        for position, coding in enumerate(supported)
+    ]
+    best = min(candidates)
+    return best[2] if best[0] < 0 else None
+
+
+class StreamCompressor:
+    """
+    Compresses the chunks of one stream and keeps its statistics.
+
+    Attributes:
+        encoding (str): The content encoding, gzip or zstd.
+        bytes_in (int): The number of uncompressed bytes.
+        bytes_out (int): The number of compressed bytes.
+        cpu_time (float): The CPU time spent compressing, in seconds.
+    """
+
+    def __init__(self, encoding: str):
+        """
+        Args:
+            encoding (str): The content encoding, gzip or zstd.
+        """
+        self.encoding = encoding
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_time = 0.0
+        if encoding == "zstd":
+            import zstandard
+
+            self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+            self._sync_flush = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            self._finish = zstandard.COMPRESSOBJ_FLUSH_FINISH
+        else:
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._sync_flush = zlib.Z_SYNC_FLUSH
+            self._finish = zlib.Z_FINISH
+
+    def _measure(self, compress, *args) -> bytes:
+        """
+        Run a compressor call, adding its CPU time and output size to the statistics.
+        """
+        started = time.thread_time()
+        data = compress(*args)
+        self.cpu_time += time.thread_time() - started
+        self.bytes_out += len(data)
+        return data
+
+    def compress(self, chunk) -> bytes:
+        """
+        Args:
+            chunk (Union[str, bytes]): The next chunk of the stream.
+
+        Returns:
+            bytes: The compressed data the compressor has released so far, often empty.
+        """
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        self.bytes_in += len(chunk)
+        return self._measure(self._compressor.compress, chunk)
+
+    def flush(self) -> bytes:
+        """
+        Returns:
+            bytes: The compressed data of all pending input, decodable by the client
+                without waiting for more data.
+        """
+        return self._measure(self._compressor.flush, self._sync_flush)
+
+    def finish(self) -> bytes:
+        """
+        Returns:
+            bytes: The end of the compressed stream.
+        """
+        return self._measure(self._compressor.flush, self._finish)
+
+    def report(self) -> dict:
+        """
+        Returns:
+            dict: The encoding, byte counts, compression ratio and CPU milliseconds.
+        """
+        return {
+            "encoding": self.encoding,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "ratio": round(self.bytes_in / self.bytes_out, 2) if self.bytes_out else None,
+            "cpu_ms": round(self.cpu_time * 1000, 3),
+        }
+
+
+async def compress_stream(
+    chunks: AsyncIterator,
+    compressor: StreamCompressor,
+    flush_interval: float = FLUSH_INTERVAL,
+    flush_bytes: int = FLUSH_BYTES,
+):
+    """
+    Compress a stream, flushing by time and by size.
+
+    The source is read by its own task, so a chunk is never held back waiting for the
+    next one: once input has been pending for flush_interval seconds it is flushed.
+
+    Args:
+        chunks (AsyncIterator): The uncompressed chunks of the stream.
+        compressor (StreamCompressor): The compressor of the stream.
+        flush_interval (float, optional): The longest time input stays pending, in seconds.
+        flush_bytes (int, optional): The amount of pending input that forces a flush.
+
+    Yields:
+        bytes: The compressed stream.
+    """
+    queue = asyncio.Queue(maxsize=1)
+    closing = asyncio.Event()
+
+    async def pump():
+        # Once the response is closing nothing reads the queue, so nothing more is put
+        try:
+            async for chunk in chunks:
+                if closing.is_set():
+                    return
+                await queue.put(chunk)
+        except Exception as error:
+            if not closing.is_set():
+                await queue.put(error)
+            return
+        finally:
+            await chunks.aclose()
+        if not closing.is_set():
+            await queue.put(_END_OF_STREAM)
+
+    loop = asyncio.get_running_loop()
+    reader = loop.create_task(pump())
+    pending = 0
+    deadline = None
+    try:
+        while True:
+            try:
+                timeout = None if deadline is None else max(0.0, deadline - loop.time())
+                chunk = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                pending, deadline = 0, None
+                yield compressor.flush()
+                continue
+            if chunk is _END_OF_STREAM:
+                yield compressor.finish()
+                break
+            if isinstance(chunk, Exception):
+                raise chunk
+            data = compressor.compress(chunk)
+            pending += len(chunk)
+            if deadline is None:
+                deadline = loop.time() + flush_interval
+            if pending >= flush_bytes or flush_interval <= 0:
+                data += compressor.flush()
+                pending, deadline = 0, None
+            if data:
+                yield data
+    finally:
+        closing.set()
+        reader.cancel()
+        await asyncio.gather(reader, return_exceptions=True)
+        logger.info("Compressed stream: %s", compressor.report())
@@ -0,0 +1,267 @@
+"""
+Module for encoding stream frames in the wire format requested by the client.
+
+Formats:
+    text: One data point per line, by default with three decimals.
+    float32, float64: Length-prefixed little-endian binary frames. Each frame starts
+        with a 16 byte header of three uint32 values, the payload length in bytes,
+        the number of data points n and the column flags, followed by padding.
+        The payload holds n values, then n float64 timestamps if flag 1 is set,
+        then n uint8 anomaly labels if flag 2 is set, so every column can be read
+        with np.frombuffer without parsing.
+    arrow: An Arrow IPC stream with one record batch per frame and the columns
+        value, timestamp and is_anomaly. Needs the optional pyarrow package.
+"""
+
+import importlib.util
+import io
+import struct
+import time
+from enum import Enum
+from typing import Optional, Union
+
+import numpy as np
+
+from app.stream_utils.frames import Frame
+from app.stream_utils.text_format import DEFAULT_TEXT_FORMAT, TextFormat
+
+FRAME_HEADER = struct.Struct("<III4x")
+TIMESTAMPS_FLAG = 1
+LABELS_FLAG = 2
+
+
+class WireFormat(str, Enum):
+    """
+    The wire formats a stream can be encoded in.
+    """
+    TEXT = "text"
+    FLOAT32 = "float32"
+    FLOAT64 = "float64"
+    ARROW = "arrow"
+
+
+MEDIA_TYPES = {
+    WireFormat.TEXT: "text/event-stream",
+    WireFormat.FLOAT32: "application/x-float32-frames",
+    WireFormat.FLOAT64: "application/x-float64-frames",
+    WireFormat.ARROW: "application/vnd.apache.arrow.stream",
+}
+
+_ACCEPTED_MEDIA_TYPES = {
+    **{media_type: wire_format for wire_format, media_type in MEDIA_TYPES.items()},
+    "text/plain": WireFormat.TEXT,
+}
+
+
+def arrow_available() -> bool:
+    """
+    Returns:
+        bool: Whether the optional pyarrow package is installed.
+    """
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def negotiate_format(requested: Optional[WireFormat], accept: Optional[str]) -> WireFormat:
+    """
+    Choose the wire format of a stream.
+
+    Args:
+        requested (Optional[WireFormat]): The format given as a query parameter, which
+            takes precedence over the Accept header.
+        accept (Optional[str]): The Accept header of the request.
+
+    Returns:
+        WireFormat: The format to encode the stream in, text if nothing else matches.
+    """
+    if requested is not None:
+        return requested
+    candidates = []
+    for position, entry in enumerate((accept or "").split(",")):
+        media_type, *parameters = [part.strip() for part in entry.split(";")]
+        quality = 1.0
+        for parameter in parameters:
+            name, _, value = parameter.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_type.lower() in _ACCEPTED_MEDIA_TYPES and quality > 0:
+            candidates.append((-quality, position, _ACCEPTED_MEDIA_TYPES[media_type.lower()]))
+    return min(candidates)[2] if candidates else WireFormat.TEXT
+
+
+class FrameEncoder:
+    """
+    Base class of the encoders, which turn the frames of one response into chunks.
+
+    Timestamps are the wall clock times at which the data points are scheduled,
+    anchored at the first frame the encoder sees.
+
+    Attributes:
+        media_type (str): The media type of the encoded stream.
+    """
+    media_type = MEDIA_TYPES[WireFormat.TEXT]
+
+    def __init__(self, interval: float = 0.0, timestamps: bool = False):
+        """
+        Args:
+            interval (float, optional): The time between data points, in seconds.
+            timestamps (bool, optional): Whether to include a timestamp column.
+        """
+        self.interval = interval
+        self.timestamps = timestamps
+        self._origin = None
+
+    def frame_timestamps(self, frame: Frame) -> np.ndarray:
+        """
+        Args:
+            frame (Frame): The frame to timestamp.
+
+        Returns:
+            np.ndarray: The scheduled time of every data point, in seconds since the epoch.
+        """
+        if self._origin is None:
+            self._origin = time.time() - frame.index * self.interval
+        return self._origin + (frame.index + np.arange(len(frame))) * self.interval
+
+    def encode(self, frame: Frame) -> Union[str, bytes]:
+        """
+        Args:
+            frame (Frame): The frame to encode.
+
+        Returns:
+            Union[str, bytes]: The encoded chunk.
+        """
+        raise NotImplementedError
+
+    def finish(self) -> Optional[bytes]:
+        """
+        Returns:
+            Optional[bytes]: The trailer that ends a complete stream, if the format has one.
+        """
+        return None
+
+
+class TextEncoder(FrameEncoder):
+    """
+    Encodes frames as newline terminated text, one data point per line.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.0,
+        timestamps: bool = False,
+        text_format: TextFormat = DEFAULT_TEXT_FORMAT,
+    ):
+        """
+        Args:
+            interval (float, optional): The time between data points, in seconds.
+            timestamps (bool, optional): Unused, text has a single column.
+            text_format (TextFormat, optional): The precision and notation of the text.
+        """
+        super().__init__(interval, timestamps)
+        self.text_format = text_format
+
+    def encode(self, frame: Frame) -> bytes:
+        return frame.as_text(self.text_format).encode("ascii")
+
+
+class PackedEncoder(FrameEncoder):
+    """
+    Encodes frames as length-prefixed little-endian binary frames.
+    """
+
+    def __init__(self, wire_format: WireFormat, interval: float = 0.0, timestamps: bool = False):
+        """
+        Args:
+            wire_format (WireFormat): Either float32 or float64.
+            interval (float, optional): The time between data points, in seconds.
+            timestamps (bool, optional): Whether to include a timestamp column.
+        """
+        super().__init__(interval, timestamps)
+        self.media_type = MEDIA_TYPES[wire_format]
+        self.dtype = np.dtype("<f4" if wire_format == WireFormat.FLOAT32 else "<f8")
+
+    def encode(self, frame: Frame) -> bytes:
+        columns = [frame.values.astype(self.dtype, copy=False).tobytes()]
+        flags = 0
+        if self.timestamps:
+            columns.append(self.frame_timestamps(frame).astype("<f8", copy=False).tobytes())
+            flags |= TIMESTAMPS_FLAG
+        if frame.labels is not None:
+            columns.append(frame.labels.astype(np.uint8, copy=False).tobytes())
+            flags |= LABELS_FLAG
+        payload = b"".join(columns)
+        return FRAME_HEADER.pack(len(payload), len(frame), flags) + payload
+
+
+class ArrowEncoder(FrameEncoder):
+    """
+    Encodes frames as the record batches of an Arrow IPC stream.
+
+    The schema is fixed by the first frame and written in front of its batch.
+    """
+    media_type = MEDIA_TYPES[WireFormat.ARROW]
+
+    def __init__(self, interval: float = 0.0, timestamps: bool = False):
+        super().__init__(interval, timestamps)
+        import pyarrow
+
+        self._pa = pyarrow
+        self._sink = io.BytesIO()
+        self._writer = None
+
+    def _drain(self) -> bytes:
+        """
+        Return the bytes written to the sink since the last call.
+        """
+        data = self._sink.getvalue()
+        self._sink.seek(0)
+        self._sink.truncate()
+        return data
+
+    def encode(self, frame: Frame) -> bytes:
+        pa = self._pa
+        columns = {"value": pa.array(frame.values, type=pa.float64())}
+        if self.timestamps:
+            microseconds = np.round(self.frame_timestamps(frame) * 1e6).astype(np.int64)
+            columns["timestamp"] = pa.array(microseconds, type=pa.timestamp("us", tz="UTC"))
+        if frame.labels is not None:
+            columns["is_anomaly"] = pa.array(frame.labels, type=pa.bool_())
+        batch = pa.RecordBatch.from_pydict(columns)
+        if self._writer is None:
+            self._writer = pa.ipc.new_stream(self._sink, batch.schema)
+        self._writer.write_batch(batch)
+        return self._drain()
+
+    def finish(self) -> Optional[bytes]:
+        if self._writer is None:
+            return None
+        self._writer.close()
+        return self._drain()
+
+
+def make_encoder(
+    wire_format: WireFormat,
+    interval: float = 0.0,
+    timestamps: bool = False,
+    text_format: TextFormat = DEFAULT_TEXT_FORMAT,
+) -> FrameEncoder:
+    """
+    Create the encoder for one response.
+
+    Args:
+        wire_format (WireFormat): The negotiated wire format.
+        interval (float, optional): The time between data points, in seconds.
+        timestamps (bool, optional): Whether to include a timestamp column.
+        text_format (TextFormat, optional): The precision and notation of text streams.
+
+    Returns:
+        FrameEncoder: The encoder.
+    """
+    if wire_format == WireFormat.ARROW:
+        return ArrowEncoder(interval, timestamps)
+    if wire_format in (WireFormat.FLOAT32, WireFormat.FLOAT64):
+        return PackedEncoder(wire_format, interval, timestamps)
+    return TextEncoder(interval, timestamps, text_format)
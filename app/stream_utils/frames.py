@@ -0,0 +1,51 @@
+"""
+Module defining the frame, the unit in which generators hand data points to the
+endpoints.
+
+A frame holds a block of consecutive data points as an array, so the endpoint can
+encode it in the wire format requested by the client. Text formatting happens at
+most once per frame, even when the frame is shared by several subscribers.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from app.stream_utils.text_format import DEFAULT_TEXT_FORMAT, TextFormat, format_block
+
+
+@dataclass(eq=False)
+class Frame:
+    """
+    A block of consecutive data points of a stream.
+
+    Attributes:
+        index (int): The index of the first data point in the stream.
+        values (np.ndarray): The data points.
+        labels (Optional[np.ndarray]): Whether each data point is an anomaly, for the
+            anomaly streams.
+        text (Optional[str]): The data points in the default text format, if already known.
+    """
+    index: int
+    values: np.ndarray
+    labels: Optional[np.ndarray] = None
+    text: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def as_text(self, text_format: TextFormat = DEFAULT_TEXT_FORMAT) -> str:
+        """
+        Args:
+            text_format (TextFormat, optional): The format. Defaults to three decimals.
+
+        Returns:
+            str: The data points, newline terminated. The default format is built once
+                per frame and kept.
+        """
+        if text_format != DEFAULT_TEXT_FORMAT:
+            return format_block(self.values, text_format)
+        if self.text is None:
+            self.text = format_block(self.values)
+        return self.text
@@ -0,0 +1,228 @@
+"""
+Module for watching the event loop for code that blocks it.
+
+A heartbeat task sleeps for a short interval and measures how late it wakes up,
+which is the scheduling lag every stream on the loop suffers. A watchdog thread
+checks the heartbeat; when it is overdue by more than the threshold, the loop is
+stuck in one callback, and the watchdog captures the stack of the loop thread to
+find the endpoint and generator running it. Once the loop recovers, the stall is
+logged and kept for the admin endpoint. Every stall is tagged with the number of
+the heartbeat it delayed, so a stall captured while that heartbeat was already
+running is dropped instead of being reported on the next one.
+
+Environment variables:
+    LOOP_LAG_INTERVAL_MS: The interval of the heartbeat. Defaults to 100.
+    SLOW_CALLBACK_MS: The blocking time reported as a slow callback. Defaults to 100.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional
+
+from app.stream_utils.metrics import REGISTRY, Histogram
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL_MS", "100")) / 1000
+SLOW_CALLBACK_THRESHOLD = float(os.getenv("SLOW_CALLBACK_MS", "100")) / 1000
+SLOW_CALLBACK_HISTORY = 50
+STACK_DEPTH = 8
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LOOP_LAG = REGISTRY.register(
+    Histogram("sdg_event_loop_lag_seconds", "How late the event loop ran a scheduled wake-up.")
+)
+
+
+@dataclass
+class SlowCallback:
+    """
+    A stretch of time in which one callback kept the event loop busy.
+
+    Attributes:
+        started (float): When the loop stopped responding, in seconds since the epoch.
+        duration (float): How long the loop did not respond, in seconds.
+        endpoint (Optional[str]): The innermost endpoint function on the stack.
+        generator (Optional[str]): The innermost generator function on the stack.
+        location (Optional[str]): The innermost application frame on the stack.
+        stack (List[str]): The innermost frames of the loop thread.
+    """
+    started: float
+    duration: float = 0.0
+    endpoint: Optional[str] = None
+    generator: Optional[str] = None
+    location: Optional[str] = None
+    stack: List[str] = field(default_factory=list)
+
+
+def _describe(frame_summary: traceback.FrameSummary) -> str:
+    path = os.path.relpath(frame_summary.filename, os.path.dirname(APP_DIR))
+    return f"{path}:{frame_summary.lineno} {frame_summary.name}"
+
+
+def _module_function(frame_summary: traceback.FrameSummary) -> str:
+    module = os.path.splitext(os.path.relpath(frame_summary.filename, APP_DIR))[0]
+    return f"{module.replace(os.sep, '.')}.{frame_summary.name}"
+
+
+def capture_stall(thread_id: int, started: float) -> SlowCallback:
+    """
+    Capture where a thread is running.
+
+    Args:
+        thread_id (int): The identifier of the thread running the event loop.
+        started (float): When the loop stopped responding, in seconds since the epoch.
+
+    Returns:
+        SlowCallback: The stall, with the origin found on the stack of the thread.
+    """
+    stall = SlowCallback(started=started)
+    frame = sys._current_frames().get(thread_id)
+    if frame is None:
+        return stall
+    frames = traceback.extract_stack(frame)
+    stall.stack = [_describe(summary) for summary in frames[-STACK_DEPTH:]]
+    for summary in reversed(frames):
+        if not summary.filename.startswith(APP_DIR):
+            continue
+        if stall.location is None:
+            stall.location = _describe(summary)
+        relative = os.path.relpath(summary.filename, APP_DIR)
+        if stall.generator is None and relative.startswith("generators"):
+            stall.generator = _module_function(summary)
+        if stall.endpoint is None and relative.startswith("endpoints"):
+            stall.endpoint = _module_function(summary)
+    return stall
+
+
+class LoopMonitor:
+    """
+    Measures the scheduling lag of an event loop and records slow callbacks.
+
+    Attributes:
+        interval (float): The interval of the heartbeat, in seconds.
+        threshold (float): The blocking time reported as a slow callback, in seconds.
+        slow_callbacks (deque): The most recent slow callbacks.
+        last_lag (float): The lag of the most recent heartbeat, in seconds.
+        max_lag (float): The largest lag observed, in seconds.
+    """
+
+    def __init__(
+        self,
+        interval: float = LOOP_LAG_INTERVAL,
+        threshold: float = SLOW_CALLBACK_THRESHOLD,
+        history: int = SLOW_CALLBACK_HISTORY,
+    ):
+        self.interval = interval
+        self.threshold = threshold
+        self.slow_callbacks = deque(maxlen=history)
+        self.beats = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._total_lag = 0.0
+        self._last_beat = time.monotonic()
+        self._stall = None
+        self._lock = threading.Lock()
+        self._task = None
+        self._watchdog = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        """
+        Start the heartbeat on the running loop and the watchdog thread.
+        """
+        self._stopped.clear()
+        self._last_beat = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._watchdog = threading.Thread(
+            target=self._watch, args=(threading.get_ident(),), name="loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self):
+        """
+        Stop the heartbeat and wait for the watchdog thread to finish.
+        """
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            with self._lock:
+                # Measured from the previous beat like the watchdog does, so a block
+                # before the first beat counts as well
+                now = time.monotonic()
+                lag = max(now - self._last_beat - self.interval, 0.0)
+                self._last_beat = now
+                beat = self.beats
+                self.beats += 1
+                pending, self._stall = self._stall, None
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            self._total_lag += lag
+            LOOP_LAG.observe(lag)
+            # A stall captured while waiting for an earlier heartbeat is stale
+            stall = pending[1] if pending is not None and pending[0] == beat else None
+            if stall is not None:
+                stall.duration = round(lag, 6)
+                self.slow_callbacks.append(stall)
+                logger.warning(
+                    "Event loop blocked for %.3f s in endpoint=%s generator=%s at %s",
+                    lag,
+                    stall.endpoint,
+                    stall.generator,
+                    stall.location,
+                    extra={"slow_callback": asdict(stall)},
+                )
+
+    def _watch(self, thread_id: int):
+        while not self._stopped.wait(self.threshold / 4):
+            self._check(thread_id)
+
+    def _check(self, thread_id: int):
+        with self._lock:
+            if self._stall is not None:
+                return
+            beat, last_beat = self.beats, self._last_beat
+        overdue = time.monotonic() - last_beat - self.interval
+        if overdue <= self.threshold:
+            return
+        stall = capture_stall(thread_id, time.time() - overdue)
+        with self._lock:
+            # The heartbeat may have run while the stack was captured
+            if self.beats == beat and self._stall is None:
+                self._stall = (beat, stall)
+
+    def report(self) -> dict:
+        """
+        Returns:
+            dict: The measured lag in milliseconds and the recent slow callbacks.
+        """
+        mean_lag = self._total_lag / self.beats if self.beats else 0.0
+        return {
+            "interval_ms": self.interval * 1000,
+            "threshold_ms": self.threshold * 1000,
+            "beats": self.beats,
+            "last_lag_ms": round(self.last_lag * 1000, 3),
+            "mean_lag_ms": round(mean_lag * 1000, 3),
+            "max_lag_ms": round(self.max_lag * 1000, 3),
+            "slow_callbacks": [asdict(stall) for stall in self.slow_callbacks],
+        }
+
+
+loop_monitor = LoopMonitor()
@@ -0,0 +1,374 @@
+"""
+Module providing the server metrics, rendered in the Prometheus text format.
+
+The metric types are deliberately minimal: labelled counters, gauges and
+histograms kept in memory and rendered on each scrape of /metrics.
+
+Streams are instrumented where every stream passes through: open_stream wraps
+each generator with metered, which times the compute of every frame, and the
+Pacer reports its lag to the StreamMeter of the stream it paces through a context
+variable. encode_stream counts what reaches the client, labelled with the stream and
+the endpoint, stream or bulk, that served it.
+"""
+
+import contextlib
+import contextvars
+import math
+import threading
+import time
+from typing import AsyncIterator, Dict, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+COMPUTE_BUCKETS = (1e-5, 5e-5, 1e-4, 5e-4, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5)
+LIFETIME_BUCKETS = (1.0, 5.0, 30.0, 60.0, 300.0, 900.0, 3600.0, 14400.0, 86400.0)
+AUTH_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _format_labels(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [
+        '{}="{}"'.format(
+            name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    """
+    A family of time series sharing a name, distinguished by label values.
+
+    Attributes:
+        name (str): The metric name.
+        documentation (str): The help text of the metric.
+        label_names (Tuple[str, ...]): The names of the labels.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def samples(self):
+        """
+        Yields:
+            Tuple[str, str, float]: The suffixed name, the label string and the value
+                of every time series of the family.
+        """
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in sorted(items):
+            yield self.name, _format_labels(self.label_names, key), value
+
+    def render(self) -> str:
+        """
+        Returns:
+            str: The family in the Prometheus text format.
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(
+            f"{name}{labels} {_format_value(value)}" for name, labels, value in self.samples()
+        )
+        return "\n".join(lines) + "\n"
+
+
+class Counter(Metric):
+    """
+    A value that only goes up.
+    """
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    """
+    A value that goes up and down.
+    """
+
+    kind = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    """
+    Observations counted in cumulative buckets, with their sum and count.
+
+    Attributes:
+        buckets (Tuple[float, ...]): The upper bounds of the buckets, ascending.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(buckets) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(key, (list(s[0]), s[1], s[2])) for key, s in self._values.items()]
+        for key, (counts, total, count) in sorted(items):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.label_names, key, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket", labels, cumulative
+            labels = _format_labels(self.label_names, key)
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+
+class Registry:
+    """
+    The metrics exposed by the server.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """
+        Args:
+            metric (Metric): The metric to expose.
+
+        Returns:
+            Metric: The metric, for assignment at module level.
+        """
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """
+        Returns:
+            str: Every registered metric in the Prometheus text format.
+        """
+        return "".join(metric.render() for metric in self._metrics.values())
+
+
+REGISTRY = Registry()
+
+ACTIVE_STREAMS = REGISTRY.register(
+    Gauge(
+        "sdg_active_streams", "The number of responses currently streaming.",
+        ["stream", "endpoint"],
+    )
+)
+SAMPLES_EMITTED = REGISTRY.register(
+    Counter(
+        "sdg_samples_emitted_total", "The number of data points sent.", ["stream", "endpoint"]
+    )
+)
+BYTES_EMITTED = REGISTRY.register(
+    Counter(
+        "sdg_bytes_emitted_total", "The number of encoded bytes sent, before compression.",
+        ["stream", "endpoint"],
+    )
+)
+PACING_LAG = REGISTRY.register(
+    Histogram(
+        "sdg_pacing_lag_seconds",
+        "How late a paced stream woke up against its intended schedule.",
+        ["stream"],
+        LATENCY_BUCKETS,
+    )
+)
+COMPUTE_TIME = REGISTRY.register(
+    Histogram(
+        "sdg_frame_compute_seconds",
+        "The time a generator took to compute one frame.",
+        ["stream"],
+        COMPUTE_BUCKETS,
+    )
+)
+STREAM_LIFETIME = REGISTRY.register(
+    Histogram(
+        "sdg_stream_lifetime_seconds", "How long responses streamed.", ["stream", "endpoint"],
+        LIFETIME_BUCKETS,
+    )
+)
+AUTH_LATENCY = REGISTRY.register(
+    Histogram(
+        "sdg_auth_latency_seconds", "The time taken by the auth endpoints.", ["endpoint"],
+        AUTH_BUCKETS,
+    )
+)
+TOKEN_CACHE_LOOKUPS = REGISTRY.register(
+    Counter(
+        "sdg_token_cache_lookups_total",
+        "The lookups of access tokens in the cache of verified tokens, by hit or miss.",
+        ["result"],
+    )
+)
+
+
+@contextlib.contextmanager
+def timed(histogram: Histogram, **labels):
+    """
+    Observe the time spent in the block, also when it raises.
+
+    Args:
+        histogram (Histogram): The histogram to observe the time in.
+        **labels: The label values of the time series.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - started, **labels)
+
+
+def stream_name(function) -> str:
+    """
+    Args:
+        function (Callable): The generator or sample source factory of a stream.
+
+    Returns:
+        str: The stream label of its module, e.g. sine or anomalies.clustered.
+    """
+    module = function.__module__
+    for prefix in ("app.generators.", "app."):
+        if module.startswith(prefix):
+            return module[len(prefix):]
+    return module
+
+
+class StreamMeter:
+    """
+    Measures one running generator.
+
+    Attributes:
+        stream (str): The stream label.
+        idle (float): The time the stream spent waiting for its schedule, in seconds.
+    """
+
+    def __init__(self, stream: str):
+        self.stream = stream
+        self.idle = 0.0
+
+    def paced(self, lag: float, slept: float):
+        """
+        Record one wake-up of the Pacer.
+
+        Args:
+            lag (float): How late the wake-up was, in seconds.
+            slept (float): How long the Pacer waited, in seconds.
+        """
+        self.idle += slept
+        PACING_LAG.observe(lag, stream=self.stream)
+
+
+current_meter: contextvars.ContextVar[Optional[StreamMeter]] = contextvars.ContextVar(
+    "current_meter", default=None
+)
+
+
+async def metered(frames: AsyncIterator, stream: str):
+    """
+    Time the compute of every frame of a generator, excluding the time it waits
+    for its schedule.
+
+    Args:
+        frames (AsyncIterator): The frames of the generator.
+        stream (str): The stream label.
+
+    Yields:
+        The frames of the generator.
+    """
+    meter = StreamMeter(stream)
+    try:
+        while True:
+            current_meter.set(meter)
+            started, idle = time.perf_counter(), meter.idle
+            try:
+                frame = await frames.__anext__()
+            except StopAsyncIteration:
+                break
+            COMPUTE_TIME.observe(
+                time.perf_counter() - started - (meter.idle - idle), stream=stream
+            )
+            yield frame
+    finally:
+        await frames.aclose()
+
+
+class ResponseMeter:
+    """
+    Counts what one response sends to its client.
+
+    Attributes:
+        stream (str): The stream label.
+        endpoint (str): The endpoint label, stream or bulk.
+    """
+
+    def __init__(self, stream: str, endpoint: str = "stream"):
+        self.stream = stream
+        self.endpoint = endpoint
+        self._started = time.monotonic()
+        ACTIVE_STREAMS.inc(stream=stream, endpoint=endpoint)
+
+    def sent(self, samples: int, chunk):
+        """
+        Args:
+            samples (int): The number of data points in the chunk.
+            chunk (Union[str, bytes]): The encoded chunk.
+        """
+        SAMPLES_EMITTED.inc(samples, stream=self.stream, endpoint=self.endpoint)
+        BYTES_EMITTED.inc(len(chunk), stream=self.stream, endpoint=self.endpoint)
+
+    def close(self):
+        """
+        Record the end of the response.
+        """
+        ACTIVE_STREAMS.dec(stream=self.stream, endpoint=self.endpoint)
+        STREAM_LIFETIME.observe(
+            time.monotonic() - self._started, stream=self.stream, endpoint=self.endpoint
+        )
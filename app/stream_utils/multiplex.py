@@ -0,0 +1,254 @@
+"""
+Module for multiplexing many streams over one connection with per-subscription
+flow control.
+
+Every subscription has a pump task that moves the frames of its stream into a
+small buffer bounded in data points. A single sender drains the buffers round
+robin and awaits each send, so a slow connection holds back only the sender.
+The pumps keep running on schedule and discard the oldest data points of their
+own buffer instead of queueing without limit.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, List
+
+import numpy as np
+
+from app.models.websocket_models import OverflowPolicy
+from app.stream_utils.frames import Frame
+
+logger = logging.getLogger(__name__)
+
+MAX_SUBSCRIPTIONS = 256
+
+
+class Subscription:
+    """
+    One stream of a multiplexed connection and its bounded buffer.
+
+    Attributes:
+        subscription_id (str): The client chosen ID of the subscription.
+        overflow (OverflowPolicy): How buffered frames are sent when the client is behind.
+        buffer_size (int): The number of data points held before the oldest are dropped.
+        dropped (int): The number of data points dropped since the last message.
+        finished (bool): Whether the stream has ended.
+    """
+
+    def __init__(
+        self,
+        subscription_id: str,
+        frames: AsyncIterator,
+        overflow: OverflowPolicy,
+        buffer_size: int,
+        ready: asyncio.Event,
+    ):
+        """
+        Args:
+            subscription_id (str): The client chosen ID of the subscription.
+            frames (AsyncIterator): The frames of the stream.
+            overflow (OverflowPolicy): How buffered frames are sent.
+            buffer_size (int): The number of data points held before the oldest are dropped.
+            ready (asyncio.Event): The event set whenever the buffer has data to send.
+        """
+        self.subscription_id = subscription_id
+        self.overflow = overflow
+        self.buffer_size = buffer_size
+        self.dropped = 0
+        self.finished = False
+        self._pending = deque()
+        self._pending_points = 0
+        self._ready = ready
+        self.task = asyncio.get_running_loop().create_task(self._pump(frames))
+
+    async def _pump(self, frames: AsyncIterator):
+        """
+        Move the frames of the stream into the buffer until it ends or is cancelled.
+        """
+        try:
+            async for frame in frames:
+                self.offer(frame)
+        except Exception as error:
+            logger.exception("Subscription %s failed: %s", self.subscription_id, error)
+        finally:
+            await frames.aclose()
+            self.finished = True
+            self._ready.set()
+
+    def offer(self, frame: Frame):
+        """
+        Buffer a frame, dropping the oldest frames while the buffer is over its size.
+        The newest frame is always kept.
+        """
+        self._pending.append(frame)
+        self._pending_points += len(frame)
+        while self._pending_points > self.buffer_size and len(self._pending) > 1:
+            oldest = self._pending.popleft()
+            self._pending_points -= len(oldest)
+            self.dropped += len(oldest)
+        self._ready.set()
+
+    def has_pending(self) -> bool:
+        """
+        Returns:
+            bool: Whether the buffer holds frames to send.
+        """
+        return bool(self._pending)
+
+    def take(self) -> List[Frame]:
+        """
+        Remove the frames for the next message from the buffer: the oldest frame, or
+        with COALESCE the oldest frame and all frames directly following it.
+
+        Returns:
+            List[Frame]: The frames of the next message, consecutive in the stream.
+        """
+        frames = [self._pending.popleft()]
+        if self.overflow == OverflowPolicy.COALESCE:
+            while self._pending and self._pending[0].index == frames[-1].index + len(frames[-1]):
+                frames.append(self._pending.popleft())
+        self._pending_points -= sum(len(frame) for frame in frames)
+        return frames
+
+    def message(self) -> dict:
+        """
+        Build the next data message from the buffer.
+
+        Returns:
+            dict: The subscription ID, the index of the first data point, the data
+                points rounded to three decimals, the anomaly labels of anomaly
+                streams and the number of data points dropped before this message.
+        """
+        frames = self.take()
+        values = np.concatenate([frame.values for frame in frames])
+        message = {
+            "event": "data",
+            "id": self.subscription_id,
+            "index": frames[0].index,
+            "values": np.round(values, 3).tolist(),
+        }
+        if frames[0].labels is not None:
+            message["labels"] = np.concatenate([frame.labels for frame in frames]).tolist()
+        if self.dropped:
+            message["dropped"] = self.dropped
+            self.dropped = 0
+        return message
+
+
+class Multiplexer:
+    """
+    The subscriptions of one connection and the sender that drains them.
+
+    Attributes:
+        max_subscriptions (int): The number of subscriptions a connection may hold.
+    """
+
+    def __init__(
+        self, send: Callable[[dict], Awaitable], max_subscriptions: int = MAX_SUBSCRIPTIONS
+    ):
+        """
+        Args:
+            send (Callable): Coroutine function sending one message to the client.
+            max_subscriptions (int, optional): The number of subscriptions allowed.
+        """
+        self._send = send
+        self.max_subscriptions = max_subscriptions
+        self._subscriptions = {}
+        self._ready = asyncio.Event()
+        self._send_lock = asyncio.Lock()
+
+    def __contains__(self, subscription_id: str) -> bool:
+        return subscription_id in self._subscriptions
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(
+        self,
+        subscription_id: str,
+        frames: AsyncIterator,
+        overflow: OverflowPolicy = OverflowPolicy.DROP,
+        buffer_size: int = 1024,
+    ) -> Subscription:
+        """
+        Start pumping a stream into a new subscription.
+
+        Args:
+            subscription_id (str): The client chosen ID of the subscription.
+            frames (AsyncIterator): The frames of the stream.
+            overflow (OverflowPolicy, optional): How buffered frames are sent.
+            buffer_size (int, optional): The number of data points held before the
+                oldest are dropped.
+
+        Returns:
+            Subscription: The new subscription.
+
+        Raises:
+            ValueError: If the ID is in use or the connection has too many subscriptions.
+        """
+        if subscription_id in self._subscriptions:
+            raise ValueError(f"Subscription {subscription_id!r} already exists")
+        if len(self._subscriptions) >= self.max_subscriptions:
+            raise ValueError(f"At most {self.max_subscriptions} subscriptions are allowed")
+        subscription = Subscription(subscription_id, frames, overflow, buffer_size, self._ready)
+        self._subscriptions[subscription_id] = subscription
+        return subscription
+
+    def unsubscribe(self, subscription_id: str) -> bool:
+        """
+        Stop a subscription and discard its buffered data.
+
+        Args:
+            subscription_id (str): The ID of the subscription.
+
+        Returns:
+            bool: Whether the subscription existed.
+        """
+        subscription = self._subscriptions.pop(subscription_id, None)
+        if subscription is None:
+            return False
+        subscription.task.cancel()
+        return True
+
+    async def send(self, message: dict):
+        """
+        Send a message to the client, one message at a time.
+
+        Args:
+            message (dict): The message to send.
+        """
+        async with self._send_lock:
+            await self._send(message)
+
+    async def run(self):
+        """
+        Send the buffered data of all subscriptions, one message per subscription
+        and round, until cancelled. Ended subscriptions are announced and removed
+        once their buffer is empty.
+        """
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            for subscription in list(self._subscriptions.values()):
+                if self._subscriptions.get(subscription.subscription_id) is not subscription:
+                    continue
+                if subscription.has_pending():
+                    await self.send(subscription.message())
+                    if subscription.has_pending():
+                        self._ready.set()
+                elif subscription.finished:
+                    del self._subscriptions[subscription.subscription_id]
+                    await self.send({"event": "end", "id": subscription.subscription_id})
+
+    async def close(self):
+        """
+        Cancel all subscriptions and wait for their streams to close.
+        """
+        subscriptions = list(self._subscriptions.values())
+        self._subscriptions.clear()
+        for subscription in subscriptions:
+            subscription.task.cancel()
+        await asyncio.gather(
+            *(subscription.task for subscription in subscriptions), return_exceptions=True
+        )
@@ -0,0 +1,192 @@
+"""
+Module providing drift-free pacing for data streams.
+
+Instead of sleeping for a fixed interval after each data point, which accumulates
+compute time, event loop lag and timer granularity, a Pacer schedules every
+emission against an absolute deadline on the event loop clock and waits for it on
+the shared timer wheel.
+
+paced_frames is the loop every generator runs: it takes frames of batch_size data
+points from the seekable sample source of a stream and paces them with a Pacer.
+"""
+
+import asyncio
+import logging
+import math
+from dataclasses import dataclass
+
+from app.models.stream_models import MAX_BLOCK_SIZE, CatchUpPolicy, StreamModel
+from app.stream_utils.metrics import current_meter
+from app.stream_utils.timer_wheel import TICK_RESOLUTION, get_timer_wheel
+
+logger = logging.getLogger(__name__)
+
+
+def block_size_for(rate: float, latency_budget: float) -> int:
+    """
+    Choose how many data points a stream emits per chunk to keep up a rate.
+
+    A chunk holds the data points of one latency budget, so no data point waits
+    longer than the budget, but chunks are never due more often than the timer
+    wheel ticks, which bounds the pacing overhead at any rate.
+
+    Args:
+        rate (float): The data points per second to emit.
+        latency_budget (float): The longest time a data point may wait, in seconds.
+
+    Returns:
+        int: The number of data points per chunk, at least 1.
+    """
+    period = max(latency_budget, TICK_RESOLUTION)
+    return int(min(MAX_BLOCK_SIZE, max(1, math.floor(rate * period))))
+
+
+@dataclass
+class Tick:
+    """
+    The outcome of waiting for the next deadline.
+
+    Attributes:
+        skipped (int): The number of scheduled emissions dropped to catch up.
+        due (int): The number of scheduled emissions to make now.
+    """
+    skipped: int
+    due: int
+
+
+class Pacer:
+    """
+    Paces a stream against absolute deadlines start + n * interval.
+
+    Attributes:
+        interval (float): The time between scheduled emissions in seconds.
+        catch_up (CatchUpPolicy): What to do when a deadline has already passed.
+        max_coalesced (int): The most emissions a COALESCE tick makes at once; any
+            further missed emissions are skipped. 0 for no limit.
+        ticks (int): The number of deadlines waited for so far.
+        skipped (int): The number of emissions dropped to catch up.
+        last_lag (float): How late the most recent wake-up was, in seconds.
+        max_lag (float): The largest lag observed, in seconds.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        catch_up: CatchUpPolicy = CatchUpPolicy.BURST,
+        max_coalesced: int = 0,
+    ):
+        self.interval = interval
+        self.catch_up = CatchUpPolicy(catch_up)
+        self.max_coalesced = max_coalesced
+        self.ticks = 0
+        self.skipped = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._total_lag = 0.0
+        self._start = None
+        self._slot = 0
+
+    async def _sleep_until(self, deadline: float):
+        """
+        Suspend the stream until the event loop clock reaches the deadline.
+
+        Future deadlines are parked on the shared timer wheel rather than each
+        stream arming its own asyncio timer.
+        """
+        loop = asyncio.get_running_loop()
+        if deadline > loop.time():
+            await get_timer_wheel().sleep_until(deadline)
+        else:
+            await asyncio.sleep(0)
+
+    async def wait(self) -> Tick:
+        """
+        Wait until the next emission is due.
+
+        The first call anchors the schedule at the current loop time.
+
+        Returns:
+            Tick: How many emissions were skipped and how many are due now.
+        """
+        loop = asyncio.get_running_loop()
+        if self._start is None:
+            self._start = loop.time()
+        self._slot += 1
+        deadline = self._start + self._slot * self.interval
+        slept = loop.time()
+        await self._sleep_until(deadline)
+
+        now = loop.time()
+        lag = max(now - deadline, 0.0)
+        meter = current_meter.get()
+        if meter is not None:
+            meter.paced(lag, now - slept)
+        self.ticks += 1
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self._total_lag += lag
+
+        behind = int(lag // self.interval) if self.interval > 0 else 0
+        if behind == 0 or self.catch_up is CatchUpPolicy.BURST:
+            return Tick(skipped=0, due=1)
+        self._slot += behind
+        if self.catch_up is CatchUpPolicy.SKIP:
+            self.skipped += behind
+            return Tick(skipped=behind, due=1)
+        due = behind + 1
+        if self.max_coalesced and due > self.max_coalesced:
+            # A frame growing with the backlog would only fall further behind
+            skipped = due - self.max_coalesced
+            self.skipped += skipped
+            return Tick(skipped=skipped, due=self.max_coalesced)
+        return Tick(skipped=0, due=due)
+
+    def report(self) -> dict:
+        """
+        Returns:
+            dict: The measured drift of the stream against its schedule, in milliseconds.
+        """
+        mean_lag = self._total_lag / self.ticks if self.ticks else 0.0
+        return {
+            "ticks": self.ticks,
+            "skipped": self.skipped,
+            "last_lag_ms": round(self.last_lag * 1000, 3),
+            "mean_lag_ms": round(mean_lag * 1000, 3),
+            "max_lag_ms": round(self.max_lag * 1000, 3),
+        }
+
+
+async def paced_frames(samples, model: StreamModel, description: str):
+    """
+    Emit the data points of a sample source on the schedule of a stream.
+
+    Args:
+        samples (Union[SampleBuffer, WaveformSamples]): The seekable source of the
+            data points, positioned at the offset of the model.
+        model (StreamModel): The model holding the interval, batch size and catch-up
+            policy of the stream.
+        description (str): What the stream generates, for the log, e.g. sine wave.
+
+    Yields:
+        Frame: A frame of batch_size data points, or of the data points of every
+            emission that is due when catching up, at most MAX_BLOCK_SIZE.
+    """
+    batch_size = model.batch_size
+    pacer = Pacer(
+        model.sample_interval * batch_size,
+        model.catch_up,
+        max_coalesced=max(1, MAX_BLOCK_SIZE // batch_size),
+    )
+    count = batch_size
+    try:
+        while True:
+            yield samples.take_frame(count)
+            tick = await pacer.wait()
+            samples.skip(tick.skipped * batch_size)
+            count = tick.due * batch_size
+    except asyncio.CancelledError:
+        logger.info("Generation of %s was cancelled. Pacing drift: %s", description, pacer.report())
+        raise
+    except Exception as error:
+        logger.exception("Error occurred while generating %s: %s", description, error)
+        raise
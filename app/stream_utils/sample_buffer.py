@@ -0,0 +1,184 @@
+"""
+Module providing seekable, seeded buffers of random samples for data streams.
+
+The samples of a stream are split into fixed size blocks. Block b is drawn in one
+vectorized call from a Philox counter-based generator whose key is derived from the
+stream seed and whose counter is b. Any sample is therefore a pure function of
+(seed, sample index): a client that reconnects with the same seed and an offset
+gets exactly the continuation it missed, and the server only draws the one block
+that contains the offset instead of regenerating every earlier sample.
+
+Sources whose blocks continue the previous block, such as an anomaly run crossing
+a block boundary, are built with chained=True. Their draw function also gets the
+generator of the previous block, from which it can redraw what carries over.
+"""
+
+import secrets
+from typing import Callable, Optional
+
+import numpy as np
+
+from app.stream_utils.frames import Frame
+
+SAMPLE_BLOCK_SIZE = 1024
+
+
+def new_seed() -> int:
+    """
+    Returns:
+        int: A fresh random seed for a stream that did not request one.
+    """
+    return secrets.randbits(63)
+
+
+def derive_seed(seed: int, index: int) -> int:
+    """
+    Derive an independent seed for one of several streams sharing a seed.
+
+    Args:
+        seed (int): The shared seed.
+        index (int): The index of the stream.
+
+    Returns:
+        int: A seed depending only on the shared seed and the index.
+    """
+    return int(np.random.SeedSequence([seed, index]).generate_state(1, np.uint64)[0] >> 1)
+
+
+def stream_key(seed: int) -> np.ndarray:
+    """
+    Args:
+        seed (int): The stream seed.
+
+    Returns:
+        np.ndarray: The two word Philox key derived from the seed.
+    """
+    return np.random.SeedSequence(seed).generate_state(2, np.uint64)
+
+
+def block_generator(key: np.ndarray, block_index: int, substream: int = 0) -> np.random.Generator:
+    """
+    Build the random generator for one block of a stream.
+
+    Args:
+        key (np.ndarray): The Philox key derived from the stream seed.
+        block_index (int): The index of the block within the stream.
+        substream (int, optional): Selects an independent family of blocks, for
+            random choices made once per stream rather than once per block.
+
+    Returns:
+        np.random.Generator: A generator whose output depends only on its arguments.
+    """
+    return np.random.Generator(
+        np.random.Philox(key=key, counter=[0, 0, substream, block_index])
+    )
+
+
+class SampleBuffer:
+    """
+    A per-stream, seekable buffer of random samples.
+
+    Attributes:
+        seed (int): The seed the samples are derived from.
+        position (int): The index of the next sample to hand out.
+        block_size (int): The number of samples drawn per block.
+    """
+
+    def __init__(
+        self,
+        draw: Callable[[np.random.Generator, int], np.ndarray],
+        seed: Optional[int] = None,
+        offset: int = 0,
+        block_size: int = SAMPLE_BLOCK_SIZE,
+        label: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+        chained: bool = False,
+    ):
+        """
+        Args:
+            draw (Callable): Function taking (rng, count) and returning count samples.
+            seed (int, optional): The stream seed. Defaults to a fresh random seed.
+            offset (int, optional): The index of the first sample to hand out.
+            block_size (int, optional): The number of samples drawn per block.
+            label (Callable, optional): Function marking which samples are anomalies.
+            chained (bool, optional): Whether draw takes (rng, count, previous_rng),
+                where previous_rng is the generator of the previous block, or None
+                for the first block.
+        """
+        self._draw = draw
+        self._label = label
+        self._chained = chained
+        self.seed = seed if seed is not None else new_seed()
+        self.position = offset
+        self.block_size = block_size
+        self._key = stream_key(self.seed)
+        self._block_index = None
+        self._block = None
+
+    def block(self, block_index: int) -> np.ndarray:
+        """
+        Args:
+            block_index (int): The index of the block.
+
+        Returns:
+            np.ndarray: The samples of the block, drawn once and kept until the
+                buffer moves on to another block.
+        """
+        if block_index != self._block_index:
+            rng = block_generator(self._key, block_index)
+            if self._chained:
+                previous = block_generator(self._key, block_index - 1) if block_index else None
+                self._block = self._draw(rng, self.block_size, previous)
+            else:
+                self._block = self._draw(rng, self.block_size)
+            self._block_index = block_index
+        return self._block
+
+    def next(self) -> float:
+        """
+        Returns:
+            float: The next sample.
+        """
+        block_index, index = divmod(self.position, self.block_size)
+        self.position += 1
+        return self.block(block_index)[index]
+
+    def take(self, count: int) -> np.ndarray:
+        """
+        Args:
+            count (int): The number of samples to return.
+
+        Returns:
+            np.ndarray: The next count samples.
+        """
+        parts = []
+        while count > 0:
+            block_index, index = divmod(self.position, self.block_size)
+            part = self.block(block_index)[index:index + count]
+            self.position += len(part)
+            count -= len(part)
+            parts.append(part)
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts) if parts else np.empty(0)
+
+    def take_frame(self, count: int) -> Frame:
+        """
+        Args:
+            count (int): The number of samples to return.
+
+        Returns:
+            Frame: The next count samples, labelled if the buffer has a label function.
+        """
+        index = self.position
+        values = self.take(count)
+        labels = self._label(values) if self._label is not None else None
+        return Frame(index, values, labels)
+
+    def skip(self, count: int):
+        """
+        Advance past count samples without drawing them.
+
+        Args:
+            count (int): The number of samples to skip.
+        """
+        self.position += count
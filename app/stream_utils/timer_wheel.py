@@ -0,0 +1,133 @@
+"""
+Module providing a shared timer wheel that drives the pacing of all streams.
+
+With thousands of open streams, giving each stream its own asyncio timer makes the
+event loop's timer heap a hotspot. Instead, every stream parks a future in a slot of
+one hashed timing wheel per event loop. A single task wakes once per tick and
+resolves the futures due in that slot, so scheduling a wake-up is an O(1) list
+append, and streams with equal intervals are woken together in the same tick.
+"""
+
+import asyncio
+import math
+import weakref
+
+TICK_RESOLUTION = 0.005
+WHEEL_SLOTS = 512
+
+_wheels = weakref.WeakKeyDictionary()
+
+
+class TimerWheel:
+    """
+    A hashed timing wheel bound to one event loop.
+
+    Deadlines are rounded up to the next tick boundary. Slot i holds the timers
+    whose tick number is congruent to i modulo the number of slots; timers further
+    away than one revolution stay in their slot until their tick comes round.
+
+    Attributes:
+        resolution (float): The length of one tick in seconds.
+        pending (int): The number of timers not yet fired.
+    """
+
+    def __init__(self, resolution: float = TICK_RESOLUTION, slots: int = WHEEL_SLOTS):
+        self.resolution = resolution
+        self.pending = 0
+        self._slots = [[] for _ in range(slots)]
+        self._origin = None
+        self._current_tick = 0
+        self._runner = None
+
+    def _tick_at(self, time: float) -> int:
+        """
+        The number of the last tick at or before the given loop time.
+        """
+        return math.floor((time - self._origin) / self.resolution)
+
+    async def sleep_until(self, deadline: float):
+        """
+        Suspend the caller until the first tick at or after the deadline.
+
+        Args:
+            deadline (float): The event loop time to wake up at.
+        """
+        loop = asyncio.get_running_loop()
+        if self._origin is None:
+            self._origin = loop.time()
+        if self._runner is None:
+            self._current_tick = self._tick_at(loop.time())
+            self._runner = loop.create_task(self._run())
+
+        tick = max(
+            math.ceil((deadline - self._origin) / self.resolution),
+            self._current_tick + 1,
+        )
+        future = loop.create_future()
+        entry = (tick, future)
+        slot = self._slots[tick % len(self._slots)]
+        slot.append(entry)
+        self.pending += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Forget the timer unless it already fired, so the wheel can stop
+            slot = self._slots[tick % len(self._slots)]
+            if entry in slot:
+                slot.remove(entry)
+                self.pending -= 1
+            raise
+
+    def _fire(self, tick: int):
+        """
+        Resolve the timers in the slot of the given tick that are due.
+        """
+        index = tick % len(self._slots)
+        slot = self._slots[index]
+        if not slot:
+            return
+        waiting = []
+        for entry in slot:
+            if entry[0] <= tick:
+                self.pending -= 1
+                if not entry[1].done():
+                    entry[1].set_result(None)
+            else:
+                waiting.append(entry)
+        self._slots[index] = waiting
+
+    async def _run(self):
+        """
+        Advance the wheel once per tick until no timers are left.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            while self.pending:
+                next_tick_time = self._origin + (self._current_tick + 1) * self.resolution
+                delay = next_tick_time - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                now_tick = self._tick_at(loop.time())
+                if now_tick - self._current_tick >= len(self._slots):
+                    # The loop stalled for a whole revolution: every slot is due.
+                    self._current_tick = now_tick
+                    for tick in range(now_tick - len(self._slots) + 1, now_tick + 1):
+                        self._fire(tick)
+                    continue
+                while self._current_tick < now_tick:
+                    self._current_tick += 1
+                    self._fire(self._current_tick)
+        finally:
+            self._runner = None
+
+
+def get_timer_wheel() -> TimerWheel:
+    """
+    Returns:
+        TimerWheel: The timer wheel shared by all streams on the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    wheel = _wheels.get(loop)
+    if wheel is None:
+        wheel = _wheels[loop] = TimerWheel()
+    return wheel
@@ -0,0 +1,216 @@
+"""
+Module providing a shared cache of precomputed one-period lookup tables for
+periodic waveforms.
+
+A waveform evaluated at integer time indices with frequency / sample_rate = p / q
+(in lowest terms) repeats exactly every q data points. For such parameter sets the
+first q data points are computed once, shared by every stream with the same
+parameters, and streams only advance an index into the table.
+"""
+
+import functools
+from fractions import Fraction
+from typing import Callable, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+from app.stream_utils.frames import Frame
+from app.stream_utils.text_format import format_block, line_offsets
+
+MAX_TABLE_PERIOD = 16384
+TABLE_CACHE_SIZE = 128
+FREQUENCY_TOLERANCE = 1e-12
+
+# Model fields that determine the values of a waveform table.
+TABLE_PARAMETERS = ("amplitude", "frequency", "phase", "sample_rate")
+
+
+class WaveformTable:
+    """
+    One period of a waveform together with its lazily built text representation.
+
+    Attributes:
+        values (np.ndarray): The data points for time indices 0 to period - 1.
+        period (int): The number of data points in one period.
+    """
+
+    def __init__(self, values: np.ndarray):
+        self.values = values
+        self.values.flags.writeable = False
+        self.period = len(values)
+
+    @functools.cached_property
+    def _text(self):
+        """
+        The formatted period and the offset at which each data point starts in it.
+        """
+        text = format_block(self.values)
+        return text, line_offsets(text)
+
+    def take(self, start: int, count: int) -> np.ndarray:
+        """
+        Args:
+            start (int): The time index of the first data point.
+            count (int): The number of data points.
+
+        Returns:
+            np.ndarray: The data points for time indices start to start + count - 1.
+        """
+        position = start % self.period
+        if position + count <= self.period:
+            return self.values[position:position + count]
+        # np.take with mode="wrap" slows down with the number of periods spanned
+        return self.values[np.arange(position, position + count) % self.period]
+
+    def text_chunk(self, start: int, count: int) -> str:
+        """
+        Args:
+            start (int): The time index of the first data point.
+            count (int): The number of data points.
+
+        Returns:
+            str: The newline terminated, pre-formatted data points for time indices
+                start to start + count - 1.
+        """
+        text, offsets = self._text
+        position = start % self.period
+        end = position + count
+        if end <= self.period:
+            return text[offsets[position]:offsets[end]]
+        full_periods, remainder = divmod(end - self.period, self.period)
+        return (
+            text[offsets[position]:]
+            + text * full_periods
+            + text[:offsets[remainder]]
+        )
+
+
+def waveform_period(
+    frequency: float, sample_rate: int, max_period: int = MAX_TABLE_PERIOD
+) -> Optional[int]:
+    """
+    Determine after how many data points a waveform repeats.
+
+    Args:
+        frequency (float): The number of cycles per second of the waveform.
+        sample_rate (int): The number of data points per second.
+        max_period (int, optional): The longest period worth tabulating.
+
+    Returns:
+        Optional[int]: The period in data points, or None if frequency / sample_rate is not
+            a ratio with a denominator of at most max_period.
+    """
+    if sample_rate <= 0:
+        return None
+    exact = Fraction(frequency).limit_denominator(max_period * sample_rate)
+    if abs(float(exact) - frequency) > FREQUENCY_TOLERANCE * abs(frequency):
+        return None
+    period = (exact / sample_rate).denominator
+    if period > max_period:
+        return None
+    return period
+
+
+@functools.lru_cache(maxsize=TABLE_CACHE_SIZE)
+def _cached_table(block_fn, model_class, parameters, period) -> WaveformTable:
+    """
+    Build the table for one parameter set; shared through the LRU cache.
+    """
+    return WaveformTable(block_fn(model_class(**dict(parameters)), 0, period))
+
+
+def get_waveform_table(
+    block_fn: Callable[[BaseModel, int, int], np.ndarray], model: BaseModel
+) -> Optional[WaveformTable]:
+    """
+    Look up, or build and cache, the one-period table for a waveform model.
+
+    Args:
+        block_fn (Callable): The vectorized block function of the waveform,
+            taking (model, start, count).
+        model (BaseModel): The waveform model; only its amplitude, frequency, phase and
+            sample_rate fields select the table.
+
+    Returns:
+        Optional[WaveformTable]: The shared table, or None if the waveform is not
+            periodic in a small enough number of data points.
+    """
+    period = waveform_period(model.frequency, model.sample_rate)
+    if period is None:
+        return None
+    parameters = tuple(
+        (name, getattr(model, name))
+        for name in TABLE_PARAMETERS
+        if name in type(model).model_fields
+    )
+    return _cached_table(block_fn, type(model), parameters, period)
+
+
+class WaveformSamples:
+    """
+    A seekable source of waveform data points.
+
+    Periodic waveforms are served from their shared lookup table, all others are
+    computed with the vectorized block function.
+
+    Attributes:
+        position (int): The time index of the next data point.
+        table (Optional[WaveformTable]): The shared table, if the waveform has one.
+    """
+
+    def __init__(
+        self,
+        block_fn: Callable[[BaseModel, int, int], np.ndarray],
+        model: BaseModel,
+        tabulate: bool = True,
+    ):
+        """
+        Args:
+            block_fn (Callable): The vectorized block function of the waveform.
+            model (BaseModel): The waveform model; data points start at its offset.
+            tabulate (bool, optional): Whether the waveform may be served from a table.
+        """
+        self._block_fn = block_fn
+        self._model = model
+        self.position = model.offset
+        self.table = get_waveform_table(block_fn, model) if tabulate else None
+
+    def take(self, count: int) -> np.ndarray:
+        """
+        Args:
+            count (int): The number of data points to return.
+
+        Returns:
+            np.ndarray: The next count data points.
+        """
+        if self.table is not None:
+            values = self.table.take(self.position, count)
+        else:
+            values = self._block_fn(self._model, self.position, count)
+        self.position += count
+        return values
+
+    def take_frame(self, count: int) -> Frame:
+        """
+        Args:
+            count (int): The number of data points to return.
+
+        Returns:
+            Frame: The next count data points, with their text taken from the table
+                when the waveform has one.
+        """
+        index = self.position
+        if self.table is None:
+            return Frame(index, self.take(count))
+        text = self.table.text_chunk(index, count)
+        return Frame(index, self.take(count), text=text)
+
+    def skip(self, count: int):
+        """
+        Advance past count data points without computing them.
+
+        Args:
+            count (int): The number of data points to skip.
+        """
+        self.position += count
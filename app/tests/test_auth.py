@@ -0,0 +1,99 @@
+"""
+This script contains in-process tests for the registration and login endpoints.
+They mount the auth router on a test app with a temporary database and do not
+need a running server.
+"""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db_utils import crud
+from app.db_utils.database import Base
+from app.endpoints.auth_endpoint import get_db, router
+
+
+@pytest.fixture(autouse=True, name="pwd_context")
+def fixture_pwd_context(monkeypatch):
+    """
+    Hash passwords with a scheme that does not depend on the installed bcrypt version.
+    """
+    monkeypatch.setattr(crud, "pwd_context", CryptContext(schemes=["pbkdf2_sha256"]))
+
+
+@pytest.fixture(name="client")
+def fixture_client(monkeypatch, tmp_path):
+    """
+    A test client for an app serving only the auth endpoints, backed by a new database.
+    """
+    monkeypatch.setattr(crud, "SECRET_KEY", "test-secret-key-" + "0" * 32)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def create_tables():
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+    async def get_test_db():
+        async with sessions() as db:
+            yield db
+
+    asyncio.run(create_tables())
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_db] = get_test_db
+    with TestClient(app) as client:
+        yield client
+    asyncio.run(engine.dispose())
+
+
+def test_register_and_login(client):
+    """
+    A registered user logs in with their password and gets a valid token.
+    """
+    response = client.post("/register", json={"username": "tester", "password": "secret"})
+    assert response.status_code == 200
+    assert response.json()["username"] == "tester"
+    assert client.post(
+        "/register", json={"username": "tester", "password": "other"}
+    ).status_code == 400
+
+    response = client.post("/token", data={"username": "tester", "password": "secret"})
+    assert response.status_code == 200
+    assert crud.verify_token(response.json()["access_token"]).username == "tester"
+
+
+def test_login_rejects_wrong_password(client):
+    """
+    A wrong password or an unknown user is refused.
+    """
+    client.post("/register", json={"username": "tester", "password": "secret"})
+    for username, password in [("tester", "wrong"), ("nobody", "secret")]:
+        response = client.post("/token", data={"username": username, "password": password})
+        assert response.status_code == 401
+
+
+def test_password_hashing_leaves_event_loop_running():
+    """
+    Hashing a password runs on the hashing pool while the event loop keeps ticking.
+    """
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.001)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        hashed = await crud.get_password_hash_async("secret")
+        assert await crud.verify_password_async("secret", hashed)
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(run()) > 10
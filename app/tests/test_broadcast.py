@@ -0,0 +1,55 @@
+"""
+This script contains tests for fanning out identical streams to a shared producer.
+"""
+
+import asyncio
+
+from app.generators import normal
+from app.models.distribution_models import NormalModel
+from app.stream_utils.broadcast import Broadcaster
+
+
+def test_identical_subscribers_share_one_producer():
+    """
+    Subscribers with equal parameters receive the same chunks from one producer,
+    which is torn down when the last of them disconnects.
+    """
+    async def run():
+        broadcaster = Broadcaster()
+        model = NormalModel(interval=0.01)
+        first = broadcaster.subscribe(normal.generate_normal_data, model)
+        second = broadcaster.subscribe(normal.generate_normal_data, NormalModel(interval=0.01))
+        other = broadcaster.subscribe(normal.generate_normal_data, NormalModel(interval=0.02))
+
+        # Subscribe all three before the producers emit their first chunk.
+        pending = [asyncio.ensure_future(anext(stream)) for stream in (first, second, other)]
+        await asyncio.sleep(0)
+        assert broadcaster.producer_count() == 2
+        frames = await asyncio.gather(*pending)
+        assert frames[0] is frames[1]
+        assert await anext(first) is await anext(second)
+
+        for stream in (first, second, other):
+            await stream.aclose()
+        await asyncio.sleep(0)
+        return broadcaster
+
+    broadcaster = asyncio.run(run())
+    assert broadcaster.producer_count() == 0
+
+
+def test_slow_subscriber_drops_oldest_chunks():
+    """
+    A subscriber that does not read only keeps the newest chunks.
+    """
+    async def run():
+        broadcaster = Broadcaster(queue_size=4)
+        stream = broadcaster.subscribe(normal.generate_normal_data, NormalModel(interval=0))
+        first = await anext(stream)
+        await asyncio.sleep(0.05)
+        later = [await anext(stream) for _ in range(4)]
+        await stream.aclose()
+        return first, later
+
+    first, later = asyncio.run(run())
+    assert all(frame.index > first.index + 1 for frame in later)
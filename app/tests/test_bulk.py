@@ -0,0 +1,94 @@
+"""
+This script contains in-process tests for the bulk backfill endpoints.
+They do not need a running server.
+"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.endpoints.streaming import SEED_HEADER, bulk_response
+from app.generators import normal, sine
+from app.models.distribution_models import NormalModel
+from app.models.stream_models import BulkOptions
+from app.models.waveform_models import SineModel
+from app.stream_utils.bulk import generate_bulk_data
+
+
+def read_body(response):
+    """
+    Read the whole body of a streaming response.
+    """
+    async def _read():
+        return b"".join([chunk async for chunk in response.body_iterator]).decode()
+
+    return asyncio.run(_read())
+
+
+def read_stream(stream, count):
+    """
+    Read the first count data points of a paced data stream.
+    """
+    async def _read():
+        lines = []
+        async for frame in stream:
+            lines.extend(frame.as_text().splitlines(keepends=True))
+            if len(lines) >= count:
+                break
+        await stream.aclose()
+        return "".join(lines[:count])
+
+    return asyncio.run(_read())
+
+
+async def join(stream):
+    """
+    Join the text of all frames of an async data stream.
+    """
+    return "".join([frame.as_text() async for frame in stream])
+
+
+def test_bulk_data_matches_paced_stream():
+    """
+    A bulk request returns exactly the data points of the paced stream with the same seed.
+    """
+    model = NormalModel(interval=0, seed=99, offset=7)
+    bulk = asyncio.run(join(generate_bulk_data(normal.normal_samples(model), 20000, 4096)))
+    assert len(bulk.splitlines()) == 20000
+    assert bulk == read_stream(normal.generate_normal_data(model), 20000)
+
+
+def test_bulk_response_converts_duration_to_count():
+    """
+    A duration is converted to the number of data points the stream emits in that time.
+    """
+    model = SineModel(interval=0.25)
+    response = bulk_response(sine.sine_samples, model, model.interval, BulkOptions(duration=10))
+    assert len(read_body(response).splitlines()) == 40
+    assert response.headers[SEED_HEADER].isdigit()
+
+
+@pytest.mark.parametrize(
+    "options",
+    [BulkOptions(), BulkOptions(count=10, duration=1.0)],
+)
+def test_bulk_response_needs_exactly_one_limit(options):
+    """
+    A bulk request must give exactly one of count and duration.
+    """
+    model = SineModel()
+    with pytest.raises(HTTPException) as error:
+        bulk_response(sine.sine_samples, model, model.interval, options)
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize("duration, interval", [(1e300, 1e-300), (1e6, 1e-6)])
+def test_bulk_response_rejects_durations_beyond_the_count_limit(duration, interval):
+    """
+    A duration covering more data points than a bulk request may return is rejected.
+    """
+    model = SineModel()
+    with pytest.raises(HTTPException) as error:
+        bulk_response(sine.sine_samples, model, interval, BulkOptions(duration=duration))
+    assert error.value.status_code == 422
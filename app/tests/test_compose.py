@@ -0,0 +1,88 @@
+"""
+This script contains in-process tests for composed signals.
+They do not need a running server.
+"""
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from app.generators import normal, sine
+from app.generators.anomalies import clustered
+from app.generators.compose import composed_samples
+from app.models.anomaly_models import ClusteredAnomalyModel
+from app.models.compose_models import ComposeModel
+from app.models.distribution_models import NormalModel
+from app.models.waveform_models import SineModel
+from app.stream_utils.sample_buffer import derive_seed
+
+SIGNAL = {
+    "op": "mask",
+    "inputs": [
+        {
+            "op": "add",
+            "inputs": [
+                {"stream": "sine", "params": {"sample_rate": 50}},
+                {"stream": "normal", "params": {"std_dev": 0.1}},
+            ],
+        },
+        {"stream": "anomalies/clustered", "params": {"constant_value": 0}},
+    ],
+}
+
+
+def test_composed_signal_matches_its_sources():
+    """
+    A composed signal equals its sources combined over one time index, with the
+    sources seeded from the signal seed in depth first order.
+    """
+    frame = composed_samples(ComposeModel(signal=SIGNAL, seed=11)).take_frame(3000)
+
+    wave = sine.sine_samples(SineModel(sample_rate=50)).take(3000)
+    noise = normal.normal_samples(
+        NormalModel(std_dev=0.1, seed=derive_seed(11, 1))
+    ).take(3000)
+    overlay = clustered.clustered_samples(
+        ClusteredAnomalyModel(constant_value=0, seed=derive_seed(11, 2))
+    ).take_frame(3000)
+    expected = np.where(overlay.labels, overlay.values, wave + noise)
+    np.testing.assert_allclose(frame.values, expected)
+    np.testing.assert_array_equal(frame.labels, overlay.labels)
+    assert overlay.labels.any()
+
+
+def test_composed_signal_resumes_at_offset():
+    """
+    Seeking a composed signal seeks all of its sources together.
+    """
+    samples = composed_samples(ComposeModel(signal=SIGNAL, seed=4))
+    full = samples.take(5000)
+    samples = composed_samples(ComposeModel(signal=SIGNAL, seed=4))
+    samples.skip(1000)
+    resumed = composed_samples(ComposeModel(signal=SIGNAL, seed=4, offset=1000))
+    np.testing.assert_allclose(samples.take(4000), full[1000:])
+    np.testing.assert_allclose(resumed.take(4000), full[1000:])
+
+
+@pytest.mark.parametrize(
+    "signal",
+    [
+        {"op": "mask", "inputs": [{"stream": "sine"}] * 3},
+        {"op": "add", "inputs": [{"stream": "sine"}]},
+        {"op": "add", "inputs": [{"stream": "sine"}] * 40},
+    ],
+)
+def test_invalid_signals_are_rejected(signal):
+    """
+    Operators need the right number of inputs and signals have a bounded size.
+    """
+    with pytest.raises(ValidationError):
+        ComposeModel(signal=signal)
+
+
+def test_unknown_stream_is_rejected():
+    """
+    A source must name one of the existing streams.
+    """
+    with pytest.raises(ValueError):
+        composed_samples(ComposeModel(signal={"stream": "nope"}))
@@ -0,0 +1,106 @@
+"""
+This script contains in-process tests for the streaming compression.
+They do not need a running server.
+"""
+
+import asyncio
+import zlib
+
+import pytest
+
+from app.endpoints.streaming import encode_stream
+from app.generators import sine
+from app.models.waveform_models import SineModel
+from app.stream_utils import compression
+from app.stream_utils.compression import StreamCompressor, compress_stream, negotiate_encoding
+from app.stream_utils.encoders import TextEncoder
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, zstd, expected",
+    [
+        (None, True, None),
+        ("identity", True, None),
+        ("gzip, deflate, br", True, "gzip"),
+        ("gzip, zstd", True, "zstd"),
+        ("gzip, zstd", False, "gzip"),
+        ("zstd;q=0.5, gzip", True, "gzip"),
+        ("*", True, "zstd"),
+        ("gzip;q=0", True, None),
+    ],
+)
+def test_negotiate_encoding(monkeypatch, accept_encoding, zstd, expected):
+    """
+    The encoding follows the client's quality values and what the server supports.
+    """
+    monkeypatch.setattr(compression, "zstd_available", lambda: zstd)
+    assert negotiate_encoding(accept_encoding) == expected
+
+
+def test_slow_stream_is_flushed_within_the_interval():
+    """
+    A chunk reaches the client once the flush interval passes, without waiting for
+    the next chunk, and the whole stream decompresses to the original.
+    """
+    async def slow_chunks():
+        for line in range(3):
+            yield f"{line}.000\n"
+            await asyncio.sleep(0.2)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        received = []
+        compressor = StreamCompressor("gzip")
+        async for data in compress_stream(slow_chunks(), compressor, flush_interval=0.02):
+            received.append((loop.time() - started, data))
+        return compressor, received
+
+    compressor, received = asyncio.run(run())
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    first_data = next(
+        elapsed for elapsed, data in received if decompressor.decompress(data)
+    )
+    assert first_data < 0.15
+    body = b"".join(data for _, data in received)
+    assert zlib.decompress(body, 16 + zlib.MAX_WBITS) == b"0.000\n1.000\n2.000\n"
+    assert compressor.report()["bytes_in"] == 18
+
+
+def test_zstd_stream_round_trips():
+    """
+    A zstd stream of constant lines decompresses to the original and shrinks.
+    """
+    zstandard = pytest.importorskip("zstandard")
+
+    async def chunks():
+        for _ in range(100):
+            yield "0.000\n" * 100
+
+    async def run():
+        compressor = StreamCompressor("zstd")
+        body = b"".join([data async for data in compress_stream(chunks(), compressor)])
+        return compressor, body
+
+    compressor, body = asyncio.run(run())
+    output = zstandard.ZstdDecompressor().decompressobj().decompress(body)
+    assert output == b"0.000\n" * 10000
+    assert compressor.report()["ratio"] > 50
+
+
+def test_closing_with_a_queued_chunk_does_not_hang():
+    """
+    Closing a compressed stream while a chunk is queued and the generator waits for
+    its next deadline ends the reader instead of leaving it blocked on the queue.
+    """
+    async def run():
+        frames = sine.generate_sine_data(SineModel(interval=0.2, seed=1))
+        body = compress_stream(
+            encode_stream(frames, TextEncoder()), StreamCompressor("gzip"), 0.05
+        )
+        await body.__anext__()
+        await asyncio.sleep(0.3)
+        await asyncio.wait_for(body.aclose(), 2)
+        return [task for task in asyncio.all_tasks() if "pump" in task.get_coro().__qualname__]
+
+    assert asyncio.run(run()) == []
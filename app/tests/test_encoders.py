@@ -0,0 +1,145 @@
+"""
+This script contains in-process tests for the wire format encoders.
+They do not need a running server.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from app.endpoints import streaming
+from app.endpoints.streaming import bulk_response, wire_options
+from app.generators.anomalies import random_anomaly
+from app.models.anomaly_models import RandomAnomalyModel
+from app.models.stream_models import BulkOptions, WireOptions
+from app.stream_utils.encoders import (
+    FRAME_HEADER,
+    LABELS_FLAG,
+    TIMESTAMPS_FLAG,
+    WireFormat,
+    make_encoder,
+    negotiate_format,
+)
+from app.stream_utils.frames import Frame
+
+
+def decode_packed(data: bytes, dtype: str):
+    """
+    Split a packed binary stream into its frames and decode their columns.
+    """
+    frames = []
+    while data:
+        length, count, flags = FRAME_HEADER.unpack_from(data)
+        payload = data[FRAME_HEADER.size:FRAME_HEADER.size + length]
+        values = np.frombuffer(payload, dtype=dtype, count=count)
+        position = values.nbytes
+        timestamps = labels = None
+        if flags & TIMESTAMPS_FLAG:
+            timestamps = np.frombuffer(payload, dtype="<f8", count=count, offset=position)
+            position += timestamps.nbytes
+        if flags & LABELS_FLAG:
+            labels = np.frombuffer(payload, dtype=np.uint8, count=count, offset=position)
+        frames.append((values, timestamps, labels))
+        data = data[FRAME_HEADER.size + length:]
+    return frames
+
+
+@pytest.mark.parametrize(
+    "requested, accept, expected",
+    [
+        (None, None, WireFormat.TEXT),
+        (None, "*/*", WireFormat.TEXT),
+        (None, "application/x-float32-frames", WireFormat.FLOAT32),
+        (
+            None,
+            "text/plain;q=0.5, application/x-float64-frames;q=0.9",
+            WireFormat.FLOAT64,
+        ),
+        (WireFormat.FLOAT32, "application/x-float64-frames", WireFormat.FLOAT32),
+    ],
+)
+def test_negotiate_format(requested, accept, expected):
+    """
+    The format parameter wins over the Accept header, which is matched by quality.
+    """
+    assert negotiate_format(requested, accept) == expected
+
+
+@pytest.mark.parametrize("wire_format, dtype", [("float32", "<f4"), ("float64", "<f8")])
+def test_packed_frames_decode_with_frombuffer(wire_format, dtype):
+    """
+    Packed frames carry the values, timestamps and labels as plain little-endian arrays.
+    """
+    encoder = make_encoder(WireFormat(wire_format), interval=0.5, timestamps=True)
+    first = Frame(10, np.array([1.5, -2.25, 3.0]), labels=np.array([False, True, False]))
+    second = Frame(13, np.array([4.0]), labels=np.array([True]))
+    data = encoder.encode(first) + encoder.encode(second)
+
+    decoded = decode_packed(data, dtype)
+    np.testing.assert_array_equal(decoded[0][0], first.values)
+    np.testing.assert_array_equal(decoded[1][2], [1])
+    timestamps = np.concatenate([decoded[0][1], decoded[1][1]])
+    np.testing.assert_allclose(np.diff(timestamps), 0.5)
+
+
+def test_bulk_response_encodes_binary_frames():
+    """
+    A binary bulk response holds the same data points as the text one.
+    """
+    async def read(response):
+        return b"".join(
+            [
+                chunk if isinstance(chunk, bytes) else chunk.encode()
+                async for chunk in response.body_iterator
+            ]
+        )
+
+    model = RandomAnomalyModel(seed=5, anomaly_probability=0.3)
+    options = BulkOptions(count=3000)
+    text = asyncio.run(
+        read(bulk_response(random_anomaly.random_anomaly_samples, model, 1, options))
+    )
+    binary = asyncio.run(
+        read(
+            bulk_response(
+                random_anomaly.random_anomaly_samples,
+                model,
+                1,
+                options,
+                WireOptions(format=WireFormat.FLOAT64),
+            )
+        )
+    )
+    frames = decode_packed(binary, "<f8")
+    values = np.concatenate([frame[0] for frame in frames])
+    labels = np.concatenate([frame[2] for frame in frames]).astype(bool)
+    assert [f"{value:.3f}" for value in values.tolist()] == text.decode().splitlines()
+    np.testing.assert_array_equal(labels, values != model.base_value)
+
+
+def test_arrow_stream_round_trips():
+    """
+    Arrow frames form one IPC stream with a record batch per frame.
+    """
+    pa = pytest.importorskip("pyarrow")
+    encoder = make_encoder(WireFormat.ARROW, interval=1.0, timestamps=True)
+    data = encoder.encode(Frame(0, np.array([1.0, 2.0]), labels=np.array([False, True])))
+    data += encoder.encode(Frame(2, np.array([3.0]), labels=np.array([False])))
+    data += encoder.finish()
+
+    table = pa.ipc.open_stream(data).read_all()
+    assert table.column("value").to_pylist() == [1.0, 2.0, 3.0]
+    assert table.column("is_anomaly").to_pylist() == [False, True, False]
+    assert table.num_columns == 3
+
+
+def test_arrow_needs_pyarrow(monkeypatch):
+    """
+    Requesting Arrow without pyarrow installed is rejected as not acceptable.
+    """
+    monkeypatch.setattr(streaming, "arrow_available", lambda: False)
+    with pytest.raises(HTTPException) as error:
+        wire_options(wire_format=WireFormat.ARROW, timestamps=False, accept=None)
+    assert error.value.status_code == 406
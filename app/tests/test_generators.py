@@ -0,0 +1,367 @@
+"""
+This script contains in-process tests for the data generators.
+They import the generators directly and do not need a running server.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.generators import sine, cosine, square, sawtooth, normal, uniform, exponential
+from app.generators.anomalies import (
+    periodic_spike,
+    clustered,
+    count_duration,
+    random_anomaly,
+    random_square,
+)
+from app.generators.anomalies.schedule import (
+    bernoulli_positions,
+    run_mask,
+    run_schedule,
+    window_mask,
+)
+from app.models.anomaly_models import (
+    RandomAnomalyModel,
+    RandomSquareModel,
+    ClusteredAnomalyModel,
+    SpikeAnomalyModel,
+    CountBasedAnomalyModel,
+)
+from app.models.distribution_models import NormalModel, UniformModel, ExponentialModel
+from app.models.waveform_models import SineModel, CosineModel, SquareModel, SawtoothModel
+from app.stream_utils.sample_buffer import SampleBuffer
+from app.stream_utils.text_format import Notation, TextFormat, format_block
+from app.stream_utils.waveform_tables import (
+    WaveformSamples,
+    get_waveform_table,
+    waveform_period,
+)
+
+
+def collect(stream, chunks):
+    """
+    Collect the text of the given number of frames from an async data stream.
+    """
+    async def _collect():
+        received = []
+        async for frame in stream:
+            received.append(frame.as_text())
+            if len(received) >= chunks:
+                break
+        await stream.aclose()
+        return received
+
+    return asyncio.run(_collect())
+
+
+@pytest.mark.parametrize(
+    "block_fn, model, scalar_fn",
+    [
+        (
+            sine.sine_block,
+            SineModel(phase=1),
+            lambda m, t: m.amplitude * np.sin(
+                2 * np.pi * m.frequency * (t / m.sample_rate) + m.phase
+            ),
+        ),
+        (
+            cosine.cosine_block,
+            CosineModel(),
+            lambda m, t: m.amplitude * np.cos(2 * np.pi * m.frequency * (t / m.sample_rate)),
+        ),
+        (
+            sawtooth.sawtooth_block,
+            SawtoothModel(),
+            lambda m, t: m.amplitude * (
+                2 * np.pi * m.frequency * (t / m.sample_rate)
+                - np.floor(2 * np.pi * m.frequency * (t / m.sample_rate))
+            ),
+        ),
+    ],
+)
+def test_waveform_block_matches_scalar(block_fn, model, scalar_fn):
+    """
+    A vectorized block must format identically to the per-sample computation.
+    """
+    block = block_fn(model, 37, 250)
+    expected = [f"{scalar_fn(model, t):.3f}" for t in range(37, 287)]
+    assert [f"{value:.3f}" for value in block.tolist()] == expected
+
+
+@pytest.mark.parametrize(
+    "generator, model",
+    [
+        (sine.generate_sine_data, SineModel(interval=0, batch_size=16)),
+        (cosine.generate_cosine_data, CosineModel(interval=0, batch_size=16)),
+        (square.generate_square_data, SquareModel(interval=0, batch_size=16)),
+        (sawtooth.generate_sawtooth_data, SawtoothModel(interval=0, batch_size=16)),
+    ],
+)
+def test_waveform_batches_are_contiguous(generator, model):
+    """
+    Batched chunks must concatenate to the same stream as single data points.
+    """
+    batched = "".join(collect(generator(model), 4))
+    single = "".join(
+        collect(generator(model.model_copy(update={"batch_size": 1})), 64)
+    )
+    assert batched.count("\n") == 64
+    assert batched == single
+
+
+def test_square_is_high_for_the_first_half_period():
+    """
+    The square wave is 1 in the first half of every period and -1 in the second.
+    """
+    block = square.square_block(SquareModel(frequency=2, sample_rate=8), 0, 12)
+    assert block.tolist() == [1, 1, -1, -1] * 3
+
+
+def test_square_table_matches_formula():
+    """
+    The table of the default square wave gives the same data points as the formula,
+    including at the half-period edges of large time indices.
+    """
+    model = SquareModel(seed=1)
+    tabulated = WaveformSamples(square.square_block, model)
+    computed = WaveformSamples(square.square_block, model, tabulate=False)
+    assert tabulated.table is not None
+    count = 2_000_000
+    assert np.array_equal(tabulated.take(count), computed.take(count))
+    assert computed.take(50).tolist() == [1.0] * 25 + [-1.0] * 25
+
+
+def test_sample_buffer_seeks_without_replaying():
+    """
+    Samples depend only on the seed and their index, across block boundaries.
+    """
+    def draw(rng, count):
+        return rng.random(count)
+
+    buffer = SampleBuffer(draw, seed=7, block_size=100)
+    drawn = [buffer.next() for _ in range(10)]
+    drawn.extend(buffer.take(1000).tolist())
+
+    resumed = SampleBuffer(draw, seed=7, offset=450, block_size=100)
+    assert resumed.take(560).tolist() == drawn[450:]
+    assert SampleBuffer(draw, seed=8, block_size=100).take(10).tolist() != drawn[:10]
+
+
+@pytest.mark.parametrize(
+    "block_fn, model, mean, std",
+    [
+        (normal.normal_block, NormalModel(mean=3, std_dev=2), 3, 2),
+        (uniform.uniform_block, UniformModel(min_val=-1, max_val=1), 0, 1 / np.sqrt(3)),
+        (exponential.exponential_block, ExponentialModel(scale=2), 2, 2),
+    ],
+)
+def test_distribution_block_moments(block_fn, model, mean, std):
+    """
+    Blocks drawn from a numpy Generator must follow the requested distribution.
+    """
+    samples = block_fn(model, np.random.default_rng(0), 200_000)
+    assert samples.mean() == pytest.approx(mean, abs=0.02)
+    assert samples.std() == pytest.approx(std, abs=0.02)
+
+
+@pytest.mark.parametrize(
+    "frequency, sample_rate, period",
+    [(2, 100, 50), (0.25, 100, 400), (0.1, 100, 1000), (3, 7, 7), (0, 100, 1), (np.pi, 100, None)],
+)
+def test_waveform_period(frequency, sample_rate, period):
+    """
+    Rational frequency / sample_rate ratios must be detected as periodic.
+    """
+    assert waveform_period(frequency, sample_rate) == period
+
+
+def test_waveform_table_is_shared_and_wraps():
+    """
+    Equal parameter sets share one table, and chunks wrap around the period.
+    """
+    model = SineModel(amplitude=3, frequency=3, sample_rate=7)
+    table = get_waveform_table(sine.sine_block, model)
+    assert table is get_waveform_table(sine.sine_block, model.model_copy(update={"interval": 5}))
+    assert table.period == 7
+
+    direct = sine.sine_block(model, 5, 40)
+    np.testing.assert_allclose(table.take(5, 40), direct, atol=1e-9)
+    assert table.text_chunk(5, 40) == "".join(
+        f"{value:.3f}\n" for value in table.take(5, 40).tolist()
+    )
+    assert table.text_chunk(12, 3) == table.text_chunk(5, 3)
+
+
+@pytest.mark.parametrize(
+    "generator, model",
+    [
+        (random_anomaly.generate_random_anomalies, RandomAnomalyModel(data_interval=0)),
+        (random_square.generate_random_square, RandomSquareModel(data_interval=0)),
+        (clustered.generate_clustered_anomalies, ClusteredAnomalyModel(data_interval=0)),
+        (periodic_spike.generate_periodic_spike_data, SpikeAnomalyModel(data_interval=0)),
+        (count_duration.generate_count_based_anomalies_data, CountBasedAnomalyModel(data_interval=0)),
+    ],
+)
+def test_anomaly_streams_emit_data_points(generator, model):
+    """
+    Every anomaly stream emits parseable data points.
+    """
+    chunks = collect(generator(model), 300)
+    values = [float(line) for chunk in chunks for line in chunk.splitlines()]
+    assert len(values) == 300
+
+
+@pytest.mark.parametrize(
+    "generator, model",
+    [
+        (sine.generate_sine_data, SineModel(interval=0)),
+        (sawtooth.generate_sawtooth_data, SawtoothModel(interval=0)),
+        (normal.generate_normal_data, NormalModel(interval=0)),
+        (uniform.generate_uniform_data, UniformModel(interval=0)),
+        (exponential.generate_exponential_data, ExponentialModel(interval=0)),
+        (random_anomaly.generate_random_anomalies, RandomAnomalyModel(data_interval=0)),
+        (random_square.generate_random_square, RandomSquareModel(data_interval=0)),
+        (clustered.generate_clustered_anomalies, ClusteredAnomalyModel(data_interval=0)),
+        (periodic_spike.generate_periodic_spike_data, SpikeAnomalyModel(data_interval=0)),
+        (count_duration.generate_count_based_anomalies_data, CountBasedAnomalyModel(data_interval=0)),
+    ],
+)
+def test_seeded_stream_resumes_at_offset(generator, model):
+    """
+    A stream reopened with its seed and an offset continues exactly where it stopped.
+    """
+    seeded = model.model_copy(update={"seed": 1234})
+    full = "".join(collect(generator(seeded), 5000))
+    resumed = "".join(
+        collect(generator(seeded.model_copy(update={"offset": 4321})), 679)
+    )
+    assert resumed == "".join(full.splitlines(keepends=True)[4321:])
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        np.array([0.0, -0.0, 0.0005, -0.0015, 2.5e-4, 1e12, -7.123456]),
+        np.array([np.nan, np.inf, -np.inf]),
+        np.random.default_rng(0).normal(scale=100, size=10_000),
+        np.empty(0),
+    ],
+)
+def test_block_formatting_matches_f_strings(values):
+    """
+    Formatting a block gives exactly the text of one f-string per data point.
+    """
+    expected = "".join(f"{value:.3f}\n" for value in values.tolist())
+    assert format_block(values) == expected
+    assert format_block(values, TextFormat(2, Notation.SCIENTIFIC)) == "".join(
+        f"{value:.2e}\n" for value in values.tolist()
+    )
+
+
+@pytest.mark.parametrize(
+    "samples, model",
+    [
+        (
+            clustered.clustered_samples,
+            ClusteredAnomalyModel(
+                minimum_interval=5000, maximum_interval=6000, max_anomaly_length=10, seed=3
+            ),
+        ),
+        (
+            random_square.random_square_samples,
+            RandomSquareModel(
+                minimum_interval=5000, maximum_interval=6000, max_anomaly_duration=10, seed=3
+            ),
+        ),
+    ],
+)
+def test_runs_continue_across_epochs(samples, model):
+    """
+    Gaps longer than the shortest epoch still give an anomaly every cycle, and
+    anomalies crossing an epoch boundary keep their length.
+    """
+    labels = samples(model).take_frame(200_000).labels.astype(np.int8)
+    edges = np.diff(labels, prepend=0, append=0)
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    assert 30 <= len(starts) <= 40
+    assert ((ends - starts >= 5) & (ends - starts <= 10)).all()
+    assert (starts[1:] - ends[:-1] >= 5000).all()
+
+
+def test_run_schedule_respects_bounds():
+    """
+    Anomaly runs have lengths within their bounds and regular gaps between them.
+    """
+    rng = np.random.default_rng(3)
+    starts, lengths = run_schedule(rng, 100000, 50, 150, 5, 20)
+    mask = run_mask(100000, starts, lengths)
+
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(int), [0]))))
+    run_starts, run_ends = edges[::2], edges[1::2]
+    np.testing.assert_array_equal(run_starts, starts)
+    assert ((run_ends - run_starts)[:-1] >= 5).all() and ((run_ends - run_starts) <= 20).all()
+    gaps = run_starts[1:] - run_ends[:-1]
+    assert gaps.min() >= 50 and gaps.max() <= 150
+    assert 50 <= run_starts[0] <= 150
+
+
+def test_bernoulli_positions_match_anomaly_probability():
+    """
+    Every data point gets the same, independent anomaly probability.
+    """
+    rng = np.random.default_rng(4)
+    positions = bernoulli_positions(rng, 200000, 0.05)
+    assert len(np.unique(positions)) == len(positions)
+    assert positions.max() < 200000
+    assert abs(len(positions) / 200000 - 0.05) < 0.003
+    assert len(bernoulli_positions(rng, 100, 0)) == 0
+    assert len(bernoulli_positions(rng, 100, 1)) == 100
+
+
+@pytest.mark.parametrize("probability", [1e-19, 1e-300, 5e-324])
+def test_tiny_anomaly_probability(probability):
+    """
+    Vanishingly small anomaly probabilities give regular data points, without
+    overflowing the positions or looping forever.
+    """
+    model = RandomAnomalyModel(anomaly_probability=probability, seed=1)
+    frame = random_anomaly.random_anomaly_samples(model).take_frame(100_000)
+    assert not frame.labels.any()
+
+
+def test_window_mask_marks_count_per_window():
+    """
+    Every window gets exactly the requested number of distinct anomaly positions.
+    """
+    rng = np.random.default_rng(5)
+    mask = window_mask(rng, 8, 3600, 250).reshape(8, 3600)
+    assert (mask.sum(axis=1) == 250).all()
+    assert len({tuple(np.flatnonzero(row)) for row in mask}) == 8
+    many = window_mask(rng, 5000, 10, 3).reshape(5000, 10)
+    assert (many.sum(axis=1) == 3).all()
+    assert (window_mask(rng, 4, 10, 9).reshape(4, 10).sum(axis=1) == 9).all()
+    assert window_mask(rng, 2, 10, 0).sum() == 0
+    assert window_mask(rng, 2, 10, 12).all()
+
+
+def test_count_per_duration_windows():
+    """
+    Long windows keep their anomaly count, and every window has its own positions.
+    """
+    model = CountBasedAnomalyModel(num_anomalies=1000, window_length=86400, seed=7)
+    samples = count_duration.count_based_samples(model)
+    frame = samples.take_frame(2 * 86400)
+    per_window = frame.labels.reshape(2, 86400)
+    assert (per_window.sum(axis=1) == 1000).all()
+    assert not np.array_equal(per_window[0], per_window[1])
+
+
+def test_periodic_spike_window():
+    """
+    Spikes fall on every spike_interval-th data point and restart every window.
+    """
+    model = SpikeAnomalyModel(spike_interval=4, window_length=10, seed=7)
+    labels = periodic_spike.periodic_spike_samples(model).take_frame(30).labels
+    np.testing.assert_array_equal(np.flatnonzero(labels), [3, 7, 13, 17, 23, 27])
@@ -0,0 +1,42 @@
+"""
+This script contains tests for the logging configuration.
+They do not need a running server.
+"""
+
+import logging
+
+from logging_config import RateLimitFilter
+
+
+def make_record(message, level=logging.INFO, name="app.generators.sine"):
+    """
+    Build a log record as a logger would.
+    """
+    return logging.LogRecord(name, level, __file__, 1, message, ("model",), None)
+
+
+def test_rate_limit_suppresses_repeated_messages():
+    """
+    A burst of one message is cut off, and the next record let through reports
+    how many were suppressed.
+    """
+    rate_filter = RateLimitFilter(rate=1000, burst=3)
+    passed = [rate_filter.filter(make_record("Stream opened: %s")) for _ in range(10)]
+    assert passed == [True] * 3 + [False] * 7
+    assert rate_filter.filter(make_record("Other message: %s"))
+    assert rate_filter.filter(make_record("Stream opened: %s", logging.ERROR))
+
+    rate_filter._buckets[("app.generators.sine", "Stream opened: %s")] = (1, 0.0, 7)
+    record = make_record("Stream opened: %s")
+    assert rate_filter.filter(record)
+    assert record.getMessage() == "Stream opened: model (7 similar messages suppressed)"
+
+
+def test_rate_limit_decides_once_per_record():
+    """
+    Handlers sharing a filter agree on a record and use up one token for it.
+    """
+    rate_filter = RateLimitFilter(rate=0.001, burst=1)
+    record = make_record("Stream opened: %s")
+    assert rate_filter.filter(record) and rate_filter.filter(record)
+    assert not rate_filter.filter(make_record("Stream opened: %s"))
@@ -0,0 +1,108 @@
+"""
+This script contains in-process tests for the event loop monitor.
+They run their own event loop and do not need a running server.
+"""
+
+import asyncio
+import threading
+import time
+
+from app.stream_utils import loop_monitor
+from app.stream_utils.loop_monitor import LoopMonitor, SlowCallback
+
+
+def block_loop(seconds):
+    """
+    Keep the event loop busy, as a blocking call in a handler would.
+    """
+    time.sleep(seconds)
+
+
+def test_monitor_records_blocking_callback():
+    """
+    A callback blocking the loop is reported with its duration and location.
+    """
+    monitor = LoopMonitor(interval=0.01, threshold=0.05)
+
+    async def run():
+        monitor.start()
+        await asyncio.sleep(0.05)
+        block_loop(0.3)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    asyncio.run(run())
+    assert monitor._watchdog is None
+    report = monitor.report()
+    assert report["beats"] > 3
+    assert report["max_lag_ms"] >= 200
+    [stall] = report["slow_callbacks"]
+    assert stall["duration"] >= 0.2
+    assert stall["location"].endswith("block_loop")
+    assert "test_loop_monitor.py" in stall["location"]
+
+
+def test_monitor_ignores_short_callbacks():
+    """
+    A loop that keeps up reports no slow callbacks.
+    """
+    monitor = LoopMonitor(interval=0.01, threshold=0.1)
+
+    async def run():
+        monitor.start()
+        await asyncio.sleep(0.2)
+        await monitor.stop()
+
+    asyncio.run(run())
+    assert monitor.report()["slow_callbacks"] == []
+
+
+def test_monitor_drops_stall_of_finished_heartbeat(monkeypatch):
+    """
+    A stall captured while the late heartbeat runs is dropped, not reported on the
+    next heartbeat.
+    """
+    monitor = LoopMonitor(interval=0.01, threshold=0.05)
+    monitor._last_beat = time.monotonic() - 1
+
+    def capture_during_heartbeat(thread_id, started):
+        monitor.beats += 1
+        return SlowCallback(started=started)
+
+    monkeypatch.setattr(loop_monitor, "capture_stall", capture_during_heartbeat)
+    monitor._check(threading.get_ident())
+    assert monitor._stall is None
+
+
+def test_monitor_stop_joins_watchdog():
+    """
+    Stopping the monitor waits for the watchdog thread to finish.
+    """
+    monitor = LoopMonitor(interval=0.01, threshold=0.05)
+
+    async def run():
+        monitor.start()
+        watchdog = monitor._watchdog
+        await asyncio.sleep(0.02)
+        await monitor.stop()
+        return watchdog
+
+    assert not asyncio.run(run()).is_alive()
+
+
+def test_monitor_measures_block_before_first_heartbeat():
+    """
+    A callback blocking the loop before the first heartbeat runs is reported with
+    its full duration.
+    """
+    monitor = LoopMonitor(interval=0.01, threshold=0.05)
+
+    async def run():
+        monitor.start()
+        block_loop(0.3)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    asyncio.run(run())
+    [stall] = monitor.report()["slow_callbacks"]
+    assert stall["duration"] >= 0.2
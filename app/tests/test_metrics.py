@@ -0,0 +1,112 @@
+"""
+This script contains in-process tests for the server metrics.
+They run the streams directly and do not need a running server.
+"""
+
+import asyncio
+
+from app.endpoints.streaming import encode_stream
+from app.generators import sine
+from app.models.stream_models import StreamOptions
+from app.models.waveform_models import SineModel
+from app.stream_utils.broadcast import open_stream
+from app.stream_utils.bulk import generate_bulk_data
+from app.stream_utils.encoders import TextEncoder
+from app.stream_utils.metrics import (
+    ACTIVE_STREAMS,
+    COMPUTE_TIME,
+    PACING_LAG,
+    SAMPLES_EMITTED,
+    Counter,
+    Histogram,
+    Registry,
+)
+
+
+def series(metric, stream="sine", endpoint=None):
+    """
+    The value of the time series of a metric, by suffixed name.
+    """
+    prefix = f'{{stream="{stream}"'
+    if endpoint is not None:
+        prefix += f',endpoint="{endpoint}"'
+    return {
+        name: value
+        for name, labels, value in metric.samples()
+        if labels.startswith(prefix) and "le=" not in labels
+    }
+
+
+def test_render_prometheus_text():
+    """
+    Counters and histograms are rendered in the Prometheus text format.
+    """
+    registry = Registry()
+    counter = registry.register(Counter("requests_total", "Requests.", ["path"]))
+    histogram = registry.register(Histogram("latency_seconds", "Latency.", [], (0.1, 1.0)))
+    counter.inc(path='/a"b')
+    counter.inc(2, path='/a"b')
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests.",
+        "# TYPE requests_total counter",
+        'requests_total{path="/a\\"b"} 3',
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 1',
+        'latency_seconds_bucket{le="1"} 2',
+        'latency_seconds_bucket{le="+Inf"} 2',
+        "latency_seconds_sum 0.55",
+        "latency_seconds_count 2",
+    ]
+
+
+def test_stream_reports_metrics():
+    """
+    A paced stream reports the data points it sends, its pacing lag and the
+    compute time of its frames, and is no longer active once closed.
+    """
+    model = SineModel(interval=0.001, batch_size=4, seed=1)
+    emitted = series(SAMPLES_EMITTED, endpoint="stream").get("sdg_samples_emitted_total", 0)
+    lags = series(PACING_LAG).get("sdg_pacing_lag_seconds_count", 0)
+    computes = series(COMPUTE_TIME).get("sdg_frame_compute_seconds_count", 0)
+
+    async def run():
+        chunks = encode_stream(
+            open_stream(sine.generate_sine_data, model, StreamOptions()), TextEncoder(), "sine"
+        )
+        for _ in range(5):
+            await chunks.__anext__()
+        assert series(ACTIVE_STREAMS, endpoint="stream")["sdg_active_streams"] >= 1
+        await chunks.aclose()
+
+    asyncio.run(run())
+    assert series(SAMPLES_EMITTED, endpoint="stream")["sdg_samples_emitted_total"] == emitted + 20
+    assert series(PACING_LAG)["sdg_pacing_lag_seconds_count"] >= lags + 4
+    assert series(COMPUTE_TIME)["sdg_frame_compute_seconds_count"] >= computes + 5
+    assert series(ACTIVE_STREAMS, endpoint="stream")["sdg_active_streams"] == 0
+
+
+def test_bulk_responses_have_their_own_series():
+    """
+    Bulk responses of a stream are counted apart from its paced responses.
+    """
+    streamed = series(SAMPLES_EMITTED, endpoint="stream").get("sdg_samples_emitted_total", 0)
+    bulk = series(SAMPLES_EMITTED, endpoint="bulk").get("sdg_samples_emitted_total", 0)
+
+    async def run():
+        chunks = encode_stream(
+            generate_bulk_data(sine.sine_samples(SineModel(seed=1)), 50),
+            TextEncoder(),
+            "sine",
+            "bulk",
+        )
+        async for _ in chunks:
+            pass
+
+    asyncio.run(run())
+    assert series(SAMPLES_EMITTED, endpoint="bulk")["sdg_samples_emitted_total"] == bulk + 50
+    assert series(SAMPLES_EMITTED, endpoint="stream").get(
+        "sdg_samples_emitted_total", 0
+    ) == streamed
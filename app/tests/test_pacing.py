@@ -0,0 +1,123 @@
+"""
+This script contains tests for the deadline based stream pacing.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.endpoints.streaming import paced_at_rate, stream_response
+from app.generators import normal
+from app.models.distribution_models import NormalModel
+from app.models.stream_models import CatchUpPolicy, StreamOptions
+from app.stream_utils.pacing import Pacer, block_size_for
+
+
+def test_pacer_does_not_accumulate_work_time():
+    """
+    Time spent between waits must not push later deadlines back.
+    """
+    async def run():
+        pacer = Pacer(0.01)
+        loop = asyncio.get_running_loop()
+        await pacer.wait()
+        start = loop.time()
+        for _ in range(20):
+            time.sleep(0.004)
+            await pacer.wait()
+        return loop.time() - start, pacer
+
+    elapsed, pacer = asyncio.run(run())
+    assert elapsed == pytest.approx(0.2, abs=0.03)
+    assert pacer.report()["ticks"] == 21
+
+
+@pytest.mark.parametrize(
+    "policy, skipped, due",
+    [
+        (CatchUpPolicy.BURST, 0, 1),
+        (CatchUpPolicy.SKIP, 4, 1),
+        (CatchUpPolicy.COALESCE, 0, 5),
+    ],
+)
+def test_pacer_catch_up_policies(policy, skipped, due):
+    """
+    A stream that stalls for several intervals catches up according to its policy.
+    """
+    async def run():
+        pacer = Pacer(0.02, policy)
+        await pacer.wait()
+        time.sleep(0.11)
+        return await pacer.wait(), pacer
+
+    tick, pacer = asyncio.run(run())
+    assert (tick.skipped, tick.due) == (skipped, due)
+    assert pacer.max_lag >= 0.08
+
+
+def test_pacer_limits_coalesced_emissions():
+    """
+    A coalescing stream far behind schedule emits at most max_coalesced emissions
+    and skips the rest.
+    """
+    async def run():
+        pacer = Pacer(0.001, CatchUpPolicy.COALESCE, max_coalesced=10)
+        await pacer.wait()
+        time.sleep(0.1)
+        return await pacer.wait(), pacer
+
+    tick, pacer = asyncio.run(run())
+    assert tick.due == 10
+    assert tick.skipped >= 80
+    assert pacer.skipped == tick.skipped
+
+
+def test_block_size_follows_rate_and_latency_budget():
+    """
+    Blocks hold one latency budget of data points, and never come faster than the
+    timer wheel ticks.
+    """
+    assert block_size_for(100_000, 0.05) == 5000
+    assert block_size_for(1_000_000, 0.0001) == 5000
+    assert block_size_for(10, 0.05) == 1
+
+
+def test_stream_keeps_up_high_rate(monkeypatch):
+    """
+    A stream asked for 100k data points per second emits blocks of one latency budget
+    of data points, each due one latency budget after the previous one.
+    """
+    clock = [100.0]
+    deadlines = []
+
+    async def sleep_until(_pacer, deadline):
+        deadlines.append(deadline)
+        clock[0] = deadline
+
+    monkeypatch.setattr(Pacer, "_sleep_until", sleep_until)
+    loop = asyncio.new_event_loop()
+    loop.time = lambda: clock[0]
+
+    async def run():
+        response = stream_response(
+            normal.generate_normal_data,
+            NormalModel(),
+            StreamOptions(rate=100_000, latency_ms=20),
+        )
+        await response.body_iterator.aclose()
+        model = paced_at_rate(NormalModel(), StreamOptions(rate=100_000, latency_ms=20))
+        frames = normal.generate_normal_data(model)
+        sizes = [len((await frames.__anext__()).values) for _ in range(6)]
+        await frames.aclose()
+        return response.headers, model, sizes
+
+    try:
+        headers, model, sizes = loop.run_until_complete(run())
+    finally:
+        loop.close()
+    assert headers["x-stream-rate"] == "100000"
+    assert headers["x-stream-block-size"] == "2000"
+    assert model.interval == pytest.approx(1e-5)
+    assert sizes == [2000] * 6
+    assert deadlines == pytest.approx([100.0 + 0.02 * slot for slot in range(1, 6)])
@@ -0,0 +1,97 @@
+"""
+This script contains in-process tests for the endpoints generated from the stream
+registry. They mount the router on a test app and do not need a running server.
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.db_utils.crud import verify_token
+from app.endpoints.endpoints import add_stream_routes, router
+from app.generators import sine
+from app.generators.registry import STREAMS, StreamType
+from app.models.auth_model import TokenData
+from app.models.waveform_models import SineModel
+
+
+@pytest.fixture(name="app")
+def fixture_app():
+    """
+    A test app serving the generated endpoints to a logged in user.
+    """
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[verify_token] = lambda: TokenData(username="tester")
+    return app
+
+
+def test_every_stream_has_stream_and_bulk_routes(app):
+    """
+    Every registered stream is served at its name and its name plus /bulk.
+    """
+    paths = set(app.openapi()["paths"])
+    for name in STREAMS:
+        assert {f"/{name}", f"/{name}/bulk"} <= paths
+
+
+@pytest.mark.parametrize("name", sorted(STREAMS))
+def test_bulk_route_uses_the_model_of_the_stream(app, name):
+    """
+    The query parameters are validated against the model of the stream, and the bulk
+    route returns the requested number of data points.
+    """
+    client = TestClient(app)
+    response = client.get(f"/{name}/bulk", params={"count": 25, "seed": 4})
+    assert response.status_code == 200
+    assert response.text.count("\n") == 25
+    for batch_size in (0, 10_000_000_000):
+        params = {"count": 25, "batch_size": batch_size}
+        assert client.get(f"/{name}/bulk", params=params).status_code == 422
+
+
+def test_new_stream_is_served_without_a_handler(app):
+    """
+    A stream type added to a router gets working endpoints from the registry entry alone.
+    """
+    add_stream_routes(
+        app.router,
+        "inverted-sine",
+        StreamType(
+            SineModel,
+            sine.generate_sine_data,
+            lambda model: sine.sine_samples(model.model_copy(update={"amplitude": -1})),
+            "inverted sine wave",
+        ),
+    )
+    client = TestClient(app)
+    inverted = client.get("/inverted-sine/bulk", params={"count": 5}).text.split()
+    original = client.get("/sine/bulk", params={"count": 5, "amplitude": 1}).text.split()
+    assert [float(value) for value in inverted] == [-float(value) for value in original]
+
+
+@pytest.mark.parametrize(
+    "path, params",
+    [
+        ("/normal", {"std_dev": -1}),
+        ("/sine", {"interval": 1e-9, "catch_up": "coalesce"}),
+        ("/square", {"interval": -1}),
+        ("/anomalies/random", {"data_interval": 1e-7}),
+        ("/exponential", {"scale": -1}),
+        ("/uniform", {"min_val": 2, "max_val": 1}),
+        ("/anomalies/random", {"anomaly_probability": 1.5}),
+        ("/anomalies/random-square", {"minimum_interval": 10, "maximum_interval": 5}),
+        ("/anomalies/clustered", {"minimum_interval": -3}),
+        ("/anomalies/clustered", {"maximum_interval": 1 << 21}),
+        ("/anomalies/periodic-spike", {"min_spike_range": 3, "max_spike_range": 1}),
+        ("/anomalies/periodic-spike", {"window_length": 1 << 30}),
+        ("/anomalies/count-per-duration", {"window_length": 1 << 30}),
+    ],
+)
+def test_invalid_parameters_are_rejected(app, path, params):
+    """
+    Parameters the generators cannot use are answered with 422 before streaming starts.
+    """
+    client = TestClient(app)
+    assert client.get(path, params=params).status_code == 422
+    assert client.get(f"{path}/bulk", params={**params, "count": 5}).status_code == 422
@@ -0,0 +1,70 @@
+"""
+This script contains tests for the shared timer wheel.
+"""
+
+import asyncio
+
+from app.stream_utils.timer_wheel import TimerWheel, get_timer_wheel
+
+
+def test_timers_never_fire_early_and_share_ticks():
+    """
+    Timers fire at or after their deadline, and equal deadlines fire together.
+    """
+    async def run():
+        loop = asyncio.get_running_loop()
+        wheel = TimerWheel(resolution=0.005, slots=8)
+        fired = {}
+
+        async def sleeper(name, delay):
+            deadline = loop.time() + delay
+            await wheel.sleep_until(deadline)
+            fired[name] = loop.time() - deadline
+
+        await asyncio.gather(
+            *(sleeper(index, 0.02) for index in range(50)),
+            sleeper("long", 0.1),
+        )
+        return fired, wheel
+
+    fired, wheel = asyncio.run(run())
+    assert len(fired) == 51
+    assert all(0 <= lateness < 0.03 for lateness in fired.values())
+    assert wheel.pending == 0
+
+
+def test_wheel_is_shared_per_loop():
+    """
+    All streams on one event loop use the same wheel, which stops when idle.
+    """
+    async def run():
+        wheel = get_timer_wheel()
+        assert get_timer_wheel() is wheel
+        await wheel.sleep_until(asyncio.get_running_loop().time() + 0.01)
+        await asyncio.sleep(0.02)
+        return wheel
+
+    wheel = asyncio.run(run())
+    assert wheel.pending == 0
+    assert wheel._runner is None
+
+
+def test_cancelled_timer_lets_wheel_stop():
+    """
+    Cancelling a sleeper forgets its timer, so the wheel stops instead of ticking
+    until the old deadline.
+    """
+    async def run():
+        wheel = TimerWheel()
+        loop = asyncio.get_running_loop()
+        sleeper = asyncio.ensure_future(wheel.sleep_until(loop.time() + 3600))
+        await asyncio.sleep(0.02)
+        sleeper.cancel()
+        await asyncio.gather(sleeper, return_exceptions=True)
+        await asyncio.sleep(0.02)
+        return wheel
+
+    wheel = asyncio.run(run())
+    assert wheel.pending == 0
+    assert wheel._runner is None
+    assert not any(wheel._slots)
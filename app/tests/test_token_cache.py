@@ -0,0 +1,79 @@
+"""
+This script contains in-process tests for the cache of verified access tokens.
+They call the token helpers directly and do not need a running server.
+"""
+
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.db_utils import crud
+from app.db_utils.token_cache import TokenCache
+from app.models.auth_model import TokenData
+from app.stream_utils.metrics import TOKEN_CACHE_LOOKUPS
+
+
+def lookups():
+    """
+    The number of cache lookups by result.
+    """
+    return {labels: value for _, labels, value in TOKEN_CACHE_LOOKUPS.samples()}
+
+
+@pytest.fixture(autouse=True, name="secret_key")
+def fixture_secret_key(monkeypatch):
+    """
+    Sign tokens with a test key and start every test with an empty cache.
+    """
+    monkeypatch.setattr(crud, "SECRET_KEY", "test-secret-key-" + "0" * 32)
+    crud.token_cache.clear()
+
+
+def test_verified_token_is_cached():
+    """
+    A token is decoded once and answered from the cache afterwards.
+    """
+    token = crud.create_access_token({"sub": "tester"})
+    before = lookups()
+    assert crud.verify_token(token).username == "tester"
+    assert crud.verify_token(token).username == "tester"
+    after = lookups()
+    assert len(crud.token_cache) == 1
+    for result in ("hit", "miss"):
+        key = f'{{result="{result}"}}'
+        assert after[key] == before.get(key, 0) + 1
+
+
+def test_invalid_token_is_not_cached():
+    """
+    Tokens that fail verification are rejected every time.
+    """
+    token = crud.create_access_token({"sub": "tester"}) + "x"
+    for _ in range(2):
+        with pytest.raises(HTTPException):
+            crud.verify_token(token)
+    assert len(crud.token_cache) == 0
+
+
+def test_cache_entries_expire_with_token():
+    """
+    A cached token stops verifying once it expires.
+    """
+    token = crud.create_access_token({"sub": "tester"}, timedelta(seconds=-1))
+    crud.token_cache.put(token, TokenData(username="tester"), 0)
+    with pytest.raises(HTTPException):
+        crud.verify_token(token)
+
+
+def test_cache_evicts_least_recently_used():
+    """
+    A full cache drops the token that was used longest ago.
+    """
+    cache = TokenCache(maxsize=2)
+    for name in "abc":
+        cache.put(name, TokenData(username=name), float("inf"))
+        cache.get("a")
+    assert cache.get("a").username == "a"
+    assert cache.get("b") is None
+    assert cache.get("c").username == "c"
@@ -0,0 +1,102 @@
+"""
+This script contains in-process tests for the multiplexed WebSocket endpoint.
+They mount the WebSocket router on a test app and do not need a running server.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.db_utils import crud
+from app.endpoints.websocket_endpoint import router
+from app.models.websocket_models import OverflowPolicy
+from app.stream_utils.frames import Frame
+from app.stream_utils.multiplex import Subscription
+
+
+@pytest.fixture(name="client")
+def fixture_client(monkeypatch):
+    """
+    A test client for an app serving only the WebSocket endpoint.
+    """
+    monkeypatch.setattr(crud, "SECRET_KEY", "test-secret-key-" + "0" * 32)
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_socket_multiplexes_streams(client):
+    """
+    Several subscriptions share one socket and every message is tagged with its ID.
+    """
+    token = crud.create_access_token({"sub": "tester"})
+    with client.websocket_connect(f"/ws?token={token}") as websocket:
+        websocket.send_json(
+            {"action": "subscribe", "id": "s", "stream": "sine", "params": {"interval": 0.001}}
+        )
+        websocket.send_json(
+            {
+                "action": "subscribe",
+                "id": "r",
+                "stream": "anomalies/random",
+                "params": {"data_interval": 0.001, "seed": 3},
+            }
+        )
+        events = {}
+        while not {"s", "r"} <= {message["id"] for message in events.get("data", [])}:
+            message = websocket.receive_json()
+            events.setdefault(message["event"], []).append(message)
+        assert {message["id"] for message in events["subscribed"]} == {"s", "r"}
+        random_data = [message for message in events["data"] if message["id"] == "r"]
+        assert len(random_data[0]["labels"]) == len(random_data[0]["values"])
+
+        websocket.send_json({"action": "unsubscribe", "id": "s"})
+        websocket.send_json({"action": "subscribe", "id": "x", "stream": "nope"})
+        replies = []
+        while len(replies) < 2:
+            message = websocket.receive_json()
+            if message["event"] != "data":
+                replies.append(message)
+        assert replies[0] == {"event": "unsubscribed", "id": "s"}
+        assert replies[1]["event"] == "error" and replies[1]["id"] == "x"
+
+
+def test_socket_rejects_missing_token(client):
+    """
+    A connection without a valid token is closed before it is accepted.
+    """
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect("/ws?token=invalid") as websocket:
+            websocket.receive_json()
+
+
+@pytest.mark.parametrize(
+    "overflow, message_sizes",
+    [(OverflowPolicy.DROP, [4, 4]), (OverflowPolicy.COALESCE, [8])],
+)
+def test_slow_subscription_stays_bounded(overflow, message_sizes):
+    """
+    A subscription keeps at most its buffer of data points, dropping the oldest.
+    """
+    async def run():
+        async def no_frames():
+            return
+            yield
+
+        subscription = Subscription("a", no_frames(), overflow, 8, asyncio.Event())
+        for index in range(0, 40, 4):
+            subscription.offer(Frame(index, np.arange(index, index + 4, dtype=float)))
+        messages = []
+        while subscription.has_pending():
+            messages.append(subscription.message())
+        await subscription.task
+        return messages
+
+    messages = asyncio.run(run())
+    assert [len(message["values"]) for message in messages] == message_sizes
+    assert messages[0]["index"] == 32
+    assert messages[0]["dropped"] == 32
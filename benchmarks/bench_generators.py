@@ -0,0 +1,289 @@
+"""
+Microbenchmarks of the data generators, without a server and without pacing.
+
+Every stream of app.generators.registry is measured over a small grid of
+parameters in two ways:
+
+    samples: data points taken straight from the seekable sample source in
+        chunks of the given size, as the bulk endpoints and compose do.
+    stream: frames of the paced generator with its interval set to 0, so the
+        Pacer never sleeps, encoded as text as the streaming endpoints do, with
+        the batch size set to the chunk size.
+
+For each case the benchmark reports the data points per second (best of the
+repeats), the peak memory traced while a warmed-up source produces up to
+STEADY_SAMPLES data points and that peak per data point, and separately the peak
+memory of the first chunk of a fresh source, which includes its one-time setup
+such as computing its first block. Results are written as JSON, and a later run
+compared against a stored baseline reports the speedup or regression of every
+case.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_generators.py --save benchmarks/baseline.json
+    python benchmarks/bench_generators.py --baseline benchmarks/baseline.json
+    python benchmarks/bench_generators.py --baseline benchmarks/baseline.json --filter anomalies
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.generators.registry import STREAMS  # noqa: E402
+from app.stream_utils.encoders import TextEncoder  # noqa: E402
+
+CHUNK_SIZES = (1, 64, 4096)
+MIN_TIME = 0.2
+REPEATS = 3
+TOLERANCE = 0.2
+# The most data points traced in the steady state
+STEADY_SAMPLES = 1 << 16
+
+# Parameter grids per stream, on top of the defaults of the model
+GRIDS = {
+    "sine": [{}, {"sample_rate": 1000, "frequency": 3.0}],
+    "cosine": [{}],
+    "square": [{}, {"sample_rate": 1000}],
+    "sawtooth": [{}],
+    "normal": [{}],
+    "uniform": [{}],
+    "exponential": [{}],
+    "anomalies/random": [{}, {"anomaly_probability": 0.5}],
+    "anomalies/random-square": [{}],
+    "anomalies/clustered": [{}],
+    "anomalies/periodic-spike": [{}, {"spike_interval": 10}],
+    "anomalies/count-per-duration": [{}, {"num_anomalies": 1000, "window_length": 86400}],
+}
+
+
+def case_name(stream: str, params: dict, mode: str, chunk: int) -> str:
+    """
+    Returns:
+        str: The key of a case in the results, e.g. sine{sample_rate=1000}/samples:64.
+    """
+    grid = ",".join(f"{key}={value}" for key, value in sorted(params.items()))
+    return f"{stream}{{{grid}}}/{mode}:{chunk}"
+
+
+def unpaced(stream_type, params: dict, chunk: int):
+    """
+    Build the model of a stream with pacing disabled and frames of chunk data points.
+    """
+    fields = stream_type.model.model_fields
+    params = {**params, "seed": 1, "batch_size": chunk}
+    for interval in ("interval", "data_interval"):
+        if interval in fields:
+            params[interval] = 0
+    return stream_type.model(**params)
+
+
+def sample_runner(stream_type, params: dict, chunk: int):
+    """
+    Returns:
+        Callable: A function taking count data points from the sample source.
+    """
+    samples = stream_type.samples(unpaced(stream_type, params, chunk))
+
+    def run(count: int) -> int:
+        taken = 0
+        while taken < count:
+            taken += len(samples.take_frame(chunk).values)
+        return taken
+
+    return run
+
+
+def stream_runner(stream_type, params: dict, chunk: int):
+    """
+    Returns:
+        Callable: A function reading count data points from the unpaced generator.
+    """
+    generator = stream_type.generator(unpaced(stream_type, params, chunk))
+    encoder = TextEncoder()
+    loop = asyncio.new_event_loop()
+
+    async def read(count: int) -> int:
+        taken = 0
+        while taken < count:
+            frame = await generator.__anext__()
+            encoder.encode(frame)
+            taken += len(frame.values)
+        return taken
+
+    def run(count: int) -> int:
+        return loop.run_until_complete(read(count))
+
+    run.close = lambda: (loop.run_until_complete(generator.aclose()), loop.close())
+    return run
+
+
+def close(run):
+    """
+    Release what a runner holds, such as the event loop of a stream runner.
+    """
+    if hasattr(run, "close"):
+        run.close()
+
+
+def traced(run, count: int):
+    """
+    Run a runner for count data points while tracing memory.
+
+    Returns:
+        Tuple[int, int]: The number of data points taken and the peak traced bytes
+            above what was allocated before the run.
+    """
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    taken = run(count)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return taken, max(peak - baseline, 0)
+
+
+def measure(make_run, chunk: int, min_time: float, repeats: int) -> dict:
+    """
+    Time a runner and trace its memory in the steady state, then trace the memory
+    a fresh runner needs for its first chunk.
+
+    Runners are built before tracing starts, so neither peak covers the setup of
+    the runner itself.
+
+    Args:
+        make_run (Callable): A function building a runner.
+        chunk (int): The number of data points per chunk.
+        min_time (float): The total time to spend timing, spread over the repeats.
+        repeats (int): The number of timed runs, of which the best counts.
+
+    Returns:
+        dict: The data points per second, the steady state peak traced bytes and
+            that peak per data point, and the peak traced bytes of the first chunk.
+    """
+    run = make_run()
+    run(chunk)
+    count = chunk
+    while True:
+        started = time.perf_counter()
+        taken = run(count)
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time / repeats or count > 1 << 26:
+            break
+        count *= 4
+    best = elapsed / taken
+    for _ in range(repeats - 1):
+        started = time.perf_counter()
+        taken = run(count)
+        best = min(best, (time.perf_counter() - started) / taken)
+    taken, steady_peak = traced(run, max(chunk, min(count, STEADY_SAMPLES)))
+    close(run)
+
+    run = make_run()
+    _, first_chunk_peak = traced(run, chunk)
+    close(run)
+    return {
+        "samples_per_sec": round(1 / best, 1),
+        "steady_peak_bytes": steady_peak,
+        "bytes_per_sample": round(steady_peak / taken, 2),
+        "first_chunk_peak_bytes": first_chunk_peak,
+    }
+
+
+def run_benchmarks(name_filter: str = "", min_time: float = MIN_TIME, repeats: int = REPEATS):
+    """
+    Returns:
+        dict: The results of every case whose key contains name_filter.
+    """
+    results = {}
+    for stream, stream_type in STREAMS.items():
+        for params in GRIDS.get(stream, [{}]):
+            for mode, factory in (("samples", sample_runner), ("stream", stream_runner)):
+                for chunk in CHUNK_SIZES:
+                    name = case_name(stream, params, mode, chunk)
+                    if name_filter not in name:
+                        continue
+                    results[name] = measure(
+                        functools.partial(factory, stream_type, params, chunk),
+                        chunk,
+                        min_time,
+                        repeats,
+                    )
+                    print(f"{name:76} {results[name]['samples_per_sec']:>14,.0f} /s", flush=True)
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Compare results against a baseline.
+
+    Returns:
+        list: The names of the cases that got slower by more than the tolerance.
+    """
+    regressions = []
+    print(f"\n{'case':76} {'baseline/s':>14} {'current/s':>14} {'speedup':>8}")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:76} {'-':>14} {result['samples_per_sec']:>14,.0f} {'new':>8}")
+            continue
+        before = baseline[name]["samples_per_sec"]
+        speedup = result["samples_per_sec"] / before
+        flag = ""
+        if speedup < 1 - tolerance:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif speedup > 1 + tolerance:
+            flag = "  faster"
+        print(
+            f"{name:76} {before:>14,.0f} {result['samples_per_sec']:>14,.0f} "
+            f"{speedup:>7.2f}x{flag}"
+        )
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--baseline", help="A stored result file to compare against.")
+    parser.add_argument("--save", help="Write the results to this file.")
+    parser.add_argument("--filter", default="", help="Only run cases containing this text.")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument(
+        "--tolerance", type=float, default=TOLERANCE,
+        help="The relative slowdown reported as a regression.",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.filter, args.min_time, args.repeats)
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+    if args.save:
+        document = {
+            "meta": {
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "machine": platform.machine(),
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "results": results,
+        }
+        with open(args.save, "w", encoding="utf-8") as result_file:
+            json.dump(document, result_file, indent=2, sort_keys=True)
+            result_file.write("\n")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Report the import time of the server, to keep startup cost visible.
+
+The app module is imported in a fresh interpreter with -X importtime, so nothing
+is cached from an earlier import. The report lists the total time, the time per
+top-level package and the slowest modules by cumulative time, i.e. including the
+modules they import in turn.
+
+Usage (from the repository root):
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --top 30 --module app.generators.registry
+    python benchmarks/import_time.py --max-seconds 2.0 --json import_time.json
+"""
+
+import argparse
+import json
+import os
+import secrets
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODULE = "app.main"
+DEFAULT_TOP = 15
+REPEATS = 3
+
+
+def import_times(module: str) -> list:
+    """
+    Import a module in a fresh interpreter.
+
+    Returns:
+        list: The self and cumulative import time in seconds, the nesting depth and
+            the name of every module imported, in import order.
+    """
+    env = {**os.environ, "PYTHONPATH": ROOT, "LOG_QUEUE": "0", "LOG_LEVEL": "WARNING"}
+    env.setdefault("SECRET_KEY", secrets.token_hex(32))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=False,
+    )
+    if completed.returncode != 0:
+        raise SystemExit(f"Importing {module} failed:\n{completed.stderr}")
+    modules = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((int(own) / 1e6, int(cumulative) / 1e6, depth, name.strip()))
+    return modules
+
+
+def report(module: str, top: int, repeats: int = REPEATS) -> dict:
+    """
+    Returns:
+        dict: The total import time in seconds, the time per top-level package and
+            the slowest modules of the fastest of the repeats.
+    """
+    modules = min(
+        (import_times(module) for _ in range(repeats)),
+        key=lambda times: sum(own for own, _, _, _ in times),
+    )
+    packages = defaultdict(float)
+    for own, _, _, name in modules:
+        packages[name.split(".")[0]] += own
+    slowest = sorted(modules, key=lambda entry: entry[1], reverse=True)[:top]
+    return {
+        "module": module,
+        "total_seconds": round(sum(own for own, _, _, _ in modules), 4),
+        "packages": {
+            name: round(seconds, 4)
+            for name, seconds in sorted(packages.items(), key=lambda item: -item[1])[:top]
+        },
+        "slowest": [
+            {"module": name, "cumulative_seconds": round(cumulative, 4)}
+            for _, cumulative, _, name in slowest
+        ],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--module", default=DEFAULT_MODULE, help="The module to import.")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument(
+        "--max-seconds", type=float, help="Exit with 1 when the import takes longer."
+    )
+    parser.add_argument("--json", help="Write the report to this file.")
+    args = parser.parse_args(argv)
+
+    result = report(args.module, args.top, args.repeats)
+    print(f"Importing {result['module']} took {result['total_seconds']:.3f} s\n")
+    print(f"{'package':40} {'self s':>10}")
+    for name, seconds in result["packages"].items():
+        print(f"{name:40} {seconds:>10.3f}")
+    print(f"\n{'module':60} {'cumulative s':>14}")
+    for entry in result["slowest"]:
+        print(f"{entry['module']:60} {entry['cumulative_seconds']:>14.3f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as report_file:
+            json.dump(result, report_file, indent=2)
+            report_file.write("\n")
+    if args.max_seconds is not None and result["total_seconds"] > args.max_seconds:
+        print(f"\nImport time exceeds {args.max_seconds:.3f} s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,384 @@
+"""
+Load harness simulating many concurrent streaming clients.
+
+The harness registers a user through /register and /token, then opens a mix of
+streaming endpoints at increasing numbers of concurrent connections. For every
+level it reports the throughput, the inter-arrival jitter of the chunks against
+the interval each stream was asked for, the CPU and memory of the sampled
+process, and finally the first level at which pacing degrades. Streams are
+requested uncompressed, so every received byte is a byte of data.
+
+The app from app/main.py is driven in-process through ASGI by default, so no
+server or external service is needed. The app then runs on a throwaway database
+in a temporary directory, and the CPU and memory sampled are those of the
+harness process, app included. With --url the harness drives a running server
+instead, e.g. a local uvicorn; pass --server-pid to sample the CPU and memory of
+the server rather than the harness (Linux only).
+
+Usage (from the repository root):
+
+    python benchmarks/load_harness.py --levels 10,100,500 --duration 5
+    python benchmarks/load_harness.py --mix sine=2,normal=1,anomalies/random=1 --interval 0.05
+    python benchmarks/load_harness.py --url http://localhost:8000 --server-pid 12345
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import resource
+import secrets
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+
+from app.generators.registry import STREAMS  # noqa: E402
+
+DEFAULT_MIX = "sine=1,normal=1,anomalies/random=1"
+DEFAULT_LEVELS = "10,50,100,250"
+DEFAULT_INTERVAL = 0.1
+DEFAULT_DURATION = 5.0
+# Pacing counts as degraded once the 99th percentile gap deviates by this share of the interval
+DEGRADED_JITTER = 0.5
+
+
+@dataclass
+class StreamResult:
+    """
+    What one client received.
+
+    Attributes:
+        stream (str): The name of the stream.
+        expected_gap (float): The intended time between chunks, in seconds.
+        arrivals (List[float]): The arrival time of every chunk.
+        points (int): The number of data points received.
+        size (int): The number of bytes received.
+        error (Optional[str]): Why the stream failed, if it did.
+    """
+    stream: str
+    expected_gap: float
+    arrivals: List[float] = field(default_factory=list)
+    points: int = 0
+    size: int = 0
+    error: Optional[str] = None
+
+    def received(self, chunk: bytes):
+        self.arrivals.append(time.perf_counter())
+        self.points += chunk.count(b"\n")
+        self.size += len(chunk)
+
+
+def parse_mix(mix: str) -> list:
+    """
+    Returns:
+        list: The stream names of the mix, each repeated by its weight.
+    """
+    streams = []
+    for entry in mix.split(","):
+        name, _, weight = entry.partition("=")
+        if name not in STREAMS:
+            raise SystemExit(f"Unknown stream {name!r}; choose from {', '.join(STREAMS)}")
+        streams.extend([name] * int(weight or 1))
+    return streams
+
+
+def stream_request(name: str, interval: float):
+    """
+    Returns:
+        Tuple[str, float]: The path with the interval as a query parameter, and the
+            intended time between the chunks of the stream.
+    """
+    model_type = STREAMS[name].model
+    parameter = "interval" if "interval" in model_type.model_fields else "data_interval"
+    model = model_type(**{parameter: interval})
+    batch_size = getattr(model, "batch_size", 1)
+    return f"/{name}?{parameter}={interval}", model.sample_interval * batch_size
+
+
+class ProcessSampler:
+    """
+    Samples the CPU time and resident memory of a process.
+
+    Attributes:
+        pid (Optional[int]): The process sampled, or None for the harness itself.
+        label (str): What the sampled process is, server or harness.
+    """
+
+    def __init__(self, pid: Optional[int]):
+        self.pid = pid
+        self.label = "harness" if pid is None else "server"
+        self._started = None
+
+    def _cpu_time(self) -> float:
+        if self.pid is None:
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            return usage.ru_utime + usage.ru_stime
+        with open(f"/proc/{self.pid}/stat", encoding="ascii") as stat:
+            fields = stat.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+    def rss(self) -> int:
+        """
+        Returns:
+            int: The resident memory of the process, in bytes.
+        """
+        pid = "self" if self.pid is None else self.pid
+        with open(f"/proc/{pid}/statm", encoding="ascii") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+    def start(self):
+        self._started = (time.perf_counter(), self._cpu_time())
+
+    def cpu_share(self) -> float:
+        """
+        Returns:
+            float: The CPU time of the process since start, per second of wall time.
+        """
+        wall, cpu = self._started
+        return (self._cpu_time() - cpu) / max(time.perf_counter() - wall, 1e-9)
+
+
+async def asgi_stream(app, path: str, headers: dict, result: StreamResult, stop: asyncio.Event):
+    """
+    Stream a response from an ASGI app until stop is set, then disconnect like a
+    client closing the connection.
+    """
+    raw_path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": raw_path,
+        "raw_path": raw_path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(key.lower().encode(), value.encode()) for key, value in headers.items()],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await stop.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            result.error = f"HTTP {message['status']}"
+        elif message["type"] == "http.response.body" and message.get("body"):
+            result.received(message["body"])
+
+    await app(scope, receive, send)
+
+
+async def http_stream(
+    client: httpx.AsyncClient, path: str, headers: dict, result: StreamResult, stop: asyncio.Event
+):
+    """
+    Stream a response from a running server until stop is set.
+    """
+    async def read():
+        async with client.stream("GET", path, headers=headers) as response:
+            if response.status_code != 200:
+                result.error = f"HTTP {response.status_code}"
+                return
+            async for chunk in response.aiter_raw():
+                result.received(chunk)
+
+    reader = asyncio.ensure_future(read())
+    await asyncio.wait([reader, asyncio.ensure_future(stop.wait())], return_when="FIRST_COMPLETED")
+    reader.cancel()
+    await asyncio.gather(reader, return_exceptions=True)
+
+
+async def get_token(client: httpx.AsyncClient) -> str:
+    """
+    Register a throwaway user and log in.
+
+    Returns:
+        str: The access token of the user.
+    """
+    username = f"load-{secrets.token_hex(6)}"
+    password = secrets.token_urlsafe(12)
+    response = await client.post("/register", json={"username": username, "password": password})
+    response.raise_for_status()
+    response = await client.post("/token", data={"username": username, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def summarize(results: List[StreamResult], elapsed: float) -> dict:
+    """
+    Returns:
+        dict: The throughput, jitter and errors of one level.
+    """
+    deviations, gaps = [], []
+    for result in results:
+        # The first chunk is sent at once; the schedule starts after it
+        stream_gaps = np.diff(result.arrivals[1:])
+        if len(stream_gaps) and result.expected_gap > 0:
+            gaps.append(stream_gaps)
+            deviations.append(np.abs(stream_gaps - result.expected_gap) / result.expected_gap)
+    deviations = np.concatenate(deviations) if deviations else np.zeros(1)
+    gaps = np.concatenate(gaps) if gaps else np.zeros(1)
+    return {
+        "streams": len(results),
+        "errors": sum(result.error is not None for result in results),
+        "points_per_sec": round(sum(result.points for result in results) / elapsed, 1),
+        "bytes_per_sec": round(sum(result.size for result in results) / elapsed, 1),
+        "gap_mean_ms": round(float(gaps.mean()) * 1000, 3),
+        "jitter_p50": round(float(np.percentile(deviations, 50)), 4),
+        "jitter_p99": round(float(np.percentile(deviations, 99)), 4),
+        "jitter_max": round(float(deviations.max()), 4),
+    }
+
+
+async def run_level(
+    open_one, streams: list, count: int, interval: float, duration: float, sampler
+) -> dict:
+    """
+    Hold count concurrent streams open for duration seconds.
+
+    Returns:
+        dict: The summary of the level with the CPU and memory of the sampled process.
+    """
+    stop = asyncio.Event()
+    results, tasks = [], []
+    sampler.start()
+    started = time.perf_counter()
+    for index in range(count):
+        name = streams[index % len(streams)]
+        path, expected_gap = stream_request(name, interval)
+        result = StreamResult(name, expected_gap)
+        results.append(result)
+        tasks.append(asyncio.ensure_future(open_one(path, result, stop)))
+    await asyncio.sleep(duration)
+    stop.set()
+    outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+    for result, outcome in zip(results, outcomes):
+        if isinstance(outcome, Exception) and result.error is None:
+            result.error = repr(outcome)
+    summary = summarize(results, time.perf_counter() - started)
+    summary["cpu"] = round(sampler.cpu_share(), 3)
+    summary["rss_mb"] = round(sampler.rss() / 2**20, 1)
+    return summary
+
+
+async def run(args) -> dict:
+    """
+    Run every level of the load test.
+
+    Returns:
+        dict: The summary of every level and the first degraded level.
+    """
+    streams = parse_mix(args.mix)
+    levels = [int(level) for level in args.levels.split(",")]
+    async with contextlib.AsyncExitStack() as stack:
+        if args.url:
+            client = httpx.AsyncClient(base_url=args.url, timeout=None)
+            sampler = ProcessSampler(args.server_pid)
+        else:
+            # Register the throwaway users in a throwaway database
+            database_dir = stack.enter_context(tempfile.TemporaryDirectory())
+            os.environ["DATABASE_URL"] = (
+                f"sqlite+aiosqlite:///{os.path.join(database_dir, 'load_harness.db')}"
+            )
+            os.environ.setdefault("SECRET_KEY", secrets.token_hex(32))
+            os.environ.setdefault("LOG_LEVEL", "WARNING")
+            from app.main import app  # pylint: disable=import-outside-toplevel
+            client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://testserver"
+            )
+            sampler = ProcessSampler(None)
+        await stack.enter_async_context(client)
+        if not args.url:
+            # Create the tables and start the loop monitor, as the server does on startup
+            await stack.enter_async_context(app.router.lifespan_context(app))
+        # Compressed chunks would break the point counts and the byte rates
+        headers = {
+            "Authorization": f"Bearer {await get_token(client)}",
+            "Accept-Encoding": "identity",
+        }
+
+        async def open_one(path, result, stop):
+            if args.url:
+                await http_stream(client, path, headers, result, stop)
+            else:
+                await asgi_stream(app, path, headers, result, stop)
+
+        report = {
+            "mix": args.mix,
+            "interval": args.interval,
+            "sampled": sampler.label,
+            "levels": [],
+            "degraded_at": None,
+        }
+        for level in levels:
+            summary = await run_level(
+                open_one, streams, level, args.interval, args.duration, sampler
+            )
+            report["levels"].append(summary)
+            print(
+                f"{level:>6} streams  {summary['points_per_sec']:>12,.0f} points/s  "
+                f"jitter p50 {summary['jitter_p50']:.3f} p99 {summary['jitter_p99']:.3f}  "
+                f"{sampler.label} cpu {summary['cpu']:.2f}  rss {summary['rss_mb']:.0f} MB  "
+                f"errors {summary['errors']}",
+                flush=True,
+            )
+            degraded = summary["jitter_p99"] > args.max_jitter or summary["errors"]
+            if degraded and report["degraded_at"] is None:
+                report["degraded_at"] = level
+                if not args.keep_going:
+                    break
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", help="Drive a running server instead of the app in-process.")
+    parser.add_argument("--server-pid", type=int, help="The process of the server at --url.")
+    parser.add_argument(
+        "--mix", default=DEFAULT_MIX, help="Streams and weights, e.g. sine=2,normal=1."
+    )
+    parser.add_argument("--levels", default=DEFAULT_LEVELS, help="Concurrent streams per level.")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL)
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION)
+    parser.add_argument(
+        "--max-jitter", type=float, default=DEGRADED_JITTER,
+        help="The p99 gap deviation, as a share of the interval, counted as degraded.",
+    )
+    parser.add_argument(
+        "--keep-going", action="store_true", help="Run the levels after a degraded one."
+    )
+    parser.add_argument("--json", help="Write the report to this file.")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    if report["degraded_at"] is None:
+        print("Pacing held at every level")
+    else:
+        print(f"Pacing degraded at {report['degraded_at']} concurrent streams")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2)
+            report_file.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,120 @@
 """
 Logging configuration for the FastAPI Data Streaming Application.
+
+By default the root logger only puts records on a queue, and a background listener
+thread writes them to the console and the rotating log file, so a slow disk never
+stalls the event loop. Repeated messages are rate limited per logger and message,
+because every stream open and cancellation logs one.
+
+Environment variables:
+    LOG_LEVEL: The level of the root logger. Defaults to DEBUG.
+    LOG_QUEUE: Set to 0 to write records on the logging thread instead of the
+        listener thread. Defaults to 1.
+    LOG_MAX_BYTES: The size at which the log file is rotated. Defaults to 10 MB.
+    LOG_BACKUP_COUNT: The number of rotated log files kept. Defaults to 5.
+    LOG_RATE: The number of records per second let through for each logger and
+        message; 0 turns rate limiting off. Defaults to 10.
+    LOG_BURST: The number of records of one logger and message let through at once.
+        Defaults to 20.
 """
 
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import threading
+import time
+
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+LOG_RATE = 10.0
+LOG_BURST = 20
+
+_listener = None
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    A token bucket per logger and message template. Records beyond the rate are
+    dropped, and the next record let through reports how many were dropped.
+    Warnings and errors always pass.
+
+    Attributes:
+        rate (float): The number of records per second let through per key.
+        burst (int): The number of records per key let through at once.
+    """
+
+    def __init__(self, rate: float = LOG_RATE, burst: int = LOG_BURST):
+        """
+        Args:
+            rate (float, optional): The number of records per second let through per key.
+            burst (int, optional): The number of records per key let through at once.
+        """
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # A record reaching several handlers sharing this filter is decided once
+        if hasattr(record, "rate_limited"):
+            return not record.rate_limited
+        record.rate_limited = not self._allow(record)
+        return not record.rate_limited
+
+    def _allow(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated, suppressed = self._buckets.get(key, (self.burst, now, 0))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now, suppressed + 1)
+                return False
+            self._buckets[key] = (tokens - 1, now, 0)
+        if suppressed and isinstance(record.msg, str):
+            record.msg = f"{record.msg} ({suppressed} similar messages suppressed)"
+        return True
+
+
+def stop_logging():
+    """
+    Stop the queue listener after writing out the records still queued.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+# Registered once, so repeated setup_logging calls do not stack exit handlers
+atexit.register(stop_logging)
 
 
 def setup_logging():
     """
     Set up logging configuration - configures the root logger with console and file handlers,
     sets their formatters, log levels, and adds them to the root logger.
+
+    Unless LOG_QUEUE is 0, the handlers run on a listener thread and the root logger
+    only gets a queue handler.
     """
+    global _listener
     try:
         # Define the base directory and log file path
         base_dir = os.path.dirname(os.path.abspath(__file__))
         log_file_path = os.path.join(base_dir, "app.log")
+        level = os.getenv("LOG_LEVEL", "DEBUG").upper()
 
         # Configure the root logger
         logger = logging.getLogger()
-        logger.setLevel(logging.DEBUG)
+        logger.setLevel(level)
 
+        stop_logging()
         if logger.hasHandlers():
             logger.handlers.clear()
 
@@ -32,10 +127,14 @@ def setup_logging():
         )
         c_format = logging.Formatter(console_format)
         c_handler.setFormatter(c_format)
-        c_handler.setLevel(logging.DEBUG)
+        c_handler.setLevel(level)
 
-        # Create file handler with a detailed formatter
-        f_handler = logging.FileHandler(log_file_path)
+        # Create rotating file handler with a detailed formatter
+        f_handler = logging.handlers.RotatingFileHandler(
+            log_file_path,
+            maxBytes=int(os.getenv("LOG_MAX_BYTES", str(LOG_MAX_BYTES))),
+            backupCount=int(os.getenv("LOG_BACKUP_COUNT", str(LOG_BACKUP_COUNT))),
+        )
         log_format = (
             "%(asctime)s loglevel=%(levelname)-6s "
             "logger=%(name)s %(funcName)s() L%(lineno)-4d "
@@ -43,11 +142,25 @@ def setup_logging():
         )
         f_format = logging.Formatter(log_format)
         f_handler.setFormatter(f_format)
-        f_handler.setLevel(logging.DEBUG)
+        f_handler.setLevel(level)
+
+        handlers = [c_handler, f_handler]
+        if os.getenv("LOG_QUEUE", "1") != "0":
+            # Hand records to the listener thread, which does the formatting and writing
+            q_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+            _listener = logging.handlers.QueueListener(
+                q_handler.queue, *handlers, respect_handler_level=True
+            )
+            _listener.start()
+            handlers = [q_handler]
 
+        rate = float(os.getenv("LOG_RATE", str(LOG_RATE)))
+        rate_filter = RateLimitFilter(rate, int(os.getenv("LOG_BURST", str(LOG_BURST))))
         # Add handlers to the root logger
-        logger.addHandler(c_handler)
-        logger.addHandler(f_handler)
+        for handler in handlers:
+            if rate > 0:
+                handler.addFilter(rate_filter)
+            logger.addHandler(handler)
 
         return logger
     except Exception as error: